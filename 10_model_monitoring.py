@@ -1,12 +1,17 @@
 # monitoring.py
-from google.cloud import aiplatform
-from google.cloud.aiplatform import ModelDeploymentMonitoringJob
 
 PROJECT_ID="udemy-mlops-471512"
 REGION="us-central1"
 
+FEATURE_NAMES = ["sepal_length", "sepal_width", "petal_length", "petal_width"]
+
+# Per-feature thresholds, shared by the remote monitoring job and the local drift engine
+SKEW_THRESHOLDS = {name: 0.1 for name in FEATURE_NAMES}
+DRIFT_THRESHOLDS = {name: 0.1 for name in FEATURE_NAMES}
+
 def setup_model_monitoring(endpoint_resource_name: str):
     """Set up model monitoring for drift detection"""
+    from google.cloud.aiplatform import ModelDeploymentMonitoringJob
     
     # Define monitoring config
     monitoring_config = {
@@ -20,18 +25,12 @@ def setup_model_monitoring(endpoint_resource_name: str):
             },
             "training_prediction_skew_detection_config": {
                 "skew_thresholds": {
-                    "sepal_length": {"value": 0.1},
-                    "sepal_width": {"value": 0.1},
-                    "petal_length": {"value": 0.1},
-                    "petal_width": {"value": 0.1},
+                    name: {"value": value} for name, value in SKEW_THRESHOLDS.items()
                 }
             },
             "prediction_drift_detection_config": {
                 "drift_thresholds": {
-                    "sepal_length": {"value": 0.1},
-                    "sepal_width": {"value": 0.1},
-                    "petal_length": {"value": 0.1},
-                    "petal_width": {"value": 0.1},
+                    name: {"value": value} for name, value in DRIFT_THRESHOLDS.items()
                 }
             }
         }
@@ -52,4 +51,47 @@ def setup_model_monitoring(endpoint_resource_name: str):
         }
     )
     
-    return monitoring_job
\ No newline at end of file
+    return monitoring_job
+
+def run_local_drift_check(
+    prediction_log_path: str,
+    training_dataset_path: str = None,
+    window_size: int = 100_000,
+    distance: str = "jensen_shannon"
+):
+    """Compute skew/drift locally over a prediction log with the same thresholds
+    
+    `prediction_log_path` is a JSONL file, or a directory of files written by
+    local_mlops.prediction_log.PredictionLogger (e.g. `mlops.py serve --log-dir`).
+    """
+    import os
+    from local_mlops.datasource import read_dataset_arrays
+    from local_mlops.drift import DriftEngine, HistogramSketch, iter_jsonl_instances
+    from local_mlops.prediction_log import iter_logged_features
+    
+    # Baseline histograms from the training table, built once
+    X_train, _ = read_dataset_arrays(training_dataset_path)
+    baseline = HistogramSketch.from_baseline(FEATURE_NAMES, X_train)
+    
+    engine = DriftEngine(
+        baseline,
+        skew_thresholds=SKEW_THRESHOLDS,
+        drift_thresholds=DRIFT_THRESHOLDS,
+        window_size=window_size,
+        distance=distance
+    )
+    if os.path.isdir(prediction_log_path):
+        blocks = iter_logged_features(prediction_log_path, FEATURE_NAMES)
+    else:
+        blocks = iter_jsonl_instances(prediction_log_path)
+    for block in blocks:
+        for result in engine.update(block):
+            alerts = [
+                f"{kind}:{name}"
+                for kind in ("skew", "drift")
+                for name, value in result[kind].items() if value["alert"]
+            ]
+            if alerts:
+                print(f"Row {result['rows_seen']}: threshold exceeded for {', '.join(alerts)}")
+    
+    return list(engine.results)
@@ -1,24 +1,24 @@
 # deploy.py
 import os
-from google.cloud import aiplatform
-from kfp.v2 import compiler
 
 # Set environment variables
 PROJECT_ID = os.getenv("PROJECT_ID")
 REGION = os.getenv("REGION")
 BUCKET_NAME = os.getenv("BUCKET_NAME")
+# Endpoint sizing written by `mlops.py capacity`; the previous fixed sizing applies without one
+CAPACITY_PLAN = os.getenv("CAPACITY_PLAN", "capacity_plan.json")
 
 def deploy_complete_pipeline():
     """Deploy the complete MLOps pipeline"""
+    from google.cloud import aiplatform
+    from local_mlops.capacity import deployment_config, load_capacity_plan
+    from local_mlops.pipeline_compile import compile_pipeline
     
     # Initialize Vertex AI
     aiplatform.init(project=PROJECT_ID, location=REGION, staging_bucket=f"{BUCKET_NAME}")
     
-    # 1. Compile the pipeline
-    compiler.Compiler().compile(
-        pipeline_func=iris_training_pipeline,
-        package_path="iris_pipeline.json"
-    )
+    # 1. Compile the pipeline (skipped when the cached spec for this source is current)
+    compile_pipeline(package_path="iris_pipeline.json")
     
     # 2. Create and run the pipeline job
     job = aiplatform.PipelineJob(
@@ -28,7 +28,9 @@ def deploy_complete_pipeline():
             "project_id": PROJECT_ID,
             "region": REGION,
             "model_name": "iris-classifier-v1",
-            "endpoint_name": "iris-production-endpoint"
+            "endpoint_name": "iris-production-endpoint",
+            # machine_type, min_replica_count, max_replica_count
+            **deployment_config(load_capacity_plan(CAPACITY_PLAN))
         }
     )
     
@@ -42,4 +44,4 @@ def deploy_complete_pipeline():
 
 if __name__ == "__main__":
     job = deploy_complete_pipeline()
-    print(f"Pipeline job submitted: {job.resource_name}")
\ No newline at end of file
+    print(f"Pipeline job submitted: {job.resource_name}")
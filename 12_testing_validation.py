@@ -1,19 +1,21 @@
 # test_pipeline.py
 import requests
 import json
-from google.cloud import aiplatform
 
 PROJECT_ID="udemy-mlops-471512"
 REGION="us-central1"
 
-def test_model_endpoint():
-    """Test the deployed model endpoint"""
+def test_model_endpoint(endpoint=None):
+    """Test the deployed model endpoint (or a local stand-in with the same predict API)"""
     
-    # Initialize client
-    aiplatform.init(project=PROJECT_ID, location=REGION)
-    
-    # Get endpoint
-    endpoint = aiplatform.Endpoint("your-endpoint-resource-name")
+    if endpoint is None:
+        from google.cloud import aiplatform
+        
+        # Initialize client
+        aiplatform.init(project=PROJECT_ID, location=REGION)
+        
+        # Get endpoint
+        endpoint = aiplatform.Endpoint("your-endpoint-resource-name")
     
     # Test data
     test_instances = [
@@ -34,12 +36,86 @@ def test_model_endpoint():
     except Exception as e:
         print(f"Explanations not available: {e}")
 
-def validate_model_performance():
-    """Validate model performance against test data"""
+def load_test_endpoint(endpoint, requests_file: str = None, output_path: str = None):
+    """Replay prediction requests against an endpoint and report latency/throughput"""
+    from local_mlops.loadgen import (
+        EndpointTarget, format_report, load_request_payloads, run_benchmark, synthetic_payloads
+    )
+    
+    payloads = load_request_payloads(requests_file) if requests_file else synthetic_payloads()
+    report = run_benchmark(
+        EndpointTarget(endpoint),
+        payloads,
+        concurrency_levels=(1, 4),
+        duration_s=10.0,
+        warmup_s=2.0,
+        output_path=output_path
+    )
+    print(format_report(report))
     
-    # This would include more comprehensive validation
-    # including A/B testing, shadow mode deployment, etc.
-    pass
+    return report
+
+def validate_model_performance(champion_path: str, challenger_path: str, min_agreement: float = 0.9,
+                               max_accuracy_drop: float = 0.02, batch_size: int = 1):
+    """Validate a challenger against the champion with the challenger in shadow mode
+    
+    Replays Iris.csv through an in-process router: the champion serves every request
+    while the challenger scores the same rows off the critical path. Passes when the
+    two agree on at least min_agreement of rows and the challenger's accuracy is no
+    more than max_accuracy_drop below the champion's. Any failed shadow batch fails the
+    validation, since the challenger's stats would then cover only part of the rows.
+    """
+    from local_mlops.datasource import FEATURE_COLUMNS, TARGET_COLUMN, load_iris_frame
+    from local_mlops.router import TrafficRouter
+    
+    df = load_iris_frame()
+    X = df[FEATURE_COLUMNS].to_numpy()
+    y = df[TARGET_COLUMN].to_numpy()
+    
+    with TrafficRouter(
+        {"champion": champion_path, "challenger": challenger_path},
+        weights={"champion": 1.0},
+        shadows=["challenger"]
+    ) as router:
+        for start in range(0, len(X), batch_size):
+            router.predict(X[start:start + batch_size].tolist(), labels=y[start:start + batch_size])
+        router.drain()
+        stats = router.stats()
+    
+    comparison = stats["comparisons"]["champion->challenger"]
+    champion = stats["variants"]["champion"]
+    challenger = stats["variants"]["challenger"]
+    if stats["shadow_errors"] or challenger["accuracy"] is None:
+        print(f"Shadow scoring failed in {stats['shadow_errors']} batch(es): {stats['shadow_last_error']}")
+        passed = False
+    else:
+        passed = (
+            comparison["agreement_rate"] >= min_agreement
+            and challenger["accuracy"] >= champion["accuracy"] - max_accuracy_drop
+        )
+        print(f"Agreement: {comparison['agreement_rate']:.2%} over {comparison['rows']} rows")
+        print(f"Accuracy: champion {champion['accuracy']:.4f}, challenger {challenger['accuracy']:.4f}")
+        print(f"Latency: champion {champion['mean_ms']:.3f} ms, challenger "
+              f"{challenger['shadow_latency']['mean_ms']:.3f} ms per request "
+              f"(delta {comparison['latency_delta_mean_ms']:+.3f} ± {comparison['latency_delta_std_ms']:.3f} ms)")
+    print("Validation", "passed" if passed else "FAILED")
+    
+    return dict(stats, passed=passed)
+
+def test_local_endpoint(model_path: str):
+    """Run the endpoint test against the local micro-batching prediction server"""
+    from local_mlops.server import LocalPredictionServer
+    
+    with LocalPredictionServer(model_path) as server:
+        test_model_endpoint(server.endpoint)
 
 if __name__ == "__main__":
-    test_model_endpoint()
\ No newline at end of file
+    import sys
+    
+    if len(sys.argv) > 2 and sys.argv[1] == "--local":
+        test_local_endpoint(sys.argv[2])
+    elif len(sys.argv) > 3 and sys.argv[1] == "--validate":
+        if not validate_model_performance(sys.argv[2], sys.argv[3])["passed"]:
+            sys.exit(1)
+    else:
+        test_model_endpoint()
\ No newline at end of file
@@ -1,6 +1,7 @@
 export PROJECT_ID="udemy-mlops-471512"
 export REGION="us-central1"
 export BUCKET_NAME="gs://${PROJECT_ID}-mlops-bucket"
+export COMPONENT_IMAGE="${REGION}-docker.pkg.dev/${PROJECT_ID}/iris-mlops/components:latest"
 
 # Enable required APIs
 gcloud services enable \
@@ -10,7 +11,14 @@ gcloud services enable \
     aiplatform.googleapis.com \
     composer.googleapis.com \
     container.googleapis.com \
-    cloudbuild.googleapis.com
+    cloudbuild.googleapis.com \
+    artifactregistry.googleapis.com
 
 # make storage bucket
 gsutil mb -l  $REGION $BUCKET_NAME
+
+# Component base image with local_mlops (see Dockerfile); rebuild after changing local_mlops
+gcloud artifacts repositories create iris-mlops \
+    --repository-format=docker \
+    --location=$REGION
+gcloud builds submit --tag $COMPONENT_IMAGE .
@@ -5,3 +5,9 @@ bq query --use_legacy_sql=false \
 
 
 
+# Column statistics and schema checks (nulls, ranges, species values) of a dataset written
+# by load_data; exits non-zero on a violation. The pipeline runs the same checks in
+# validate_data when its `validation` parameter names a schema. Pass the dataset as the
+# first argument, e.g. a local run's load-data output:
+#   sh 3_datacheck.sh ~/.iris_pipeline_runs/<run_id>/load-data/dataset
+python -m local_mlops.data_stats "${1:?usage: 3_datacheck.sh <dataset written by load_data>}" --schema iris
@@ -1,48 +1,46 @@
 # feature_store_setup.py
-from google.cloud import aiplatform
-from google.cloud.aiplatform import Feature, Featurestore, EntityType
 
 PROJECT_ID="udemy-mlops-471512"
 REGION="us-central1"
 
-aiplatform.init(project=PROJECT_ID, location=REGION)
+FEATURESTORE_ID = "iris_featurestore"
+ENTITY_TYPE_ID = "iris_entity"
+FEATURE_IDS = ["sepal_length", "sepal_width", "petal_length", "petal_width"]
 
-# Create Feature Store
-# featurestore = Featurestore.create(
-#     featurestore_id="iris_featurestore",
-#     labels={"env": "development"}
-# )
+def setup_feature_store():
+    """Create the Iris entity type and its features (importing this module has no side effects)"""
+    from google.cloud import aiplatform
+    from google.cloud.aiplatform import Feature, Featurestore, EntityType
+    
+    aiplatform.init(project=PROJECT_ID, location=REGION)
+    
+    # Create Feature Store
+    # featurestore = Featurestore.create(
+    #     featurestore_id=FEATURESTORE_ID,
+    #     labels={"env": "development"}
+    # )
+    
+    # OR use existing feature store
+    featurestore = aiplatform.Featurestore(FEATURESTORE_ID) 
+    
+    # Create Entity Type
+    entity_type = EntityType.create(
+        entity_type_id=ENTITY_TYPE_ID,
+        featurestore_name=featurestore.resource_name,
+        labels={"purpose": "iris_classification"}
+    )
+    
+    # Create Features
+    features = [
+        Feature.create(
+            feature_id=feature_id,
+            entity_type_name=entity_type.resource_name,
+            value_type="DOUBLE"
+        )
+        for feature_id in FEATURE_IDS
+    ]
+    
+    return entity_type, features
 
-# OR use existing feature store
-featurestore = aiplatform.Featurestore("iris_featurestore") 
-
-# Create Entity Type
-entity_type = EntityType.create(
-    entity_type_id="iris_entity",
-    featurestore_name=featurestore.resource_name,
-    labels={"purpose": "iris_classification"}
-)
-
-# Create Features
-features = [
-    Feature.create(
-        feature_id="sepal_length",
-        entity_type_name=entity_type.resource_name,
-        value_type="DOUBLE"
-    ),
-    Feature.create(
-        feature_id="sepal_width",
-        entity_type_name=entity_type.resource_name,
-        value_type="DOUBLE"
-    ),
-    Feature.create(
-        feature_id="petal_length",
-        entity_type_name=entity_type.resource_name,
-        value_type="DOUBLE"
-    ),
-    Feature.create(
-        feature_id="petal_width",
-        entity_type_name=entity_type.resource_name,
-        value_type="DOUBLE"
-    ),
-]
\ No newline at end of file
+if __name__ == "__main__":
+    setup_feature_store()
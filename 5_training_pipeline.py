@@ -1,47 +1,282 @@
 # training_pipeline.py
 from kfp.v2 import dsl
-from kfp.v2.dsl import component, Input, Output, Dataset, Model, Metrics
+from kfp.v2.dsl import component, Input, Output, Artifact, Dataset, Model, Metrics
 from typing import NamedTuple
 
 PROJECT_ID="udemy-mlops-471512"
 REGION="us-central1"
+# python:3.9 plus local_mlops (see Dockerfile, built by 1_setup.sh); the steps import it
+# for the schema, cache_dir, trace_path, candidates and validation options
+COMPONENT_IMAGE=f"{REGION}-docker.pkg.dev/{PROJECT_ID}/iris-mlops/components:latest"
 
 @component(
-    base_image="python:3.9",
+    base_image=COMPONENT_IMAGE,
     packages_to_install=[
         "pandas==1.5.3",
         "scikit-learn==1.3.0",
+        "pyarrow==14.0.1",
         "google-cloud-bigquery==3.11.4",
         "google-cloud-storage==2.10.0"
     ]
 )
 def load_data(
     project_id: str,
-    dataset: Output[Dataset]
+    dataset: Output[Dataset],
+    profile: Output[Metrics],
+    source: str = "bigquery",
+    source_uri: str = "",
+    batch_size: int = 65536,
+    cache_dir: str = "",
+    min_feature_timestamp: str = "",
+    max_feature_timestamp: str = "",
+    trace_path: str = "",
+    profile_sample_rate: float = 0.0,
+    schema: str = ""
 ) -> NamedTuple('Outputs', [('num_samples', int)]):
-    """Load data from BigQuery"""
-    import pandas as pd
-    from google.cloud import bigquery
+    """Load data from BigQuery (or a local SQLite/DuckDB stand-in) into an Arrow IPC file
     
-    client = bigquery.Client(project=project_id)
-    
-    query = f"""
-    SELECT sepal_length, sepal_width, petal_length, petal_width, species
-    FROM `{project_id}.iris_dataset.iris_data`
+    With min/max_feature_timestamp only rows in [min, max] are loaded (incremental mode),
+    with their feature_timestamp as an extra string column: rows stamped exactly `min` may
+    already be held by the caller, which drops them (see local_mlops.incremental).
+    With `schema` the table, columns and dtypes come from that config instead of Iris.
     """
+    import contextlib
+    import os
+    import pyarrow as pa
+    from collections import namedtuple
+    
+    Outputs = namedtuple('Outputs', ['num_samples'])
+    table_name = 'iris_dataset.iris_data'
+    feature_columns = ['sepal_length', 'sepal_width', 'petal_length', 'petal_width']
+    output_schema = pa.schema(
+        [pa.field(c, pa.float32()) for c in feature_columns] + [pa.field('species', pa.string())]
+    )
+    if schema:
+        from local_mlops.preprocessing import arrow_schema, load_schema
+        
+        config = load_schema(schema)
+        table_name = config['table']
+        output_schema = arrow_schema(config)
+    dataset_name = table_name.split('.')[0]
+    if min_feature_timestamp or max_feature_timestamp:
+        output_schema = output_schema.append(pa.field('feature_timestamp', pa.string()))
     
-    df = client.query(query).to_dataframe()
-    df.to_csv(dataset.path, index=False)
+    # Record wall/CPU time, peak RSS and throughput when tracing is enabled
+    step_profile = contextlib.nullcontext()
+    if trace_path:
+        from local_mlops.profiling import StepProfiler
+        
+        step_profile = StepProfiler('load_data', trace_path, profile, profile_sample_rate)
     
+    with step_profile as prof:
+        # Reuse the stored dataset when the source table, this code and the parameters are unchanged
+        step_cache = None
+        if cache_dir:
+            import inspect
+            from local_mlops.step_cache import StepCache, cache_key
+        
+            if source == "bigquery":
+                from google.cloud import bigquery
+            
+                table_info = bigquery.Client(project=project_id).get_table(
+                    f"{project_id}.{table_name}"
+                )
+                source_fingerprint = [table_info.modified.isoformat(), table_info.num_rows]
+            else:
+                stat = os.stat(source_uri)
+                source_fingerprint = [os.path.abspath(source_uri), stat.st_size, stat.st_mtime_ns]
+            key = cache_key(
+                source_fingerprint,
+                inspect.getsource(inspect.currentframe().f_code),
+                {'source': source, 'batch_size': batch_size,
+                 'min_feature_timestamp': min_feature_timestamp,
+                 'max_feature_timestamp': max_feature_timestamp,
+                 'schema': output_schema.to_string(), 'table': table_name}
+            )
+            step_cache = StepCache(cache_dir)
+            cached = step_cache.get(key, {'dataset': dataset.path})
+            if cached is not None:
+                if prof is not None:
+                    prof.record(rows=cached['num_samples'], cache_hit=True)
+                return Outputs(num_samples=cached['num_samples'])
+        
+        # Optional feature_timestamp window; placeholders are filled per source below
+        conditions, bounds = [], []
+        if min_feature_timestamp:
+            conditions.append("feature_timestamp >= {}")
+            bounds.append(min_feature_timestamp)
+        if max_feature_timestamp:
+            conditions.append("feature_timestamp <= {}")
+            bounds.append(max_feature_timestamp)
+        
+        # Quoted so wide configs can use column names with spaces
+        select = "SELECT " + ", ".join(f'"{c}"' for c in output_schema.names) + f" FROM {table_name}"
+        
+        def where(placeholders):
+            if not conditions:
+                return ""
+            return " WHERE " + " AND ".join(c.format(p) for c, p in zip(conditions, placeholders))
+        
+        # Each source yields record batches so the full table never sits in memory
+        if source == "bigquery":
+            from google.cloud import bigquery
+        
+            client = bigquery.Client(project=project_id)
+            query = f"""
+            SELECT {", ".join(f"`{c}`" for c in output_schema.names)}
+            FROM `{project_id}.{table_name}`
+            {where([f"@bound_{i}" for i in range(len(bounds))])}
+            """
+            job_config = bigquery.QueryJobConfig(query_parameters=[
+                bigquery.ScalarQueryParameter(f"bound_{i}", "TIMESTAMP", value)
+                for i, value in enumerate(bounds)
+            ])
+            batches = client.query(query, job_config=job_config).result(
+                page_size=batch_size
+            ).to_arrow_iterable()
+        elif source == "sqlite":
+            import sqlite3
+        
+            def sqlite_batches():
+                conn = sqlite3.connect(":memory:")
+                conn.execute(f"ATTACH DATABASE ? AS {dataset_name}", (source_uri,))
+                cursor = conn.execute(
+                    select + where(["?"] * len(bounds)),
+                    bounds
+                )
+                names = [d[0] for d in cursor.description]
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    columns = list(zip(*rows))
+                    yield pa.RecordBatch.from_arrays(
+                        [pa.array(col) for col in columns], names=names
+                    )
+                conn.close()
+        
+            batches = sqlite_batches()
+        elif source == "duckdb":
+            import duckdb
+        
+            conn = duckdb.connect()
+            conn.execute(f"ATTACH '{source_uri}' AS {dataset_name} (READ_ONLY)")
+            batches = conn.execute(
+                select + where(["CAST(? AS TIMESTAMP)"] * len(bounds)),
+                bounds
+            ).fetch_record_batch(batch_size)
+        else:
+            raise ValueError(f"Unknown data source: {source}")
+        
+        # Write typed float32 columns batch by batch
+        num_samples = 0
+        bytes_read = 0
+        with pa.OSFile(dataset.path, 'wb') as sink:
+            with pa.ipc.new_file(sink, output_schema) as writer:
+                for batch in batches:
+                    bytes_read += batch.nbytes
+                    table = pa.Table.from_batches([batch]).select(output_schema.names).cast(output_schema)
+                    writer.write_table(table)
+                    num_samples += table.num_rows
+        
+        if prof is not None:
+            prof.record(rows=num_samples, bytes_read=bytes_read,
+                        bytes_written=os.path.getsize(dataset.path), cache_hit=False)
+        
+        if step_cache is not None:
+            step_cache.put(key, {'dataset': dataset.path}, {'num_samples': num_samples})
+        
+        return Outputs(num_samples=num_samples)
+
+@component(
+    base_image=COMPONENT_IMAGE,
+    packages_to_install=[
+        "numpy==1.24.4",
+        "pyarrow==14.0.1"
+    ]
+)
+def validate_data(
+    dataset: Input[Dataset],
+    statistics: Output[Artifact],
+    profile: Output[Metrics],
+    validation: str = "",
+    source: str = "",
+    source_uri: str = "",
+    cache_dir: str = "",
+    workers: int = 0,
+    trace_path: str = "",
+    profile_sample_rate: float = 0.0
+) -> NamedTuple('Outputs', [('num_rows', int), ('rows_scanned', int)]):
+    """Per-column statistics of the loaded dataset, checked against a stored schema
+    
+    `validation` is a local_mlops/schemas name or JSON path; empty skips the stage. The
+    statistics (count, nulls, min/max, mean/std, quantiles, category frequencies) come
+    from one pass over the memory-mapped Arrow file, split over `workers` processes, and
+    are written to `statistics`. The step fails, so training never starts, when the data
+    violates the schema. With cache_dir, statistics of rows seen by earlier runs are
+    reused and only appended rows are scanned.
+    """
+    import contextlib
+    import json
+    import os
     from collections import namedtuple
-    Outputs = namedtuple('Outputs', ['num_samples'])
-    return Outputs(num_samples=len(df))
+    
+    Outputs = namedtuple('Outputs', ['num_rows', 'rows_scanned'])
+    if not validation:
+        with open(statistics.path, 'w') as f:
+            json.dump({}, f)
+        return Outputs(num_rows=-1, rows_scanned=0)
+    
+    import pyarrow as pa
+    from local_mlops.data_stats import StatsCache, compute_stats, schema_violations, validate_stats
+    from local_mlops.preprocessing import load_schema
+    
+    # Record wall/CPU time, peak RSS and throughput when tracing is enabled
+    step_profile = contextlib.nullcontext()
+    if trace_path:
+        from local_mlops.profiling import StepProfiler
+        
+        step_profile = StepProfiler('validate_data', trace_path, profile, profile_sample_rate)
+    
+    with step_profile as prof:
+        config = load_schema(validation)
+        # Structure first: a missing column or a changed type fails before any scan
+        with pa.memory_map(dataset.path, 'r') as source_file:
+            violations = schema_violations(pa.ipc.open_file(source_file).schema, config)
+        if violations:
+            raise ValueError(f"Dataset does not match schema {config['name']!r}: " + "; ".join(violations))
+        
+        workers = workers or os.cpu_count() or 1
+        if cache_dir:
+            stats, rows_scanned = StatsCache(os.path.join(cache_dir, 'statistics')).stats(
+                f"{source}:{source_uri}:{config['table']}", dataset.path, config, workers
+            )
+        else:
+            stats = compute_stats(dataset.path, config, workers=workers)
+            rows_scanned = stats.rows
+        
+        summary = stats.summary()
+        violations = validate_stats(stats, config)
+        summary['violations'] = violations
+        with open(statistics.path, 'w') as f:
+            json.dump(summary, f, indent=2)
+        statistics.metadata['rows'] = stats.rows
+        statistics.metadata['rows_scanned'] = rows_scanned
+        statistics.metadata['schema'] = config['name']
+        
+        if prof is not None:
+            prof.record(rows=rows_scanned, bytes_read=os.path.getsize(dataset.path), cache_hit=rows_scanned < stats.rows)
+        if violations:
+            raise ValueError(f"Dataset failed validation against {config['name']!r}: " + "; ".join(violations))
+        
+        return Outputs(num_rows=stats.rows, rows_scanned=rows_scanned)
 
 @component(
-    base_image="python:3.9",
+    base_image=COMPONENT_IMAGE,
     packages_to_install=[
         "pandas==1.5.3",
         "scikit-learn==1.3.0",
+        "pyarrow==14.0.1",
         "joblib==1.3.2"
     ]
 )
@@ -49,65 +284,223 @@ def train_model(
     dataset: Input[Dataset],
     model: Output[Model],
     metrics: Output[Metrics],
+    profile: Output[Metrics],
     learning_rate: float = 0.01,
-    max_iter: int = 1000
+    max_iter: int = 1000,
+    cache_dir: str = "",
+    trace_path: str = "",
+    profile_sample_rate: float = 0.0,
+    schema: str = "",
+    candidates: str = "",
+    cv_folds: int = 5,
+    bakeoff_workers: int = 0
 ) -> NamedTuple('Outputs', [('accuracy', float)]):
-    """Train logistic regression model"""
-    import pandas as pd
+    """Train logistic regression model
+    
+    With `schema` (a local_mlops/schemas name or JSON path) features and dtypes come from
+    the config and preprocessing goes through local_mlops.preprocessing.TabularTransform.
+    With `candidates` (a JSON list of estimator configs, or "default") the model is instead
+    the winner of a k-fold bake-off run by local_mlops.bakeoff, and the leaderboard is
+    added to the metrics.
+    """
+    import contextlib
+    import os
+    import numpy as np
+    import pyarrow as pa
     import joblib
     from sklearn.model_selection import train_test_split
     from sklearn.linear_model import LogisticRegression
     from sklearn.preprocessing import LabelEncoder
     from sklearn.metrics import accuracy_score, classification_report
     import json
+    from collections import namedtuple
     
-    # Load data
-    df = pd.read_csv(dataset.path)
+    Outputs = namedtuple('Outputs', ['accuracy'])
     
-    # Prepare features and target
-    X = df[['sepal_length', 'sepal_width', 'petal_length', 'petal_width']]
-    le = LabelEncoder()
-    y = le.fit_transform(df['species'])
+    # Record wall/CPU time, peak RSS and throughput when tracing is enabled
+    step_profile = contextlib.nullcontext()
+    if trace_path:
+        from local_mlops.profiling import StepProfiler
+        
+        step_profile = StepProfiler('train_model', trace_path, profile, profile_sample_rate)
     
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
+    with step_profile as prof:
+        # Return the stored model/metrics when the dataset, this code and the parameters are unchanged
+        step_cache = None
+        if cache_dir:
+            import inspect
+            from local_mlops.preprocessing import load_schema
+            from local_mlops.step_cache import StepCache, cache_key, fingerprint_file
+        
+            key = cache_key(
+                fingerprint_file(dataset.path),
+                inspect.getsource(inspect.currentframe().f_code),
+                {'learning_rate': learning_rate, 'max_iter': max_iter,
+                 'schema': load_schema(schema) if schema else None,
+                 'candidates': candidates, 'cv_folds': cv_folds}
+            )
+            step_cache = StepCache(cache_dir)
+            cached = step_cache.get(key, {'model': model.path, 'metrics': metrics.path})
+            if cached is not None:
+                if prof is not None:
+                    prof.record(cache_hit=True)
+                return Outputs(accuracy=cached['accuracy'])
+        
+        transform = None
+        if schema:
+            # One shuffled float32 matrix built batch by batch; train/test are views of it
+            from local_mlops.preprocessing import TabularTransform, load_schema
+            
+            transform = TabularTransform(load_schema(schema)).fit(dataset.path)
+            feature_names = transform.feature_names
+            X_train, X_test, y_train, y_test = transform.split(dataset.path, test_size=0.2, seed=42)
+            le = transform.label_encoder()
+            num_rows = len(X_train) + len(X_test)
+        else:
+            # Load data (memory-mapped, the column buffers are not copied)
+            feature_names = ['sepal_length', 'sepal_width', 'petal_length', 'petal_width']
+            with pa.memory_map(dataset.path, 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+            num_rows = table.num_rows
+            
+            # Prepare features and target
+            X = np.empty((table.num_rows, len(feature_names)), dtype=np.float32, order='F')
+            for i, name in enumerate(feature_names):
+                offset = 0
+                for chunk in table.column(name).chunks:
+                    X[offset:offset + len(chunk), i] = chunk.to_numpy(zero_copy_only=True)
+                    offset += len(chunk)
+            le = LabelEncoder()
+            y = le.fit_transform(table.column('species').to_numpy())
+            
+            # Split data
+            X_train, X_test, y_train, y_test = train_test_split(
+                X, y, test_size=0.2, random_state=42
+            )
+        
+        # Train model
+        bakeoff = None
+        if candidates:
+            # Candidates x folds on a process pool over shared memory; winner refit on X_train
+            from local_mlops.bakeoff import DEFAULT_CANDIDATES, run_bakeoff
+            
+            bakeoff = run_bakeoff(
+                X_train, y_train,
+                DEFAULT_CANDIDATES if candidates == 'default' else json.loads(candidates),
+                cv_folds=cv_folds,
+                workers=bakeoff_workers
+            )
+            clf = bakeoff['model']
+        else:
+            clf = LogisticRegression(
+                C=1/learning_rate,
+                max_iter=max_iter,
+                random_state=42
+            )
+            clf.fit(X_train, y_train)
+        
+        # Evaluate
+        y_pred = clf.predict(X_test)
+        accuracy = accuracy_score(y_test, y_pred)
+        
+        # Save model and label encoder
+        model_artifacts = {
+            'model': clf,
+            'label_encoder': le,
+            'feature_names': feature_names,
+            # Baseline for local attributions (see local_mlops.explain)
+            'feature_means': X_train.mean(axis=0).tolist()
+        }
+        if transform is not None:
+            # Serving applies the same fitted transform to request rows
+            model_artifacts['transform'] = transform
+        joblib.dump(model_artifacts, model.path)
+        
+        # Save metrics
+        metrics_dict = {
+            'accuracy': accuracy,
+            'samples_count': num_rows
+        }
+        if bakeoff is not None:
+            metrics_dict['winner'] = bakeoff['winner']
+            metrics_dict['leaderboard'] = bakeoff['leaderboard']
+            metrics_dict['bakeoff_cv_seconds'] = bakeoff['cv_elapsed_s']
+            metrics_dict['bakeoff_jobs'] = f"{bakeoff['jobs_run']}/{bakeoff['jobs_total']}"
+        with open(metrics.path, 'w') as f:
+            json.dump(metrics_dict, f)
+        
+        if prof is not None:
+            prof.record(
+                rows=num_rows,
+                bytes_read=os.path.getsize(dataset.path),
+                bytes_written=os.path.getsize(model.path) + os.path.getsize(metrics.path),
+                cache_hit=False
+            )
+        
+        if step_cache is not None:
+            step_cache.put(
+                key, {'model': model.path, 'metrics': metrics.path}, {'accuracy': accuracy}
+            )
+        
+        return Outputs(accuracy=accuracy)
+
+@component(
+    base_image=COMPONENT_IMAGE,
+    packages_to_install=[
+        "numpy==1.24.4",
+        "scikit-learn==1.3.0",
+        "joblib==1.3.2"
+    ]
+)
+def export_model_kernel(
+    model: Input[Model],
+    kernel: Output[Model],
+    profile: Output[Metrics],
+    trace_path: str = "",
+    profile_sample_rate: float = 0.0
+):
+    """Export coefficients, classes and feature names for the NumPy-only predictor
     
-    # Train model
-    clf = LogisticRegression(
-        C=1/learning_rate,
-        max_iter=max_iter,
-        random_state=42
-    )
-    clf.fit(X_train, y_train)
-    
-    # Evaluate
-    y_pred = clf.predict(X_test)
-    accuracy = accuracy_score(y_test, y_pred)
-    
-    # Save model and label encoder
-    model_artifacts = {
-        'model': clf,
-        'label_encoder': le,
-        'feature_names': list(X.columns)
-    }
-    joblib.dump(model_artifacts, model.path)
-    
-    # Save metrics
-    metrics_dict = {
-        'accuracy': accuracy,
-        'samples_count': len(df)
-    }
-    with open(metrics.path, 'w') as f:
-        json.dump(metrics_dict, f)
+    The file is written by local_mlops.kernel (shipped in COMPONENT_IMAGE), the same code
+    that NumpyPredictor and map_kernel read it with.
+    """
+    import contextlib
+    import os
+    import joblib
     
-    from collections import namedtuple
-    Outputs = namedtuple('Outputs', ['accuracy'])
-    return Outputs(accuracy=accuracy)
+    # Record wall/CPU time, peak RSS and throughput when tracing is enabled
+    step_profile = contextlib.nullcontext()
+    if trace_path:
+        from local_mlops.profiling import StepProfiler
+        
+        step_profile = StepProfiler('export_model_kernel', trace_path, profile, profile_sample_rate)
+    
+    with step_profile as prof:
+        from local_mlops.kernel import KERNEL_FORMAT_VERSION, kernel_arrays, save_kernel
+        
+        model_artifacts = joblib.load(model.path)
+        clf = model_artifacts['model']
+        if not hasattr(clf, 'coef_') or model_artifacts.get('transform') is not None:
+            # Bake-off winners can be tree ensembles, which the linear kernel cannot express,
+            # and schema-trained models need their transform, which the kernel does not apply
+            open(kernel.path, 'wb').close()
+            kernel.metadata['format'] = 'unsupported'
+            kernel.metadata['estimator'] = type(clf).__name__
+            if model_artifacts.get('transform') is not None:
+                kernel.metadata['reason'] = 'preprocessing transform'
+            return
+        
+        # Uncompressed, 64-byte aligned members, so servers can memory-map the weights in place
+        with open(kernel.path, 'wb') as f:
+            save_kernel(f, kernel_arrays(model_artifacts))
+        kernel.metadata['format'] = 'npz'
+        kernel.metadata['format_version'] = KERNEL_FORMAT_VERSION
+        
+        if prof is not None:
+            prof.record(bytes_read=os.path.getsize(model.path), bytes_written=os.path.getsize(kernel.path))
 
 @component(
-    base_image="python:3.9",
+    base_image=COMPONENT_IMAGE,
     packages_to_install=[
         "google-cloud-aiplatform==1.36.0",
         "joblib==1.3.2"
@@ -118,34 +511,66 @@ def deploy_model(
     project_id: str,
     region: str,
     model_name: str,
-    endpoint_name: str
+    endpoint_name: str,
+    profile: Output[Metrics],
+    trace_path: str = "",
+    profile_sample_rate: float = 0.0,
+    machine_type: str = "n1-standard-2",
+    min_replica_count: int = 1,
+    max_replica_count: int = 3
 ) -> str:
-    """Deploy model to Vertex AI endpoint"""
+    """Deploy model to Vertex AI endpoint
+    
+    Machine shape and replica range come from a local_mlops.capacity plan when the
+    pipeline is submitted with one (see 11_model_deployment.py).
+    """
     from google.cloud import aiplatform
+    import contextlib
+    import os
+    import time
     import joblib
     
-    aiplatform.init(project=project_id, location=region)
-    
-    # Upload model to Model Registry
-    vertex_model = aiplatform.Model.upload(
-        display_name=model_name,
-        artifact_uri=model.uri,
-        serving_container_image_uri="gcr.io/cloud-aiplatform/prediction/sklearn-cpu.1-0:latest"
-    )
-    
-    # Create endpoint
-    endpoint = aiplatform.Endpoint.create(display_name=endpoint_name)
+    # Record wall/CPU time, peak RSS and throughput when tracing is enabled
+    step_profile = contextlib.nullcontext()
+    if trace_path:
+        from local_mlops.profiling import StepProfiler
+        
+        step_profile = StepProfiler('deploy_model', trace_path, profile, profile_sample_rate)
     
-    # Deploy model to endpoint
-    vertex_model.deploy(
-        endpoint=endpoint,
-        deployed_model_display_name=f"{model_name}-deployed",
-        machine_type="n1-standard-2",
-        min_replica_count=1,
-        max_replica_count=3
-    )
-    
-    return endpoint.resource_name
+    with step_profile as prof:
+        aiplatform.init(project=project_id, location=region)
+        
+        # Upload model to Model Registry
+        upload_start = time.perf_counter()
+        vertex_model = aiplatform.Model.upload(
+            display_name=model_name,
+            artifact_uri=model.uri,
+            serving_container_image_uri="gcr.io/cloud-aiplatform/prediction/sklearn-cpu.1-0:latest"
+        )
+        
+        # Create endpoint
+        endpoint_start = time.perf_counter()
+        endpoint = aiplatform.Endpoint.create(display_name=endpoint_name)
+        
+        # Deploy model to endpoint
+        deploy_start = time.perf_counter()
+        vertex_model.deploy(
+            endpoint=endpoint,
+            deployed_model_display_name=f"{model_name}-deployed",
+            machine_type=machine_type,
+            min_replica_count=min_replica_count,
+            max_replica_count=max_replica_count
+        )
+        
+        if prof is not None:
+            prof.record(
+                bytes_read=os.path.getsize(model.path),
+                upload_s=endpoint_start - upload_start,
+                endpoint_create_s=deploy_start - endpoint_start,
+                deploy_s=time.perf_counter() - deploy_start
+            )
+        
+        return endpoint.resource_name
 
 @dsl.pipeline(
     name="iris-classification-pipeline",
@@ -157,18 +582,62 @@ def iris_training_pipeline(
     model_name: str = "iris-classifier",
     endpoint_name: str = "iris-endpoint",
     learning_rate: float = 0.01,
-    max_iter: int = 1000
+    max_iter: int = 1000,
+    data_source: str = "bigquery",
+    data_source_uri: str = "",
+    cache_dir: str = "",
+    trace_path: str = "",
+    profile_sample_rate: float = 0.0,
+    schema: str = "",
+    candidates: str = "",
+    cv_folds: int = 5,
+    machine_type: str = "n1-standard-2",
+    min_replica_count: int = 1,
+    max_replica_count: int = 3,
+    validation: str = ""
 ):
     """Main training pipeline"""
     
     # Load data
-    load_data_op = load_data(project_id=project_id)
+    load_data_op = load_data(
+        project_id=project_id,
+        source=data_source,
+        source_uri=data_source_uri,
+        cache_dir=cache_dir,
+        trace_path=trace_path,
+        profile_sample_rate=profile_sample_rate,
+        schema=schema
+    )
+    
+    # Check the loaded data against the stored schema before spending any training compute
+    validate_data_op = validate_data(
+        dataset=load_data_op.outputs['dataset'],
+        validation=validation,
+        source=data_source,
+        source_uri=data_source_uri,
+        cache_dir=cache_dir,
+        trace_path=trace_path,
+        profile_sample_rate=profile_sample_rate
+    )
     
     # Train model
     train_model_op = train_model(
         dataset=load_data_op.outputs['dataset'],
         learning_rate=learning_rate,
-        max_iter=max_iter
+        max_iter=max_iter,
+        cache_dir=cache_dir,
+        trace_path=trace_path,
+        profile_sample_rate=profile_sample_rate,
+        schema=schema,
+        candidates=candidates,
+        cv_folds=cv_folds
+    ).after(validate_data_op)
+    
+    # Export the NumPy inference kernel
+    export_kernel_op = export_model_kernel(
+        model=train_model_op.outputs['model'],
+        trace_path=trace_path,
+        profile_sample_rate=profile_sample_rate
     )
     
     # Deploy model
@@ -177,5 +646,10 @@ def iris_training_pipeline(
         project_id=project_id,
         region=region,
         model_name=model_name,
-        endpoint_name=endpoint_name
+        endpoint_name=endpoint_name,
+        trace_path=trace_path,
+        profile_sample_rate=profile_sample_rate,
+        machine_type=machine_type,
+        min_replica_count=min_replica_count,
+        max_replica_count=max_replica_count
     )
\ No newline at end of file
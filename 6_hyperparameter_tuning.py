@@ -1,9 +1,13 @@
 # hyperparameter_tuning.py
-from google.cloud import aiplatform
-from google.cloud.aiplatform import hyperparameter_tuning as hpt
+
+# Search space shared by the remote tuning job and the local engine
+LEARNING_RATE_RANGE = (0.001, 0.1)
+MAX_ITER_RANGE = (100, 2000)
 
 def create_hyperparameter_tuning_job():
     """Create hyperparameter tuning job"""
+    from google.cloud import aiplatform
+    from google.cloud.aiplatform import hyperparameter_tuning as hpt
     
     # Define the worker pool spec
     worker_pool_specs = [
@@ -25,8 +29,12 @@ def create_hyperparameter_tuning_job():
     
     # Define hyperparameter search space
     parameter_spec = {
-        "learning_rate": hpt.DoubleParameterSpec(min=0.001, max=0.1, scale="log"),
-        "max_iter": hpt.IntegerParameterSpec(min=100, max=2000, scale="linear"),
+        "learning_rate": hpt.DoubleParameterSpec(
+            min=LEARNING_RATE_RANGE[0], max=LEARNING_RATE_RANGE[1], scale="log"
+        ),
+        "max_iter": hpt.IntegerParameterSpec(
+            min=MAX_ITER_RANGE[0], max=MAX_ITER_RANGE[1], scale="linear"
+        ),
     }
     
     # Define optimization metric
@@ -44,4 +52,45 @@ def create_hyperparameter_tuning_job():
     
     job.run()
     
-    return job
\ No newline at end of file
+    return job
+
+def run_local_hyperparameter_tuning(
+    dataset_path: str = None,
+    max_trial_count: int = 20,
+    parallel_trial_count: int = 0
+):
+    """Run the same search locally with ASHA early stopping on a process pool"""
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder
+    from local_mlops.datasource import read_dataset_arrays
+    from local_mlops.tuning import run_asha
+    
+    # Same split as train_model so accuracies are comparable
+    X, species = read_dataset_arrays(dataset_path)
+    y = LabelEncoder().fit_transform(species)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42
+    )
+    
+    result = run_asha(
+        X_train, y_train, X_test, y_test,
+        learning_rate_range=LEARNING_RATE_RANGE,
+        max_iter_range=MAX_ITER_RANGE,
+        max_trial_count=max_trial_count,
+        parallel_trial_count=parallel_trial_count
+    )
+    
+    print(f"Best trial: {result['best_trial']}")
+    print(f"{result['trial_count']} trials ({result['completed_trial_count']} ran to completion) "
+          f"on {result['workers']} workers in {result['elapsed_s']:.2f}s "
+          f"= {result['trials_per_second']:.1f} trials/s")
+    
+    return result
+
+if __name__ == "__main__":
+    import sys
+    
+    if "--local" in sys.argv:
+        run_local_hyperparameter_tuning()
+    else:
+        create_hyperparameter_tuning_job()
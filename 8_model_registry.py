@@ -1,28 +1,58 @@
 # model_registry.py
-from google.cloud import aiplatform
+import os
 
 PROJECT_ID="udemy-mlops-471512"
 REGION="us-central1"
 
-def register_model_version(model_path: str, version_description: str):
-    """Register a new model version"""
+# Local index of versions/aliases with content-addressed artifacts (see local_mlops.registry_index)
+REGISTRY_INDEX_ROOT = os.getenv("REGISTRY_INDEX_ROOT", os.path.expanduser("~/.iris_registry"))
+
+def register_model_version(model_path: str, version_description: str, local_artifact_path: str = None):
+    """Register a new model version
+    
+    When the local copy of the artifact is given and its bytes are already registered,
+    the existing version is returned instead of uploading again.
+    """
+    from google.cloud import aiplatform
+    from local_mlops.registry_index import RegistryIndex
+    from local_mlops.step_cache import fingerprint_file
     
     aiplatform.init(project=PROJECT_ID, location=REGION)
     
+    index = RegistryIndex(REGISTRY_INDEX_ROOT)
+    if local_artifact_path:
+        existing = index.find_digest(fingerprint_file(local_artifact_path))
+        if existing is not None:
+            model_id, version_id = existing
+            return aiplatform.Model(model_name=model_id, version=version_id)
+    
     # Upload new model version
+    labels = {"framework": "scikit-learn", "task": "classification"}
     model = aiplatform.Model.upload(
         display_name="iris-classifier",
         artifact_uri=model_path,
         serving_container_image_uri="gcr.io/cloud-aiplatform/prediction/sklearn-cpu.1-0:latest",
         version_description=version_description,
         version_aliases=["latest"],
-        labels={"framework": "scikit-learn", "task": "classification"}
+        labels=labels
     )
     
+    if local_artifact_path:
+        index.register(
+            model.name,
+            local_artifact_path,
+            description=version_description,
+            labels=labels,
+            aliases=["latest"],
+            version_id=model.version_id
+        )
+    
     return model
 
 def promote_model_to_production(model_id: str, version_id: str):
     """Promote model version to production"""
+    from google.cloud import aiplatform
+    from local_mlops.registry_index import RegistryIndex
     
     model = aiplatform.Model(model_name=model_id)
     
@@ -38,4 +68,38 @@ def promote_model_to_production(model_id: str, version_id: str):
         version=version_id
     )
     
-    return model
\ No newline at end of file
+    # Keep the local alias index in step when it knows this version
+    index = RegistryIndex(REGISTRY_INDEX_ROOT)
+    if version_id in index.index["models"].get(model_id, {}).get("versions", {}):
+        index.set_aliases(model_id, version_id, add=["production", "stable"], remove=["staging"])
+    
+    # Cached predictions from the previous production version are no longer valid. This
+    # clears caches in this process; serving processes built with registry_version_fn
+    # follow the "production" alias in the index updated above.
+    from local_mlops.prediction_cache import invalidate_caches
+    invalidate_caches(model_id, version_id)
+    
+    return model
+
+def resolve_model_alias(model_id: str, alias: str = "production") -> str:
+    """Resolve an alias to a version id from the local index, without a remote call"""
+    from local_mlops.registry_index import RegistryIndex
+    
+    return RegistryIndex(REGISTRY_INDEX_ROOT).resolve(model_id, alias)
+
+def serve_model_aliases(model_id: str, aliases: list = ("production", "staging"), workers: int = 2, port: int = 8080):
+    """Serve several aliases of a model from pre-forked workers sharing memory-mapped weights
+    
+    Aliases moved by promote_model_to_production (or sync_model_registry) are hot-swapped
+    in the running workers, instead of deploying a new replica set per version.
+    """
+    from local_mlops.prefork import serve
+    
+    serve(registry_model=model_id, aliases=list(aliases), registry_root=REGISTRY_INDEX_ROOT, workers=workers, port=port)
+
+def sync_model_registry(model_id: str):
+    """Pull versions and aliases from the Vertex AI Model Registry into the local index"""
+    from local_mlops.registry_index import RegistryIndex, VertexRemote
+    
+    remote = VertexRemote(model_id, PROJECT_ID, REGION)
+    return RegistryIndex(REGISTRY_INDEX_ROOT).sync(remote)
@@ -1,17 +1,25 @@
 # explainability.py
-from google.cloud import aiplatform
+import os
 
 PROJECT_ID="udemy-mlops-471512"
 REGION="us-central1"
 
-def setup_model_explanations():
+# Endpoint sizing written by `mlops.py capacity --explain-qps ...`
+CAPACITY_PLAN = os.getenv("CAPACITY_PLAN", "capacity_plan.json")
+
+# Sampled Shapley paths, used remotely and by the local fallback for non-linear models
+PATH_COUNT = 10
+
+def setup_model_explanations(capacity_plan_path: str = CAPACITY_PLAN):
     """Set up model explanations using Vertex AI"""
+    from google.cloud import aiplatform
+    from local_mlops.capacity import deployment_config, load_capacity_plan
     
     # Define explanation parameters
     explanation_parameters = aiplatform.explain.ExplanationParameters(
         {
             "sampled_shapley_attribution": {
-                "path_count": 10
+                "path_count": PATH_COUNT
             }
         }
     )
@@ -29,13 +37,16 @@ def setup_model_explanations():
         endpoint=endpoint,
         deployed_model_display_name="iris-with-explanations",
         explanation_parameters=explanation_parameters,
-        machine_type="n1-standard-2"
+        # Sized for sampled Shapley cost when the plan has an explanation section, otherwise
+        # one n1-standard-2 replica as before
+        **deployment_config(load_capacity_plan(capacity_plan_path), "explanation")
     )
     
     return endpoint
 
 def get_prediction_with_explanation(endpoint_name: str, instances: list):
     """Get prediction with explanation"""
+    from google.cloud import aiplatform
     
     endpoint = aiplatform.Endpoint(endpoint_name)
     
@@ -44,4 +55,16 @@ def get_prediction_with_explanation(endpoint_name: str, instances: list):
     predictions = response.predictions
     explanations = response.explanations
     
-    return predictions, explanations
\ No newline at end of file
+    return predictions, explanations
+
+def get_local_prediction_with_explanation(model_path: str, instances: list):
+    """Get prediction with explanation from the train_model artifact, without an endpoint"""
+    import joblib
+    from local_mlops.explain import explain
+    
+    model_artifacts = joblib.load(model_path)
+    
+    # Exact batched attributions for the linear model, sampled Shapley otherwise
+    predictions, explanations = explain(model_artifacts, instances, path_count=PATH_COUNT)
+    
+    return predictions, explanations
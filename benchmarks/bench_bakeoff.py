@@ -0,0 +1,52 @@
+# bench_bakeoff.py
+# Wall time of the multi-estimator k-fold bake-off vs worker count (cancellation off, so every
+# run does the same work), then the jobs and time saved by cancelling clearly losing candidates.
+#
+#   python benchmarks/bench_bakeoff.py --rows 20000 --folds 5
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_mlops.bakeoff import DEFAULT_CANDIDATES, run_bakeoff
+from local_mlops.datasource import FEATURE_COLUMNS, TARGET_COLUMN, iter_synthetic_iris
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel bake-off scaling and early cancellation")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    frame = next(iter_synthetic_iris(args.rows, chunk_size=args.rows))
+    X = frame[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+    y = np.unique(frame[TARGET_COLUMN].to_numpy(), return_inverse=True)[1]
+    jobs = len(DEFAULT_CANDIDATES) * args.folds
+    print(f"{args.rows:,} rows, {len(DEFAULT_CANDIDATES)} candidates x {args.folds} folds = {jobs} jobs "
+          f"({os.cpu_count()} CPUs)")
+
+    worker_counts = sorted({1, args.max_workers} | {w for w in (2, 4, 8, 16, 32) if w < args.max_workers})
+    baseline = None
+    for workers in worker_counts:
+        result = run_bakeoff(X, y, cv_folds=args.folds, workers=workers, cancel_losers=False)
+        baseline = baseline or result["cv_elapsed_s"]
+        speedup = baseline / result["cv_elapsed_s"]
+        print(f"workers {workers:>2}  {result['cv_elapsed_s']:6.2f} s  speedup {speedup:4.1f}x  "
+              f"efficiency {speedup / workers:4.0%}  winner {result['winner']}")
+
+    result = run_bakeoff(X, y, cv_folds=args.folds, workers=args.max_workers)
+    print(f"with cancellation ({args.max_workers} workers): {result['cv_elapsed_s']:.2f} s, "
+          f"{result['jobs_run']}/{result['jobs_total']} jobs, {result['cancelled_count']} candidates cancelled, "
+          f"winner {result['winner']}")
+    for entry in result["leaderboard"]:
+        status = "cancelled" if entry["cancelled"] else ""
+        print(f"  {entry['name']:<24} {entry['cv_accuracy']:.4f} ± {entry['cv_accuracy_std']:.4f}  "
+              f"{entry['folds_run']} folds  {entry['fit_seconds']:6.2f} s  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# bench_data_stats.py
+# Throughput of the single-pass, mergeable column statistics behind validate_data on a
+# synthetic Iris-shaped Arrow IPC file, with 1 and N worker processes, then a rerun after
+# appending rows (StatsCache scans only the new ones).
+#
+#   python benchmarks/bench_data_stats.py --rows 20000000 --workers 4
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_mlops.data_stats import StatsCache, compute_stats, validate_stats
+from local_mlops.preprocessing import arrow_schema, load_schema
+
+
+def write_dataset(path: str, config: dict, rows: int, batch_rows: int = 65536, seed: int = 0, mode: str = "wb"):
+    """Iris-like rows in load_data's layout (float32 features, string species), one batch per write"""
+    rng = np.random.default_rng(seed)
+    schema = arrow_schema(config)
+    categories = pa.array(config["validation"]["columns"]["species"]["categories"])
+    with pa.OSFile(path, mode) as sink, pa.ipc.new_file(sink, schema) as writer:
+        for start in range(0, rows, batch_rows):
+            n = min(batch_rows, rows - start)
+            features = [pa.array(rng.uniform(0.1, 8.0, n).astype(np.float32)) for _ in config["features"]]
+            codes = pa.array(rng.integers(0, len(categories), n).astype(np.int32))
+            species = pa.DictionaryArray.from_arrays(codes, categories).cast(pa.string())
+            writer.write_batch(pa.RecordBatch.from_arrays(features + [species], schema=schema))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark single-pass dataset statistics and validation")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--append-fraction", type=float, default=0.05)
+    args = parser.parse_args()
+
+    config = load_schema("iris")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dataset.arrow")
+        write_dataset(path, config, args.rows)
+        size_mb = os.path.getsize(path) / (1 << 20)
+        print(f"{args.rows:,} rows, {size_mb:.0f} MB Arrow IPC")
+
+        for workers in sorted({1, args.workers}):
+            start = time.perf_counter()
+            stats = compute_stats(path, config, workers=workers)
+            elapsed = time.perf_counter() - start
+            print(f"  full scan, {workers} worker(s): {elapsed:.2f} s, {size_mb / elapsed:.0f} MB/s, "
+                  f"{stats.rows / elapsed / 1e6:.1f} M rows/s, violations: {validate_stats(stats, config) or 'none'}")
+
+        cache = StatsCache(os.path.join(tmp, "cache"))
+        cache.stats("bench", path, config, args.workers)
+        # Grown table: the same rows followed by new ones, in a new file as load_data would write it
+        grown = os.path.join(tmp, "grown.arrow")
+        new_rows = int(args.rows * args.append_fraction)
+        write_dataset(os.path.join(tmp, "new.arrow"), config, new_rows, seed=1)
+        with pa.OSFile(grown, "wb") as sink, pa.ipc.new_file(sink, arrow_schema(config)) as writer:
+            for part in (path, os.path.join(tmp, "new.arrow")):
+                reader = pa.ipc.open_file(pa.memory_map(part, "r"))
+                for i in range(reader.num_record_batches):
+                    writer.write_batch(reader.get_batch(i))
+        start = time.perf_counter()
+        stats, scanned = cache.stats("bench", grown, config, args.workers)
+        elapsed = time.perf_counter() - start
+        full = compute_stats(grown, config, workers=args.workers)
+        same = abs(full.columns["petal_width"].mean - stats.columns["petal_width"].mean) < 1e-9
+        print(f"  after appending {new_rows:,} rows: {elapsed:.2f} s with the cache, {scanned:,} rows scanned "
+              f"(matches a full rescan: {same})")
+        shutil.rmtree(os.path.join(tmp, "cache"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# bench_dataset_io.py
+# Compare the CSV hand-off between load_data and train_model with the Arrow IPC one.
+# Each measurement runs in a fresh subprocess so peak RSS is not shared between runs.
+#
+#   python benchmarks/bench_dataset_io.py --rows 100000 1000000 10000000
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from local_mlops.artifacts import LocalArtifact
+
+FEATURES = ['sepal_length', 'sepal_width', 'petal_length', 'petal_width']
+
+
+def run_csv(db_path: str, out_path: str):
+    """Original path: full DataFrame -> CSV -> pd.read_csv"""
+    import sqlite3
+    import pandas as pd
+
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query(f"SELECT {', '.join(FEATURES)}, species FROM iris_data", conn)
+    conn.close()
+    df.to_csv(out_path, index=False)
+    del df
+
+    df = pd.read_csv(out_path)
+    X = df[FEATURES]
+    return len(X)
+
+
+def run_arrow(db_path: str, out_path: str):
+    """New path: streamed record batches -> Arrow IPC -> memory-mapped read"""
+    import numpy as np
+    import pyarrow as pa
+
+    pipeline = importlib.import_module("5_training_pipeline")
+    pipeline.load_data.python_func(
+        project_id="local", dataset=LocalArtifact(out_path), profile=LocalArtifact(out_path + ".profile.json"),
+        source="sqlite", source_uri=db_path
+    )
+
+    with pa.memory_map(out_path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    X = np.empty((table.num_rows, len(FEATURES)), dtype=np.float32, order='F')
+    for i, name in enumerate(FEATURES):
+        offset = 0
+        for chunk in table.column(name).chunks:
+            X[offset:offset + len(chunk), i] = chunk.to_numpy(zero_copy_only=True)
+            offset += len(chunk)
+    return len(X)
+
+
+def measure(mode: str, db_path: str):
+    """Run one mode in this process and print wall time / peak RSS as JSON"""
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = os.path.join(tmp, "dataset")
+        start = time.perf_counter()
+        rows = run_csv(db_path, out_path) if mode == "csv" else run_arrow(db_path, out_path)
+        wall = time.perf_counter() - start
+        size = os.path.getsize(out_path)
+    # VmHWM is reset on exec, unlike ru_maxrss which keeps the forking parent's peak
+    with open("/proc/self/status") as f:
+        peak_rss_mb = next(int(l.split()[1]) for l in f if l.startswith("VmHWM")) / 1024
+    print(json.dumps({
+        "mode": mode, "rows": rows, "wall_s": round(wall, 3),
+        "peak_rss_mb": round(peak_rss_mb, 1), "artifact_mb": round(size / 2**20, 1)
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the load_data -> train_model dataset hand-off")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--measure", choices=["csv", "arrow"], help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure, args.db)
+        return
+
+    from local_mlops.datasource import create_local_iris_table
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            db_path = os.path.join(tmp, f"iris_{rows}.db")
+            create_local_iris_table(db_path, num_rows=rows)
+            for mode in ("csv", "arrow"):
+                out = subprocess.run(
+                    [sys.executable, __file__, "--measure", mode, "--db", db_path],
+                    check=True, capture_output=True, text=True
+                )
+                result = json.loads(out.stdout.strip().splitlines()[-1])
+                results.append(result)
+                print(f"{rows:>10} rows  {mode:<5}  {result['wall_s']:>8.3f} s  "
+                      f"{result['peak_rss_mb']:>8.1f} MB peak RSS  {result['artifact_mb']:>7.1f} MB artifact")
+            os.remove(db_path)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
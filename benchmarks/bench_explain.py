@@ -0,0 +1,58 @@
+# bench_explain.py
+# Latency and throughput of exact linear attributions vs sampled Shapley (path_count=10).
+#
+#   python benchmarks/bench_explain.py --batch 1 64 1024
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_mlops.datasource import read_dataset_arrays
+from local_mlops.explain import linear_attributions, sampled_shapley_attributions
+
+
+def train_artifacts():
+    """Fit the same model train_model produces"""
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import LabelEncoder
+
+    X, species = read_dataset_arrays()
+    le = LabelEncoder()
+    y = le.fit_transform(species)
+    clf = LogisticRegression(C=100, max_iter=1000, random_state=42).fit(X, y)
+    return clf, X
+
+
+def timed(fn, repeats: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local feature attributions")
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 64, 1024])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    clf, X_all = train_artifacts()
+    baseline = X_all.mean(axis=0).astype(np.float64)
+    rng = np.random.default_rng(0)
+
+    for batch in args.batch:
+        X = X_all[rng.integers(0, len(X_all), batch)]
+        exact = timed(lambda: linear_attributions(clf, X, baseline), args.repeats)
+        sampled = timed(lambda: sampled_shapley_attributions(clf, X, baseline, 10), args.repeats)
+        print(f"batch {batch:>5}: exact {exact * 1e3:8.3f} ms ({batch / exact:>12,.0f} rows/s)  "
+              f"sampled {sampled * 1e3:8.3f} ms ({batch / sampled:>10,.0f} rows/s)  "
+              f"speedup {sampled / exact:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# bench_feature_serving.py
+# Hit ratio and lookup latency of the feature serving client on Zipf-distributed entity lookups,
+# against a SQLite online store: no cache, per-process LRU, and LRU plus the shared-memory tier
+# across worker processes.
+#
+#   python benchmarks/bench_feature_serving.py --entities 100000 --lookups 20000 --workers 4
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_mlops.feature_serving import FEATURE_IDS, FeatureServingClient, SharedMemoryTier, SqliteBackend
+
+
+def lookups(entities: int, count: int, batch: int, seed: int) -> list:
+    rng = np.random.default_rng(seed)
+    ids = (rng.zipf(1.2, size=(count, batch)) - 1) % entities
+    return [[f"e{i}" for i in row] for row in ids]
+
+
+def run_worker(db_path, requests, max_entries, ttl_s, tier_args, results):
+    tier = SharedMemoryTier(len(FEATURE_IDS), *tier_args) if tier_args else None
+    client = FeatureServingClient(SqliteBackend(db_path), max_entries=max_entries, ttl_s=ttl_s, shared_tier=tier)
+    for entity_ids in requests:
+        client.read(entity_ids)
+    results.put(client.stats())
+    if tier is not None:
+        tier.shm.close()
+
+
+def run(label, db_path, args, max_entries, ttl_s, tier):
+    results = multiprocessing.Queue()
+    tier_args = (tier.slots, tier.name, tier.lock) if tier is not None else None
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(
+            db_path, lookups(args.entities, args.lookups, args.batch, seed), max_entries, ttl_s, tier_args, results
+        ))
+        for seed in range(args.workers)
+    ]
+    for w in workers:
+        w.start()
+    stats = [results.get() for _ in workers]
+    for w in workers:
+        w.join()
+    hit = np.mean([s["hit_ratio"] for s in stats])
+    shared = np.mean([s["shared_hit_ratio"] for s in stats])
+    p50 = np.mean([s["p50_ms"] for s in stats])
+    p99 = max(s["p99_ms"] for s in stats)
+    print(f"{label:<22} hit {hit:6.1%}  (shared {shared:6.1%})  p50 {p50:7.3f} ms  p99 {p99:7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cached online feature lookups")
+    parser.add_argument("--entities", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=20_000, help="Lookups per worker")
+    parser.add_argument("--batch", type=int, default=8, help="Entities per lookup")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--cache-entries", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "online.db")
+        backend = SqliteBackend(db_path)
+        rng = np.random.default_rng(0)
+        backend.write([f"e{i}" for i in range(args.entities)], rng.normal(size=(args.entities, len(FEATURE_IDS))))
+        backend.conn.close()
+
+        run("no cache", db_path, args, max_entries=0, ttl_s=-1.0, tier=None)
+        run("per-process LRU", db_path, args, args.cache_entries, 60.0, None)
+        tier = SharedMemoryTier(len(FEATURE_IDS), slots=4 * args.cache_entries)
+        try:
+            run("LRU + shared tier", db_path, args, args.cache_entries, 60.0, tier)
+        finally:
+            tier.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# bench_incremental.py
+# Daily load + retrain cost of the incremental (watermark + warm start) path vs a full reload
+# and cold fit, as the table grows.
+#
+#   python benchmarks/bench_incremental.py --initial 1000000 --daily 20000 --days 5
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from local_mlops.datasource import append_local_iris_rows, create_local_iris_table, iter_synthetic_iris
+from local_mlops.incremental import IncrementalTrainer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental vs full retraining")
+    parser.add_argument("--initial", type=int, default=500_000)
+    parser.add_argument("--daily", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "iris.db")
+        day = pd.Timestamp("2024-01-01")
+        create_local_iris_table(db_path, num_rows=args.initial, feature_timestamp=str(day))
+
+        incremental = IncrementalTrainer(os.path.join(tmp, "incremental"), "sqlite", db_path)
+        full = IncrementalTrainer(os.path.join(tmp, "full"), "sqlite", db_path)
+        incremental.run()
+
+        for d in range(1, args.days + 1):
+            stamp = str(day + pd.Timedelta(days=d))
+            append_local_iris_rows(db_path, iter_synthetic_iris(args.daily, seed=d), feature_timestamp=stamp)
+            inc = incremental.run()
+            ful = full.run(full=True)
+            inc_s = inc["load_s"] + inc["train_s"]
+            full_s = ful["load_s"] + ful["train_s"]
+            print(f"day {d}: {ful['samples_count']:>10,} rows  "
+                  f"full {full_s:7.2f}s (load {ful['load_s']:.2f}, fit {ful['train_s']:.2f}, {ful['n_iter']} iter)  "
+                  f"incremental {inc_s:7.2f}s (load {inc['load_s']:.2f}, fit {inc['train_s']:.2f}, "
+                  f"{inc['n_iter']} iter)  saved {full_s - inc_s:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
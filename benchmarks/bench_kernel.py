@@ -0,0 +1,88 @@
+# bench_kernel.py
+# Cold start and per-batch latency of the NumPy kernel vs the joblib/scikit-learn artifact.
+#
+#   python benchmarks/bench_kernel.py /tmp/model.joblib
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Run in a fresh interpreter so imports are really cold
+COLD_START = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+t0 = time.perf_counter()
+if {mode!r} == "joblib":
+    import joblib, sklearn.linear_model
+else:
+    from local_mlops.kernel import NumpyPredictor
+t1 = time.perf_counter()
+if {mode!r} == "joblib":
+    predictor = joblib.load({path!r})
+else:
+    predictor = NumpyPredictor({path!r})
+t2 = time.perf_counter()
+# VmHWM is reset on exec, unlike ru_maxrss which keeps the forking parent's peak
+hwm_kb = next(int(l.split()[1]) for l in open("/proc/self/status") if l.startswith("VmHWM"))
+print(json.dumps({{"import_ms": (t1 - t0) * 1e3, "load_ms": (t2 - t1) * 1e3, "rss_mb": hwm_kb / 1024}}))
+"""
+
+
+def cold_start(mode: str, path: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", COLD_START.format(root=ROOT, mode=mode, path=path)],
+        check=True, capture_output=True, text=True
+    )
+    return json.loads(out.stdout)
+
+
+def per_batch_us(fn, X, repeats: int) -> float:
+    fn(X)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(X)
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the NumPy kernel against joblib/scikit-learn")
+    parser.add_argument("model_path")
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 32, 1024])
+    parser.add_argument("--repeats", type=int, default=1000)
+    args = parser.parse_args()
+
+    import joblib
+    from local_mlops.kernel import NumpyPredictor, export_kernel
+
+    with tempfile.TemporaryDirectory() as tmp:
+        kernel_path = export_kernel(args.model_path, os.path.join(tmp, "kernel.npz"))
+        print(f"artifact sizes: joblib {os.path.getsize(args.model_path)} B, "
+              f"kernel {os.path.getsize(kernel_path)} B")
+
+        for mode, path in (("joblib", args.model_path), ("kernel", kernel_path)):
+            stats = cold_start(mode, path)
+            print(f"{mode:<7} import {stats['import_ms']:8.1f} ms  load {stats['load_ms']:7.2f} ms  "
+                  f"peak RSS {stats['rss_mb']:6.1f} MB")
+
+        clf = joblib.load(args.model_path)["model"]
+        predictor = NumpyPredictor(kernel_path)
+        rng = np.random.default_rng(0)
+        for batch in args.batch:
+            X = rng.uniform([4.3, 2.0, 1.0, 0.1], [7.9, 4.4, 6.9, 2.5], size=(batch, 4))
+            max_err = np.abs(clf.predict_proba(X) - predictor.predict_proba(X)).max()
+            sk = per_batch_us(clf.predict_proba, X, args.repeats)
+            np_us = per_batch_us(predictor.predict_proba, X, args.repeats)
+            print(f"batch {batch:>5}: sklearn {sk:9.1f} us  kernel {np_us:9.1f} us  "
+                  f"speedup {sk / np_us:5.1f}x  max |dp| {max_err:.2e}")
+
+
+if __name__ == "__main__":
+    main()
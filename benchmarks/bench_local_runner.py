@@ -0,0 +1,45 @@
+# bench_local_runner.py
+# End-to-end wall time of iris_training_pipeline run locally by LocalPipelineRunner, in
+# thread and process mode, with the per-step timeline of each run. The first run of the
+# benchmark pays the cold imports (kfp, sklearn, pyarrow); forked process workers inherit
+# them afterwards, so later runs of both modes are warm.
+#
+#   python benchmarks/bench_local_runner.py --repeats 3
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_mlops.datasource import create_local_iris_table
+from local_mlops.local_runner import LocalPipelineRunner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local pipeline runs (thread vs process workers)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--candidates", default="", help="Passed to train_model, e.g. 'default' for the bake-off")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "iris.db")
+        create_local_iris_table(db_path)
+        arguments = {"data_source": "sqlite", "data_source_uri": db_path, "candidates": args.candidates}
+        for mode in ("thread", "process"):
+            runner = LocalPipelineRunner(root=os.path.join(tmp, "runs"), workers=args.workers, mode=mode)
+            walls = []
+            for _ in range(args.repeats):
+                with runner.run(arguments) as run:
+                    walls.append(run.wall_s)
+            warm = walls[1:] or walls
+            print(f"{mode} ({runner.workers} workers): first run {walls[0]:.2f} s, then wall p50 "
+                  f"{np.median(warm):.2f} s, min {min(warm):.2f} s over {len(warm)} runs; last run:")
+            print(run.format_timeline())
+
+
+if __name__ == "__main__":
+    main()
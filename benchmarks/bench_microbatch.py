@@ -0,0 +1,50 @@
+# bench_microbatch.py
+# Requests/s of the micro-batching server path vs one predict call per request.
+#
+#   python benchmarks/bench_microbatch.py /tmp/model.joblib --concurrency 64
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_mlops.server import MicroBatcher, load_model_artifacts, make_predict_fn
+
+INSTANCE = [[5.1, 3.5, 1.4, 0.2]]
+
+
+async def drive(batcher: MicroBatcher, concurrency: int, requests: int) -> float:
+    batcher.start()
+    per_client = requests // concurrency
+
+    async def client():
+        for _ in range(per_client):
+            await batcher.submit(INSTANCE)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await batcher.stop()
+    return per_client * concurrency / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark micro-batching against per-request predict")
+    parser.add_argument("model_path")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--max-wait-us", type=int, default=500)
+    args = parser.parse_args()
+
+    predict = make_predict_fn(load_model_artifacts(args.model_path))
+    for max_batch_size in (1, 8, 64, 256):
+        batcher = MicroBatcher(predict, max_batch_size, args.max_wait_us)
+        qps = asyncio.run(drive(batcher, args.concurrency, args.requests))
+        print(f"max_batch_size {max_batch_size:>4}: {qps:>10,.0f} req/s  "
+              f"(mean batch {batcher.rows / max(batcher.batches, 1):.1f} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# bench_prediction_log.py
+# Latency PredictionLogger.log adds to single-row requests (rate and reservoir sampling), what a
+# full ring under backpressure costs, and that the written files feed the drift engine.
+#
+#   python benchmarks/bench_prediction_log.py --requests 200000
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_mlops.datasource import FEATURE_COLUMNS, read_dataset_arrays
+from local_mlops.drift import DriftEngine, HistogramSketch
+from local_mlops.prediction_log import PredictionLogger, iter_logged_features, logged_files
+
+CLASSES = ["Iris-setosa", "Iris-versicolor", "Iris-virginica"]
+
+
+def measure(logger, rows: list, proba: np.ndarray, requests: int) -> np.ndarray:
+    latencies = np.empty(requests)
+    for i in range(requests):
+        X = rows[i % len(rows)]
+        start = time.perf_counter()
+        logger.log(X, proba)
+        latencies[i] = time.perf_counter() - start
+    return latencies * 1e6
+
+
+def report(label: str, latencies: np.ndarray, stats: dict):
+    print(f"{label:<22} mean {latencies.mean():5.2f} µs  p50 {np.percentile(latencies, 50):5.2f} µs  "
+          f"p99 {np.percentile(latencies, 99):5.2f} µs  max {latencies.max():8.1f} µs  "
+          f"written {stats['written']:,}  dropped {stats['dropped']:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sampled prediction logging overhead")
+    parser.add_argument("--requests", type=int, default=200_000)
+    args = parser.parse_args()
+
+    X, _ = read_dataset_arrays()
+    rows = [X[i:i + 1].astype(np.float64) for i in range(len(X))]
+    proba = np.array([[0.1, 0.7, 0.2]])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, options in (
+            ("rate 0.1", {"sample_rate": 0.1}),
+            ("rate 1.0", {"sample_rate": 1.0}),
+            ("reservoir 1000/s", {"reservoir_size": 1000}),
+        ):
+            log_dir = os.path.join(tmp, label.replace(" ", "_").replace("/", "_"))
+            with PredictionLogger(log_dir, FEATURE_COLUMNS, CLASSES, seed=0, **options) as logger:
+                latencies = measure(logger, rows, proba, args.requests)
+            report(label, latencies, logger.stats())
+
+        # Backpressure: a ring that the flusher only drains every 10 s fills up; log() keeps dropping
+        with PredictionLogger(os.path.join(tmp, "full"), FEATURE_COLUMNS, CLASSES, sample_rate=1.0,
+                              capacity=4096, flush_rows=4096 + 1, flush_interval_s=10.0) as logger:
+            latencies = measure(logger, rows, proba, args.requests)
+        report("full ring (drops)", latencies, logger.stats())
+
+        # The files feed offline drift analysis over the same four features
+        log_dir = os.path.join(tmp, "rate_1.0")
+        baseline = HistogramSketch.from_baseline(FEATURE_COLUMNS, X)
+        thresholds = {name: 0.1 for name in FEATURE_COLUMNS}
+        engine = DriftEngine(baseline, thresholds, thresholds, window_size=50_000)
+        for block in iter_logged_features(log_dir, FEATURE_COLUMNS):
+            engine.update(block)
+        print(f"drift check over {len(logged_files(log_dir))} file(s): {engine.rows_seen:,} rows, "
+              f"{engine.windows_evaluated} windows evaluated")
+
+
+if __name__ == "__main__":
+    main()
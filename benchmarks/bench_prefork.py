@@ -0,0 +1,112 @@
+# bench_prefork.py
+# Pre-forked multi-model serving: per-worker memory with memory-mapped vs private weights,
+# and a hot swap under load (dropped requests, swap pause, latency around the swap).
+#
+#   python benchmarks/bench_prefork.py --workers 4 --features 200000 --classes 50
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_mlops.kernel import KERNEL_FORMAT_VERSION, save_kernel
+from local_mlops.loadgen import HttpTarget
+from local_mlops.prefork import PreforkModelServer, format_memory
+
+
+def write_kernel(path: str, features: int, classes: int, seed: int) -> str:
+    rng = np.random.default_rng(seed)
+    arrays = {
+        "format_version": np.int32(KERNEL_FORMAT_VERSION),
+        "coef": rng.normal(size=(classes, features)).astype(np.float32),
+        "intercept": rng.normal(size=classes).astype(np.float32),
+        "classes": np.array([f"class_{i}" for i in range(classes)]),
+        "feature_names": np.array([f"f{i}" for i in range(features)]),
+        "link": np.str_("softmax"),
+    }
+    with open(path, "wb") as f:
+        save_kernel(f, arrays)
+    return path
+
+
+def swap_under_load(server: PreforkModelServer, name: str, new_path: str, clients: int, seconds: float) -> dict:
+    """Closed-loop clients on one model while it is swapped halfway through"""
+    target = HttpTarget(server.url, f"/models/{name}/predict")
+    records, errors = [], []
+    stop = threading.Event()
+
+    def client(seed):
+        rng = np.random.default_rng(seed)
+        while not stop.is_set():
+            payload = {"instances": rng.normal(size=(1, 4)).tolist()}
+            start = time.perf_counter()
+            try:
+                response = target(payload)
+            except Exception as e:
+                errors.append(repr(e))
+                continue
+            records.append((start, time.perf_counter() - start, response["version"]))
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds / 2)
+    swap_start = time.perf_counter()
+    result = server.swap({name: new_path})
+    swap_end = time.perf_counter()
+    time.sleep(seconds / 2)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    before = [latency for start, latency, _ in records if start < swap_start]
+    during = [latency for start, latency, _ in records if swap_start <= start <= swap_end]
+    # A request may be answered by the old version only if it started before the last worker committed
+    last_old = max((start for start, _, version in records if version != os.path.basename(new_path)), default=0.0)
+    return dict(result, requests=len(records), errors=len(errors), sample_errors=errors[:3],
+                old_version_after_commit_s=max(0.0, last_old - swap_end),
+                p99_before_ms=float(np.percentile(before, 99)) * 1e3 if before else 0.0,
+                max_during_ms=max(during) * 1e3 if during else 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pre-forked serving with shared weights and hot swap")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--features", type=int, default=200_000, help="Width of the large model (memory test)")
+    parser.add_argument("--classes", type=int, default=50)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=2.0, help="Load duration around the swap")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        large = write_kernel(os.path.join(tmp, "large.npz"), args.features, args.classes, seed=0)
+        print(f"Large model: {os.path.getsize(large) / (1 << 20):.1f} MB kernel file, {args.workers} workers")
+        for mmap in (False, True):
+            with PreforkModelServer({"large": large}, args.workers, mmap=mmap) as server:
+                print("memory-mapped weights:" if mmap else "private copy per worker:")
+                print(format_memory(server.stats()))
+
+        v1 = write_kernel(os.path.join(tmp, "iris-v1.npz"), 4, 3, seed=1)
+        v2 = write_kernel(os.path.join(tmp, "iris-v2.npz"), 4, 3, seed=2)
+        staging = write_kernel(os.path.join(tmp, "iris-staging.npz"), 4, 3, seed=3)
+        with PreforkModelServer({"production": v1, "staging": staging, "large": large}, args.workers) as server:
+            result = swap_under_load(server, "production", v2, args.clients, args.seconds)
+            print(f"Hot swap of production under {args.clients} clients: {result['requests']} requests, "
+                  f"{result['errors']} errors {result['sample_errors'] or ''}")
+            print(f"  prepare {result['prepare_s'] * 1e3:.1f} ms, total {result['total_s'] * 1e3:.1f} ms, "
+                  f"commit skew across workers {result['commit_skew_s'] * 1e3:.2f} ms")
+            print(f"  commit pause per worker <= {result['max_commit_pause_s'] * 1e6:.0f} us, longest event-loop "
+                  f"stall during the swap {result['max_loop_stall_s'] * 1e3:.2f} ms")
+            print(f"  request latency p99 before {result['p99_before_ms']:.2f} ms, max while swapping "
+                  f"{result['max_during_ms']:.2f} ms; old version seen "
+                  f"{result['old_version_after_commit_s'] * 1e3:.2f} ms after swap() returned")
+            print(format_memory(server.stats()))
+
+
+if __name__ == "__main__":
+    main()
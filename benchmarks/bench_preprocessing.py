@@ -0,0 +1,117 @@
+# bench_preprocessing.py
+# Peak RSS and time of the pandas float64 preprocessing path vs TabularTransform.split,
+# each measured in a fresh subprocess on a wide Arrow IPC file (float64 columns, as a
+# FLOAT64 BigQuery export would arrive).
+#
+#   python benchmarks/bench_preprocessing.py --rows 1000000 --columns 30
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def write_dataset(path: str, rows: int, columns: int):
+    import numpy as np
+    import pyarrow as pa
+
+    rng = np.random.default_rng(0)
+    names = [f"f{i}" for i in range(columns)]
+    fields = [pa.field(n, pa.float64()) for n in names] + [pa.field("target", pa.string())]
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, pa.schema(fields)) as writer:
+        for start in range(0, rows, 100_000):
+            n = min(100_000, rows - start)
+            arrays = [pa.array(rng.standard_normal(n)) for _ in names]
+            arrays.append(pa.array(np.array(["benign", "malignant"])[rng.integers(0, 2, n)]))
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=pa.schema(fields)))
+    return {
+        "name": "bench",
+        "table": "bench.data",
+        "features": [{"name": n, "dtype": "float32"} for n in names],
+        "target": {"name": "target", "dtype": "category"},
+    }
+
+
+def run_pandas(path: str, schema: dict):
+    """Previous path: DataFrame (float64), column selection copy, LabelEncoder, train_test_split"""
+    import pyarrow as pa
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder
+
+    with pa.memory_map(path, "r") as source:
+        df = pa.ipc.open_file(source).read_all().to_pandas()
+    X = df[[f["name"] for f in schema["features"]]]
+    y = LabelEncoder().fit_transform(df[schema["target"]["name"]])
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    return X_train.shape, X_test.shape
+
+
+def run_transform(path: str, schema: dict):
+    """New path: record batches -> one shuffled float32 matrix, splits as views"""
+    from local_mlops.preprocessing import TabularTransform
+
+    transform = TabularTransform(schema).fit(path)
+    X_train, X_test, y_train, y_test = transform.split(path, test_size=0.2, seed=42)
+    return X_train.shape, X_test.shape
+
+
+def peak_rss_bytes() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def child(mode: str, path: str, schema_path: str):
+    with open(schema_path) as f:
+        schema = json.load(f)
+    import numpy  # noqa: F401  (import cost is not part of the measurement)
+    import pyarrow  # noqa: F401
+    import sklearn.model_selection  # noqa: F401
+
+    baseline = peak_rss_bytes()
+    start = time.perf_counter()
+    shapes = (run_pandas if mode == "pandas" else run_transform)(path, schema)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "peak_rss_bytes": peak_rss_bytes(),
+                      "import_rss_bytes": baseline, "shapes": shapes}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark schema-driven preprocessing memory and time")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--columns", type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "wide.arrow")
+        schema_path = os.path.join(tmp, "schema.json")
+        with open(schema_path, "w") as f:
+            json.dump(write_dataset(path, args.rows, args.columns), f)
+        print(f"{args.rows:,} rows x {args.columns} float64 columns ({os.path.getsize(path) / 2**20:.0f} MB on disk)")
+
+        results = {}
+        for mode in ("pandas", "transform"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode, path, schema_path],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+            r = results[mode]
+            print(f"{mode:<10} {r['seconds']:.2f} s  peak RSS {r['peak_rss_bytes'] / 2**20:,.0f} MB "
+                  f"(+{(r['peak_rss_bytes'] - r['import_rss_bytes']) / 2**20:,.0f} MB over imports)")
+        print(f"speedup {results['pandas']['seconds'] / results['transform']['seconds']:.1f}x, "
+              f"peak memory {results['pandas']['peak_rss_bytes'] / results['transform']['peak_rss_bytes']:.1f}x lower")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(*sys.argv[2:5])
+    else:
+        main()
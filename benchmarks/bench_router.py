@@ -0,0 +1,72 @@
+# bench_router.py
+# Latency the traffic router adds to served requests, with 0, 1 and 2 shadow models.
+#
+#   python benchmarks/bench_router.py --requests 5000
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_mlops.datasource import FEATURE_COLUMNS, read_dataset_arrays
+from local_mlops.router import TrafficRouter
+from local_mlops.server import make_predict_fn
+
+
+def train_artifacts(learning_rate: float) -> dict:
+    """Fit the same artifact dict train_model writes"""
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import LabelEncoder
+
+    X, species = read_dataset_arrays()
+    le = LabelEncoder()
+    y = le.fit_transform(species)
+    clf = LogisticRegression(C=1 / learning_rate, max_iter=1000, random_state=42).fit(X, y)
+    return {"model": clf, "label_encoder": le, "feature_names": list(FEATURE_COLUMNS),
+            "feature_means": X.mean(axis=0).tolist()}
+
+
+def measure(predict, instances: list, requests: int) -> np.ndarray:
+    latencies = np.empty(requests)
+    for i in range(requests):
+        start = time.perf_counter()
+        predict(instances[i % len(instances)])
+        latencies[i] = time.perf_counter() - start
+    return latencies * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark shadow/A-B router overhead on served requests")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--shadow-workers", type=int, default=1)
+    args = parser.parse_args()
+
+    models = {"v1": train_artifacts(0.01), "v2": train_artifacts(0.1), "v3": train_artifacts(1.0)}
+    X, _ = read_dataset_arrays()
+    instances = [X[i:i + 1].astype(np.float64).tolist() for i in range(len(X))]
+
+    direct = make_predict_fn(models["v1"])
+    baseline = measure(lambda rows: direct(np.asarray(rows)), instances, args.requests)
+    print(f"{'direct predict':<16} p50 {np.percentile(baseline, 50):.3f} ms  p99 {np.percentile(baseline, 99):.3f} ms")
+
+    for shadows in ([], ["v2"], ["v2", "v3"]):
+        with TrafficRouter(models, weights={"v1": 1.0}, shadows=shadows,
+                           shadow_workers=args.shadow_workers) as router:
+            measure(router.predict, instances, 200)
+            latencies = measure(router.predict, instances, args.requests)
+            router.drain()
+            stats = router.stats()
+        label = f"{len(shadows)} shadow(s)"
+        overhead = np.percentile(latencies, 50) - np.percentile(baseline, 50)
+        print(f"{label:<16} p50 {np.percentile(latencies, 50):.3f} ms  p99 {np.percentile(latencies, 99):.3f} ms  "
+              f"(p50 overhead {overhead:+.3f} ms, dropped {stats['shadow_dropped']})")
+        for name, comparison in stats["comparisons"].items():
+            print(f"  {name}: agreement {comparison['agreement_rate']:.2%}, "
+                  f"latency delta {comparison['latency_delta_mean_ms']:+.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
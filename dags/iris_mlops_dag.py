@@ -5,8 +5,10 @@ from airflow.providers.google.cloud.operators.vertex_ai import (
     CreateCustomPythonPackageTrainingJobOperator,
     RunPipelineJobOperator
 )
-from airflow.providers.google.cloud.operators.bigquery import BigQueryCheckOperator
 from airflow.providers.google.cloud.operators.gcs import GCSFileExistsSensor
+from airflow.operators.python import PythonOperator
+
+from local_mlops.airflow_trigger import NewDataSensor, record_data_to_model_latency
 
 default_args = {
     'owner': 'mlops-team',
@@ -18,24 +20,34 @@ default_args = {
     'retry_delay': timedelta(minutes=5),
 }
 
+# New-data notifications: BigQuery table metadata (row count) acts as the change marker.
+# Trigger state lives on the Composer data mount, shared by the triggerer and the workers.
+NEW_DATA_SOURCE = {"type": "bigquery_table", "table_id": f"{PROJECT_ID}.iris_dataset.iris_data"}
+TRIGGER_STATE_PATH = '/home/airflow/gcs/data/iris_retrain_trigger.json'
+MIN_NEW_ROWS = 1000
+
 dag = DAG(
     'iris_mlops_pipeline',
     default_args=default_args,
     description='Complete MLOps pipeline for Iris classification',
-    schedule_interval='@daily',
+    # Each run waits (deferred, no worker slot) for the next coalesced batch of new data
+    schedule_interval='@continuous',
     catchup=False,
     max_active_runs=1,
     tags=['mlops', 'iris', 'classification']
 )
 
-# Check if new data is available
-data_check = BigQueryCheckOperator(
-    task_id='check_data_freshness',
-    sql=f"""
-    SELECT COUNT(*) as count
-    FROM `{PROJECT_ID}.iris_dataset.iris_data`
-    WHERE feature_timestamp >= CURRENT_TIMESTAMP() - INTERVAL 1 DAY
-    """,
+# Wait for new data: bursts within debounce_s coalesce into one run, deltas under
+# MIN_NEW_ROWS are skipped and carried forward
+wait_for_data = NewDataSensor(
+    task_id='wait_for_new_data',
+    source=NEW_DATA_SOURCE,
+    state_path=TRIGGER_STATE_PATH,
+    min_rows=MIN_NEW_ROWS,
+    debounce_s=300,
+    max_delay_s=3600,
+    poll_interval_s=60,
+    timeout=timedelta(days=7).total_seconds(),
     dag=dag
 )
 
@@ -44,10 +56,18 @@ run_pipeline = RunPipelineJobOperator(
     task_id='run_training_pipeline',
     region=REGION,
     project_id=PROJECT_ID,
-    display_name='iris-training-pipeline-{{ ds }}',
+    display_name="iris-training-pipeline-{{ ti.xcom_pull(task_ids='wait_for_new_data')['batch_id'] }}",
     pipeline_spec_path='gs://your-bucket/pipeline_spec.json',
     dag=dag
 )
 
+# Data-to-model latency of the batch (first new row -> pipeline finished)
+record_latency = PythonOperator(
+    task_id='record_data_to_model_latency',
+    python_callable=record_data_to_model_latency,
+    op_kwargs={'source': NEW_DATA_SOURCE, 'state_path': TRIGGER_STATE_PATH},
+    dag=dag
+)
+
 # Set up dependencies
-data_check >> run_pipeline
\ No newline at end of file
+wait_for_data >> run_pipeline >> record_latency
\ No newline at end of file
@@ -1,8 +1,12 @@
 import os
+import sys
 import pandas as pd
 from sklearn.datasets import load_breast_cancer
 from google.cloud import aiplatform
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from local_mlops.ingestion import ChunkedIngestor, VertexIngestionBackend, existing_feature_ids
+
 # --- Configuration ---
 PROJECT_ID = "udemy-mlops-471512"  # <--- REPLACE WITH YOUR GCP PROJECT ID
 REGION = "us-central1" # Or your preferred region
@@ -84,24 +88,21 @@ def get_feature_value_type(dtype):
         return aiplatform.gapic.Feature.ValueType.STRING # Fallback for other types
 
 features_to_create = []
+# List existing features once instead of once per column
+existing_features = existing_feature_ids(entity_type)
 for col in feature_columns:
-    # Check if feature already exists to avoid errors
-    feature_exists = False
-    for existing_feature in entity_type.list_features():
-        if existing_feature.name.split('/')[-1] == col:
-            print(f"  Feature '{col}' already exists. Skipping creation.")
-            feature_exists = True
-            break
-    if not feature_exists:
-        value_type = get_feature_value_type(df[col].dtype)
-        print(f"  Adding feature '{col}' with ValueType: {aiplatform.gapic.Feature.ValueType(value_type).name}")
-        features_to_create.append(
-            aiplatform.Feature(
-                feature_id=col,
-                value_type=value_type,
-                description=f"Feature: {col}"
-            )
+    if col in existing_features:
+        print(f"  Feature '{col}' already exists. Skipping creation.")
+        continue
+    value_type = get_feature_value_type(df[col].dtype)
+    print(f"  Adding feature '{col}' with ValueType: {aiplatform.gapic.Feature.ValueType(value_type).name}")
+    features_to_create.append(
+        aiplatform.Feature(
+            feature_id=col,
+            value_type=value_type,
+            description=f"Feature: {col}"
         )
+    )
 
 if features_to_create:
     entity_type.batch_create_features(
@@ -116,46 +117,25 @@ else:
 # --- 5. Ingest data into the Feature Store ---
 print(f"\nIngesting data into Feature Store '{FEATURESTORE_ID}', Entity Type '{ENTITY_TYPE_ID}'...")
 
-# The DataFrame needs to have the entity ID column set as the index
-ingestion_df = df.set_index(ENTITY_ID_COLUMN)
-
-# Save the DataFrame to a CSV in Cloud Storage for ingestion
-BUCKET_NAME = f"{PROJECT_ID}-feature-store-data"
-GCS_URI = f"gs://{BUCKET_NAME}/breast_cancer_data/data_for_ingestion.csv"
-
-# Create a GCS bucket if it doesn't exist
-print(f"Ensuring GCS bucket {BUCKET_NAME} exists...")
+# Ingest straight from the DataFrame in a single ingestion job (no GCS CSV export)
+ingestor = ChunkedIngestor(
+    VertexIngestionBackend(entity_type),
+    max_in_flight=4,
+    max_retries=3,
+    progress_every=1
+)
 try:
-    from google.cloud import storage
-    storage_client = storage.Client(project=PROJECT_ID)
-    bucket = storage_client.get_bucket(BUCKET_NAME)
-    print(f"Bucket {BUCKET_NAME} already exists.")
-except Exception as e:
-    if "Not Found" in str(e) or "does not exist" in str(e):
-        print(f"Bucket {BUCKET_NAME} not found, creating it...")
-        bucket = storage_client.create_bucket(BUCKET_NAME, location=REGION)
-        print(f"Bucket {BUCKET_NAME} created.")
-    else:
-        raise e
-
-# Save DataFrame to GCS
-print(f"Saving DataFrame to GCS: {GCS_URI}")
-ingestion_df.to_csv(GCS_URI)
-
-# Perform batch ingestion
-try:
-    ingestion_job = entity_type.ingest_from_gcs(
-        feature_ids=feature_columns, # All columns except the index (entity_id)
+    ingestion_metrics = ingestor.ingest(
+        df,
+        entity_id_column=ENTITY_ID_COLUMN,
+        feature_columns=feature_columns,
         feature_time=pd.Timestamp.now(), # Use current time as feature time
-        gcs_uri=GCS_URI,
-        feature_data_format="csv",
-        sync=True
+        columns_per_chunk=10
     )
-    print(f"Data ingestion job completed: {ingestion_job.name}")
+    print(f"Data ingestion completed: {ingestion_metrics}")
 except Exception as e:
     print(f"Error during ingestion: {e}")
-    print("If you encounter 'Invalid argument: Column [X] not found in the input CSV file. Make sure column names match feature ids.',")
-    print("ensure your CSV headers exactly match the feature IDs you defined.")
+    print(f"Ingestion progress before the error: {ingestor.metrics}")
 
 print("\n--- Feature Store Setup Complete ---")
 print(f"You can view your Feature Store here: https://console.cloud.google.com/vertex-ai/feature-store/featurestores/{FEATURESTORE_ID}/entity-types/{ENTITY_TYPE_ID}/features?project={PROJECT_ID}&region={REGION}")
\ No newline at end of file
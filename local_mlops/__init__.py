@@ -0,0 +1 @@
+"""Local stand-ins and engines for running the Iris MLOps workflow offline"""
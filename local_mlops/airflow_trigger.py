@@ -0,0 +1,98 @@
+# airflow_trigger.py
+from airflow.sensors.base import BaseSensorOperator, PokeReturnValue
+from airflow.triggers.base import BaseTrigger, TriggerEvent
+
+from local_mlops.retrain_trigger import RetrainTrigger
+
+
+class NewDataTrigger(BaseTrigger):
+    """Runs RetrainTrigger.wait() in the triggerer and fires once a coalesced batch is submitted
+
+    Skip decisions (batches under min_rows) are logged and waiting continues, so quiet
+    periods and small deltas never occupy a worker slot.
+    """
+
+    def __init__(self, source: dict, state_path: str, min_rows: int, debounce_s: float, max_delay_s: float,
+                 poll_interval_s: float = 30.0):
+        super().__init__()
+        self.source = source
+        self.state_path = state_path
+        self.min_rows = min_rows
+        self.debounce_s = debounce_s
+        self.max_delay_s = max_delay_s
+        self.poll_interval_s = poll_interval_s
+
+    def serialize(self):
+        return (
+            "local_mlops.airflow_trigger.NewDataTrigger",
+            {
+                "source": self.source,
+                "state_path": self.state_path,
+                "min_rows": self.min_rows,
+                "debounce_s": self.debounce_s,
+                "max_delay_s": self.max_delay_s,
+                "poll_interval_s": self.poll_interval_s,
+            },
+        )
+
+    async def run(self):
+        trigger = RetrainTrigger(self.source, self.state_path, self.min_rows, self.debounce_s, self.max_delay_s)
+        while True:
+            decision = await trigger.wait(self.poll_interval_s)
+            if decision["action"] == "submit":
+                yield TriggerEvent(decision)
+                return
+            self.log.info("Skipping retraining: %s new rows < min_rows=%s", decision["rows"], self.min_rows)
+
+
+class NewDataSensor(BaseSensorOperator):
+    """Waits for a coalesced batch of new data; returns the submit decision (pushed to XCom)
+
+    `source` is a local_mlops.retrain_trigger source spec, e.g.
+    {"type": "bigquery_table", "table_id": "project.dataset.table"}. `state_path` must be
+    visible to both the triggerer and the workers (e.g. the Composer /home/airflow/gcs/data
+    mount). With deferrable=False the sensor polls in a worker slot instead.
+    """
+
+    def __init__(self, *, source: dict, state_path: str, min_rows: int = 1, debounce_s: float = 60.0,
+                 max_delay_s: float = 900.0, poll_interval_s: float = 30.0, deferrable: bool = True, **kwargs):
+        kwargs.setdefault("poke_interval", poll_interval_s)
+        super().__init__(**kwargs)
+        self.source = source
+        self.state_path = state_path
+        self.min_rows = min_rows
+        self.debounce_s = debounce_s
+        self.max_delay_s = max_delay_s
+        self.poll_interval_s = poll_interval_s
+        self.deferrable = deferrable
+
+    def _trigger(self) -> RetrainTrigger:
+        return RetrainTrigger(self.source, self.state_path, self.min_rows, self.debounce_s, self.max_delay_s)
+
+    def execute(self, context):
+        if not self.deferrable:
+            return super().execute(context)
+        self.defer(
+            trigger=NewDataTrigger(self.source, self.state_path, self.min_rows, self.debounce_s,
+                                   self.max_delay_s, self.poll_interval_s),
+            method_name="execute_complete",
+        )
+
+    def poke(self, context):
+        # A fresh trigger per poke: the cursor and pending batch come from state_path
+        decision = self._trigger().poll()
+        if decision is not None and decision["action"] == "submit":
+            return PokeReturnValue(is_done=True, xcom_value=decision)
+        return False
+
+    def execute_complete(self, context, event: dict = None):
+        return event
+
+
+def record_data_to_model_latency(source: dict, state_path: str, **context) -> dict:
+    """PythonOperator callable run after the pipeline: closes the in-flight batch and logs its latency"""
+    record = RetrainTrigger(source, state_path).complete()
+    print(f"{record['batch_id']}: {record['rows']} rows, data-to-model latency {record['data_to_model_s']:.0f} s "
+          f"(detect {record['data_to_trigger_s']:.0f} s, pipeline {record['trigger_to_model_s']:.0f} s)")
+    return record
+
@@ -0,0 +1,10 @@
+# artifacts.py
+
+
+class LocalArtifact:
+    """Minimal stand-in for a KFP artifact (Dataset/Model/Metrics) backed by a local path"""
+
+    def __init__(self, path: str, metadata: dict = None):
+        self.path = path
+        self.uri = path
+        self.metadata = metadata or {}
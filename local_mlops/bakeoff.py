@@ -0,0 +1,197 @@
+# bakeoff.py
+import importlib
+import math
+import os
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from local_mlops.tuning import _WORKER_ARRAYS, attach_arrays, share_arrays
+
+# Estimator name -> import path, so workers only import what their candidates use
+ESTIMATORS = {
+    "logistic_regression": "sklearn.linear_model.LogisticRegression",
+    "sgd": "sklearn.linear_model.SGDClassifier",
+    "random_forest": "sklearn.ensemble.RandomForestClassifier",
+    "extra_trees": "sklearn.ensemble.ExtraTreesClassifier",
+    "hist_gradient_boosting": "sklearn.ensemble.HistGradientBoostingClassifier",
+}
+
+DEFAULT_CANDIDATES = [
+    {"name": "lr_lbfgs_c100", "estimator": "logistic_regression",
+     "params": {"C": 100.0, "max_iter": 1000, "solver": "lbfgs"}},
+    {"name": "lr_lbfgs_c1", "estimator": "logistic_regression",
+     "params": {"C": 1.0, "max_iter": 1000, "solver": "lbfgs"}},
+    {"name": "lr_saga_c10", "estimator": "logistic_regression",
+     "params": {"C": 10.0, "max_iter": 200, "solver": "saga"}},
+    {"name": "lr_newton_cg_c0.01", "estimator": "logistic_regression",
+     "params": {"C": 0.01, "max_iter": 1000, "solver": "newton-cg"}},
+    {"name": "sgd_log", "estimator": "sgd",
+     "params": {"loss": "log_loss", "alpha": 1e-4, "max_iter": 20, "tol": None}},
+    {"name": "random_forest_100", "estimator": "random_forest",
+     "params": {"n_estimators": 100, "max_depth": 8}},
+    {"name": "extra_trees_100", "estimator": "extra_trees",
+     "params": {"n_estimators": 100, "max_depth": 8}},
+    {"name": "hist_gradient_boosting", "estimator": "hist_gradient_boosting",
+     "params": {"max_iter": 100}},
+]
+
+
+def make_estimator(candidate: dict):
+    module_name, _, class_name = ESTIMATORS[candidate["estimator"]].rpartition(".")
+    estimator_cls = getattr(importlib.import_module(module_name), class_name)
+    params = dict(candidate.get("params", {}))
+    if "random_state" in estimator_cls().get_params():
+        params.setdefault("random_state", 42)
+    return estimator_cls(**params)
+
+
+def _init_worker(specs: dict):
+    # One BLAS/OpenMP thread per worker so the process pool is what scales with cores
+    from threadpoolctl import threadpool_limits
+
+    threadpool_limits(1)
+    _WORKER_ARRAYS.update(attach_arrays(specs))
+
+
+def _fit_fold(candidate: dict, fold: int) -> tuple:
+    """Fit on every fold but `fold` of the shared arrays and score on `fold`; returns (accuracy, seconds)"""
+    from sklearn.exceptions import ConvergenceWarning
+
+    data = _WORKER_ARRAYS
+    held_out = data["fold_ids"] == fold
+    start = time.perf_counter()
+    estimator = make_estimator(candidate)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        estimator.fit(data["X"][~held_out], data["y"][~held_out])
+    accuracy = float((estimator.predict(data["X"][held_out]) == data["y"][held_out]).mean())
+    return accuracy, time.perf_counter() - start
+
+
+def assign_folds(y, cv_folds: int, seed: int = 42) -> np.ndarray:
+    """Stratified fold id per row"""
+    from sklearn.model_selection import StratifiedKFold
+
+    fold_ids = np.empty(len(y), dtype=np.int8)
+    splitter = StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=seed)
+    for fold, (_, held_out) in enumerate(splitter.split(np.zeros(len(y)), y)):
+        fold_ids[held_out] = fold
+    return fold_ids
+
+
+def _clearly_losing(scores: dict, leader_scores: dict, min_folds: int, z: float, fold_rows: int) -> bool:
+    """Upper confidence bound of the paired per-fold difference to the leader is below zero
+
+    With few folds the sample std can be 0 (e.g. the same gap on every fold), which would
+    cancel on any gap at all. The std is therefore floored at the worst-case sampling std
+    of a difference of two accuracies measured on `fold_rows` held-out rows.
+    """
+    common = sorted(set(scores) & set(leader_scores))
+    if len(common) < min_folds:
+        return False
+    diffs = np.array([scores[f] - leader_scores[f] for f in common])
+    std = max(diffs.std(ddof=1), math.sqrt(2 * 0.25 / fold_rows))
+    return diffs.mean() + z * std / math.sqrt(len(diffs)) < 0
+
+
+def run_bakeoff(X, y, candidates: list = None, cv_folds: int = 5, workers: int = 0, cancel_losers: bool = True,
+                min_folds: int = 2, z: float = 2.0, seed: int = 42) -> dict:
+    """K-fold CV of several estimator configs concurrently, then refit the winner on all of X
+
+    X, y and the fold assignment are copied into shared memory once; each (candidate, fold)
+    job is a task on a process pool that maps them without pickling. Jobs are issued fold by
+    fold across candidates, and once a candidate has `min_folds` folds in common with the
+    current leader, it is cancelled (queued folds dropped) when the upper confidence bound of
+    its paired per-fold accuracy difference to the leader is below zero. Returns the refit
+    winner plus a leaderboard ranked by mean CV accuracy.
+    """
+    candidates = candidates or DEFAULT_CANDIDATES
+    workers = workers or os.cpu_count() or 1
+    fold_ids = assign_folds(y, cv_folds, seed)
+    fold_rows = int(np.bincount(fold_ids).min())
+    segments, specs = share_arrays({"X": X, "y": y, "fold_ids": fold_ids})
+
+    scores = {c["name"]: {} for c in candidates}
+    fit_seconds = {c["name"]: 0.0 for c in candidates}
+    cancelled = set()
+    queue = [(c, fold) for fold in range(cv_folds) for c in candidates]
+    pending = {}
+    start = time.perf_counter()
+
+    def leader():
+        ranked = [
+            (np.mean(list(s.values())), name) for name, s in scores.items()
+            if len(s) >= min_folds and name not in cancelled
+        ]
+        return max(ranked)[1] if ranked else None
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(specs,)) as pool:
+            while queue or pending:
+                # Keep only `workers` jobs in flight so cancelled candidates' folds are never started
+                while queue and len(pending) < workers:
+                    candidate, fold = queue.pop(0)
+                    if candidate["name"] not in cancelled:
+                        pending[pool.submit(_fit_fold, candidate, fold)] = (candidate["name"], fold)
+                if not pending:
+                    continue
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, fold = pending.pop(future)
+                    scores[name][fold], seconds = future.result()
+                    fit_seconds[name] += seconds
+
+                if cancel_losers:
+                    best = leader()
+                    for name in scores:
+                        if name != best and name not in cancelled and best is not None and \
+                                _clearly_losing(scores[name], scores[best], min_folds, z, fold_rows):
+                            cancelled.add(name)
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+    cv_elapsed = time.perf_counter() - start
+
+    leaderboard = sorted(
+        (
+            {
+                "name": c["name"],
+                "estimator": c["estimator"],
+                "params": c.get("params", {}),
+                "cv_accuracy": float(np.mean(list(scores[c["name"]].values()))) if scores[c["name"]] else None,
+                "cv_accuracy_std": float(np.std(list(scores[c["name"]].values()))) if scores[c["name"]] else None,
+                "folds_run": len(scores[c["name"]]),
+                "cancelled": c["name"] in cancelled,
+                "fit_seconds": fit_seconds[c["name"]],
+            }
+            for c in candidates
+        ),
+        key=lambda entry: (not entry["cancelled"], entry["cv_accuracy"] or 0.0),
+        reverse=True
+    )
+    winner = leaderboard[0]
+    candidate = next(c for c in candidates if c["name"] == winner["name"])
+
+    refit_start = time.perf_counter()
+    with warnings.catch_warnings():
+        from sklearn.exceptions import ConvergenceWarning
+
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        model = make_estimator(candidate).fit(X, y)
+    return {
+        "model": model,
+        "winner": winner["name"],
+        "leaderboard": leaderboard,
+        "cancelled_count": len(cancelled),
+        "jobs_run": sum(len(s) for s in scores.values()),
+        "jobs_total": len(candidates) * cv_folds,
+        "workers": workers,
+        "cv_elapsed_s": cv_elapsed,
+        "refit_s": time.perf_counter() - refit_start,
+        "cpu_seconds": sum(fit_seconds.values()),
+    }
@@ -0,0 +1,350 @@
+# batch_predict.py
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+MANIFEST_FILE = "_MANIFEST.json"
+OFFSETS_FILE = "_OFFSETS.jsonl"
+
+_WORKER_PREDICTOR = {}
+
+
+def _matrix(columns: list, categorical: bool) -> np.ndarray:
+    """(rows, features) block from per-feature columns; object dtype while category strings remain"""
+    if not categorical:
+        return np.column_stack(columns).astype(np.float32, copy=False)
+    X = np.empty((len(columns[0]), len(columns)), dtype=object)
+    for j, column in enumerate(columns):
+        X[:, j] = column
+    return X
+
+
+def _iter_jsonl(input_path: str, chunk_rows: int, feature_columns: list, categorical: list, start):
+    # A position is [byte offset of the line holding the chunk's first row, rows of that line before it]
+    offset, drop = start or (0, 0)
+    buffer = []
+    # (buffer index the line's first row has or would have had, byte offset of the line)
+    lines = []
+    with open(input_path, "rb") as f:
+        f.seek(offset)
+        while True:
+            line_offset = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, list):
+                rows = [record]
+            elif "instances" in record:
+                rows = record["instances"]
+            else:
+                rows = [[record[c] for c in feature_columns]]
+            lines.append((len(buffer) - drop, line_offset))
+            buffer.extend(rows[drop:])
+            drop = 0
+            while len(buffer) >= chunk_rows:
+                index, line_offset = lines[0]
+                yield [line_offset, -index], _matrix(list(zip(*buffer[:chunk_rows])), bool(categorical))
+                buffer = buffer[chunk_rows:]
+                lines = [(index - chunk_rows, line_offset) for index, line_offset in lines]
+                # Keep only the line the next chunk starts in, and those after it
+                while len(lines) > 1 and lines[1][0] <= 0:
+                    lines.pop(0)
+    if buffer:
+        index, line_offset = lines[0]
+        yield [line_offset, -index], _matrix(list(zip(*buffer)), bool(categorical))
+
+
+def _iter_csv(input_path: str, chunk_rows: int, feature_columns: list, categorical: list, start):
+    # Read as lines so that a position is a byte offset; fields must not hold quoted newlines
+    import io
+    from itertools import islice
+
+    import pandas as pd
+
+    dtype = {c: str if c in categorical else np.float32 for c in feature_columns}
+    with open(input_path, "rb") as f:
+        header = f.readline()
+        if start:
+            f.seek(start)
+        while True:
+            offset = f.tell()
+            lines = list(islice(f, chunk_rows))
+            if not lines:
+                break
+            chunk = pd.read_csv(io.BytesIO(header + b"".join(lines)), usecols=feature_columns, dtype=dtype)
+            yield offset, _matrix([chunk[c].to_numpy() for c in feature_columns], bool(categorical))
+
+
+def _iter_parquet(input_path: str, chunk_rows: int, feature_columns: list, categorical: list, start):
+    # A position is a row number; row groups before it are not read
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(input_path)
+    row = skip = start or 0
+    groups = []
+    for group in range(parquet.num_row_groups):
+        group_rows = parquet.metadata.row_group(group).num_rows
+        if not groups and skip >= group_rows:
+            skip -= group_rows
+        else:
+            groups.append(group)
+    if not groups:
+        return
+    # Batches are re-cut to exactly chunk_rows, so shards do not depend on the row group layout
+    pending, pending_rows = [], 0
+    for batch in parquet.iter_batches(batch_size=chunk_rows, row_groups=groups, columns=feature_columns):
+        if skip:
+            dropped = min(skip, batch.num_rows)
+            batch, skip = batch.slice(dropped), skip - dropped
+        pending.append(_matrix([batch.column(c).to_numpy(zero_copy_only=False) for c in feature_columns],
+                               bool(categorical)))
+        pending_rows += batch.num_rows
+        while pending_rows >= chunk_rows:
+            block = np.concatenate(pending)
+            yield row, block[:chunk_rows]
+            row += chunk_rows
+            pending, pending_rows = [block[chunk_rows:]], pending_rows - chunk_rows
+    if pending_rows:
+        yield row, np.concatenate(pending)
+
+
+def iter_chunks(input_path: str, chunk_rows: int, feature_columns: list, categorical: list = (), start=None):
+    """Stream (position, chunk) pairs of at most chunk_rows rows from JSONL, CSV or Parquet
+
+    Chunks are float32 (rows, features) matrices, or object matrices when `categorical`
+    names columns that still hold category strings. A chunk's position is JSON-serializable;
+    passing it back as `start` resumes reading at that chunk without parsing what precedes
+    it (a byte offset for JSONL and CSV, a row number for Parquet).
+    """
+    if input_path.endswith((".jsonl", ".json")):
+        reader = _iter_jsonl
+    elif input_path.endswith(".csv"):
+        reader = _iter_csv
+    elif input_path.endswith(".parquet"):
+        reader = _iter_parquet
+    else:
+        raise ValueError(f"Unsupported input format: {input_path}")
+    return reader(input_path, chunk_rows, list(feature_columns), list(categorical), start)
+
+
+def _load_predictor(model_path: str):
+    """NumPy kernel for .npz files, the joblib artifact otherwise
+
+    Returns (classes, feature_names, categorical feature names, predict_proba). Artifacts
+    trained with a schema carry their fitted transform, which predict_proba applies first.
+    """
+    if model_path.endswith(".npz"):
+        from local_mlops.kernel import NumpyPredictor
+
+        predictor = NumpyPredictor(model_path)
+        return predictor.classes, predictor.feature_names, [], lambda X: predictor.predict_proba(X).copy()
+
+    import joblib
+
+    artifacts = joblib.load(model_path)
+    clf = artifacts["model"]
+    transform = artifacts.get("transform")
+    if transform is None:
+        return artifacts["label_encoder"].classes_, list(artifacts["feature_names"]), [], clf.predict_proba
+    categorical = [f["name"] for f in transform.schema["features"] if f["dtype"] == "category"]
+    return (artifacts["label_encoder"].classes_, list(artifacts["feature_names"]), categorical,
+            lambda X: clf.predict_proba(transform.transform_instances(X)))
+
+
+def _init_worker(model_path: str):
+    # Loaded once per worker process, not once per shard
+    classes, _, _, predict_proba = _load_predictor(model_path)
+    _WORKER_PREDICTOR["classes"], _WORKER_PREDICTOR["predict_proba"] = classes, predict_proba
+
+
+def _score_shard(shard: int, first_row: int, X, output_dir: str) -> tuple:
+    """Score one shard and write it atomically as part-<shard>.csv"""
+    import pandas as pd
+
+    classes = _WORKER_PREDICTOR["classes"]
+    proba = _WORKER_PREDICTOR["predict_proba"](X)
+    frame = pd.DataFrame(proba, columns=[f"prob_{c}" for c in classes])
+    frame.insert(0, "prediction", classes[proba.argmax(axis=1)])
+    frame.insert(0, "row_id", np.arange(first_row, first_row + len(X)))
+
+    part = os.path.join(output_dir, f"part-{shard:06d}.csv")
+    tmp = part + ".tmp"
+    frame.to_csv(tmp, header=False, index=False, float_format="%.6f")
+    os.replace(tmp, part)
+    return shard, len(X)
+
+
+def _completed_shards(output_dir: str) -> set:
+    return {
+        int(name[5:11]) for name in os.listdir(output_dir)
+        if name.startswith("part-") and name.endswith(".csv")
+    }
+
+
+def _read_offsets(output_dir: str) -> dict:
+    """shard -> (input position, first row id) recorded as the shards were read"""
+    offsets = {}
+    try:
+        with open(os.path.join(output_dir, OFFSETS_FILE)) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # A line cut short by a crash; later lines cannot exist
+                offsets[record["shard"]] = (record["position"], record["first_row"])
+    except FileNotFoundError:
+        pass
+    return offsets
+
+
+def _resume_point(output_dir: str, done: set) -> tuple:
+    """(shard, input position, first row id) to start reading at: the latest recorded shard
+    at or before the first one not yet completed"""
+    offsets = _read_offsets(output_dir)
+    first_missing = 0
+    while first_missing in done:
+        first_missing += 1
+    recorded = [shard for shard in offsets if shard <= first_missing]
+    if not recorded:
+        return 0, None, 0
+    shard = max(recorded)
+    return (shard, *offsets[shard])
+
+
+def _manifest(input_path: str, model_path: str, chunk_rows: int) -> dict:
+    """What the part files in an output directory were computed from"""
+    from local_mlops.step_cache import fingerprint_file
+
+    stat = os.stat(input_path)
+    return {
+        "input_path": os.path.abspath(input_path),
+        "input_size": stat.st_size,
+        "input_mtime_ns": stat.st_mtime_ns,
+        "model_digest": fingerprint_file(model_path),
+        "chunk_rows": chunk_rows,
+    }
+
+
+def _prepare_output_dir(output_dir: str, manifest: dict, restart: bool):
+    """Check that existing parts belong to this run (or clear them with restart), then record the manifest"""
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    try:
+        with open(manifest_path) as f:
+            existing = json.load(f)
+    except FileNotFoundError:
+        existing = None
+    outputs = [n for n in os.listdir(output_dir) if n.startswith("part-") or n in ("_SUCCESS", OFFSETS_FILE)]
+    if existing != manifest and (outputs or existing is not None):
+        if not restart:
+            changed = sorted(k for k in manifest if (existing or {}).get(k) != manifest[k])
+            raise ValueError(
+                f"{output_dir} holds shards of a different run (changed: {', '.join(changed)}); "
+                "pass restart=True (--restart) to discard them"
+            )
+        for name in outputs:
+            os.remove(os.path.join(output_dir, name))
+    tmp = manifest_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, manifest_path)
+
+
+def batch_predict(input_path: str, model_path: str, output_dir: str, chunk_rows: int = 100_000,
+                  workers: int = 0, max_in_flight: int = 0, restart: bool = False) -> dict:
+    """Score a file of any size with bounded memory, resuming from completed shards
+
+    Each chunk of the input is a shard scored on a process pool and written to its own
+    part file, so a crashed run restarts after the last completed shard: the input
+    position of every shard read is recorded, and a resumed run seeks past the completed
+    ones instead of parsing them again. Columns are the artifact's feature_names. At most
+    max_in_flight shards (default 2 per worker) are held in memory at once. Part files
+    carry row ids and are named in input order; merge_parts concatenates them.
+
+    output_dir records the input file (path, size, mtime), model digest and chunk_rows
+    the parts were computed with. Resuming with anything else raises ValueError, unless
+    `restart` is set, which discards the old parts first.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    _prepare_output_dir(output_dir, _manifest(input_path, model_path, chunk_rows), restart)
+    classes, feature_columns, categorical, _ = _load_predictor(model_path)
+    done = _completed_shards(output_dir)
+    resumed = len(done)
+    first_shard, position, first_row = _resume_point(output_dir, done)
+
+    rows = 0
+    skipped_rows = first_row
+    start = time.perf_counter()
+    pending = set()
+    chunks = iter_chunks(input_path, chunk_rows, feature_columns, categorical, start=position)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path,)) as pool, \
+            open(os.path.join(output_dir, OFFSETS_FILE), "a") as offsets:
+        for shard, (position, X) in enumerate(chunks, start=first_shard):
+            if shard in done:
+                skipped_rows += len(X)
+            else:
+                offsets.write(json.dumps({"shard": shard, "position": position, "first_row": first_row}) + "\n")
+                offsets.flush()
+                if len(pending) >= max_in_flight:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    rows += sum(f.result()[1] for f in finished)
+                pending.add(pool.submit(_score_shard, shard, first_row, X, output_dir))
+            first_row += len(X)
+        for future in pending:
+            rows += future.result()[1]
+
+    with open(os.path.join(output_dir, "_SUCCESS"), "w") as f:
+        json.dump({"rows": first_row, "classes": [str(c) for c in classes]}, f)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rows_scored": rows,
+        "rows_skipped": skipped_rows,
+        "shards_resumed": resumed,
+        "elapsed_s": elapsed,
+        "rows_per_second": rows / elapsed if elapsed else 0.0,
+    }
+
+
+def merge_parts(output_dir: str, output_path: str):
+    """Concatenate the part files, in input order, into one CSV with a header"""
+    with open(os.path.join(output_dir, "_SUCCESS")) as f:
+        classes = json.load(f)["classes"]
+    parts = sorted(p for p in os.listdir(output_dir) if p.startswith("part-") and p.endswith(".csv"))
+    with open(output_path, "w") as out:
+        out.write("row_id,prediction," + ",".join(f"prob_{c}" for c in classes) + "\n")
+        for part in parts:
+            with open(os.path.join(output_dir, part)) as f:
+                while True:
+                    block = f.read(1 << 20)
+                    if not block:
+                        break
+                    out.write(block)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sharded, resumable local batch prediction")
+    parser.add_argument("input_path", help="JSONL, CSV or Parquet file")
+    parser.add_argument("model_path", help="joblib artifact from train_model or an exported .npz kernel")
+    parser.add_argument("output_dir")
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--merge-to", help="Also write one ordered CSV here")
+    parser.add_argument("--restart", action="store_true", help="Discard parts left by a different run")
+    args = parser.parse_args()
+
+    summary = batch_predict(args.input_path, args.model_path, args.output_dir, args.chunk_rows, args.workers,
+                            restart=args.restart)
+    print(json.dumps(summary))
+    if args.merge_to:
+        merge_parts(args.output_dir, args.merge_to)
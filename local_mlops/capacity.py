@@ -0,0 +1,278 @@
+# capacity.py
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+from local_mlops.loadgen import HttpTarget, process_cpu_seconds, run_closed_loop, synthetic_payloads
+
+# Vertex AI prediction node shapes with approximate us-central1 list prices (USD per node hour);
+# pass `machine_types` to plan_capacity to use current or negotiated prices
+MACHINE_TYPES = {
+    "n1-standard-2": {"vcpus": 2, "memory_gb": 7.5, "hourly_usd": 0.1095},
+    "n1-standard-4": {"vcpus": 4, "memory_gb": 15, "hourly_usd": 0.2190},
+    "n1-standard-8": {"vcpus": 8, "memory_gb": 30, "hourly_usd": 0.4380},
+    "n1-standard-16": {"vcpus": 16, "memory_gb": 60, "hourly_usd": 0.8760},
+    "e2-standard-2": {"vcpus": 2, "memory_gb": 8, "hourly_usd": 0.0771},
+    "e2-standard-4": {"vcpus": 4, "memory_gb": 16, "hourly_usd": 0.1541},
+    "e2-standard-8": {"vcpus": 8, "memory_gb": 32, "hourly_usd": 0.3082},
+}
+
+# What deploy_model used before plans existed
+DEFAULT_DEPLOYMENT = {"machine_type": "n1-standard-2", "min_replica_count": 1, "max_replica_count": 3}
+# setup_model_explanations only set the machine type, so the SDK's single replica applied
+DEFAULT_EXPLANATION = {"machine_type": "n1-standard-2", "min_replica_count": 1, "max_replica_count": 1}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(model_path: str, port: int, timeout_s: float = 30.0) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "local_mlops.server", os.path.abspath(model_path), "--port", str(port)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"Prediction server did not start on port {port}")
+
+
+def measure_serving(model_path: str, batch_sizes=(1, 8, 32), concurrency_levels=(1, 2, 4, 8),
+                    duration_s: float = 3.0) -> list:
+    """Sustained throughput per core and tail latency of one serving process, per load point
+
+    The model is served by local_mlops.server in a subprocess, pinned to one of the cores
+    this process may run on when there is more than one (the load generator keeps the
+    rest, and its original affinity is restored afterwards), and loaded with closed-loop
+    HTTP clients. Throughput per
+    core is derived from the server process's own CPU time per request. So it holds even
+    when the load generator competes for the same cores, which inflates p99 and makes it a
+    conservative figure.
+    """
+    # Only cores allowed by the cpuset (e.g. a container's) can be pinned to
+    allowed = os.sched_getaffinity(0)
+    port = _free_port()
+    process = _start_server(model_path, port)
+    try:
+        if len(allowed) > 1:
+            server_core = min(allowed)
+            os.sched_setaffinity(process.pid, {server_core})
+            os.sched_setaffinity(0, allowed - {server_core})
+        target = HttpTarget(f"http://127.0.0.1:{port}")
+        run_closed_loop(target, synthetic_payloads(200), concurrency=1, duration_s=1.0, warmup_s=0.0)
+
+        points = []
+        for batch_size in batch_sizes:
+            payloads = synthetic_payloads(200, instances_per_request=batch_size)
+            for concurrency in concurrency_levels:
+                cpu_start = process_cpu_seconds(process.pid)
+                run = run_closed_loop(target, payloads, concurrency, duration_s, warmup_s=0.0)
+                cpu_s = process_cpu_seconds(process.pid) - cpu_start
+                requests = run["requests"] - run["errors"]
+                points.append({
+                    "kind": "predict",
+                    "batch_size": batch_size,
+                    "concurrency": concurrency,
+                    "throughput_rps": run["throughput_rps"],
+                    "p50_ms": run["p50_ms"],
+                    "p99_ms": run["p99_ms"],
+                    "error_rate": run["error_rate"],
+                    "server_cpu_ms_per_request": cpu_s * 1e3 / requests if requests else None,
+                    "per_core_rps": requests / cpu_s if cpu_s else run["throughput_rps"],
+                })
+        return points
+    finally:
+        if len(allowed) > 1:
+            os.sched_setaffinity(0, allowed)
+        process.terminate()
+        process.wait()
+
+
+def measure_explanations(model_path: str, batch_sizes=(1,), path_count: int = 10, requests: int = 200) -> list:
+    """Single-core cost of sampled Shapley explanations (what the explanation endpoint runs)"""
+    from local_mlops.explain import sampled_shapley_attributions
+    from local_mlops.server import load_model_artifacts
+
+    model_artifacts = load_model_artifacts(model_path)
+    clf = model_artifacts["model"]
+    baseline = np.asarray(model_artifacts["feature_means"], dtype=np.float64)
+    points = []
+    for batch_size in batch_sizes:
+        payloads = synthetic_payloads(requests, instances_per_request=batch_size)
+        latencies = np.empty(len(payloads))
+        cpu_start = time.process_time()
+        for i, payload in enumerate(payloads):
+            start = time.perf_counter()
+            sampled_shapley_attributions(clf, np.asarray(payload["instances"], dtype=np.float64), baseline,
+                                         path_count)
+            latencies[i] = time.perf_counter() - start
+        cpu_s = time.process_time() - cpu_start
+        points.append({
+            "kind": "explain",
+            "batch_size": batch_size,
+            "concurrency": 1,
+            "throughput_rps": len(payloads) / latencies.sum(),
+            "p50_ms": float(np.percentile(latencies, 50) * 1e3),
+            "p99_ms": float(np.percentile(latencies, 99) * 1e3),
+            "error_rate": 0.0,
+            "server_cpu_ms_per_request": cpu_s * 1e3 / len(payloads),
+            "per_core_rps": len(payloads) / cpu_s,
+        })
+    return points
+
+
+def plan_capacity(points: list, target_qps: float, p99_slo_ms: float, batch_size: int = 1, peak_factor: float = 2.0,
+                  target_utilization: float = 0.6, min_replicas: int = 1, machine_types: dict = None) -> dict:
+    """Cheapest machine shape and replica range serving `target_qps` within the p99 SLO
+
+    Only load points at the closest measured batch size whose p99 meets the SLO count.
+    The best per-core throughput among them, derated to `target_utilization`, is assumed to
+    scale with the vCPUs of a replica. min_replica_count covers `target_qps`, and
+    max_replica_count covers `peak_factor` times that for autoscaling. Raises ValueError
+    when no measured load point meets the SLO.
+    """
+    machine_types = machine_types or MACHINE_TYPES
+    measured = sorted({p["batch_size"] for p in points})
+    closest = min(measured, key=lambda b: (abs(b - batch_size), b))
+    candidates = [p for p in points if p["batch_size"] == closest and not p["error_rate"]]
+    feasible = [p for p in candidates if p["p99_ms"] is not None and p["p99_ms"] <= p99_slo_ms]
+    if not feasible:
+        best_p99 = min(p["p99_ms"] for p in candidates if p["p99_ms"] is not None)
+        raise ValueError(
+            f"No measured load point meets p99 <= {p99_slo_ms} ms at batch size {closest} "
+            f"(best p99 {best_p99:.2f} ms); relax the SLO or reduce the batch size"
+        )
+    operating_point = max(feasible, key=lambda p: p["per_core_rps"])
+    per_core_rps = operating_point["per_core_rps"] * target_utilization
+
+    shapes = []
+    for machine_type, shape in machine_types.items():
+        replica_rps = shape["vcpus"] * per_core_rps
+        min_count = max(min_replicas, math.ceil(target_qps / replica_rps))
+        max_count = max(min_count, math.ceil(target_qps * peak_factor / replica_rps))
+        shapes.append({
+            "machine_type": machine_type,
+            "replica_rps": replica_rps,
+            "min_replica_count": min_count,
+            "max_replica_count": max_count,
+            "hourly_usd_at_min": min_count * shape["hourly_usd"],
+            "hourly_usd_at_max": max_count * shape["hourly_usd"],
+        })
+    # Cheapest at the steady-state replica count, then the smaller shape for finer autoscaling steps
+    shapes.sort(key=lambda s: (s["hourly_usd_at_min"], machine_types[s["machine_type"]]["vcpus"]))
+    chosen = shapes[0]
+    return {
+        "machine_type": chosen["machine_type"],
+        "min_replica_count": chosen["min_replica_count"],
+        "max_replica_count": chosen["max_replica_count"],
+        "target_qps": target_qps,
+        "p99_slo_ms": p99_slo_ms,
+        "batch_size": closest,
+        "peak_factor": peak_factor,
+        "target_utilization": target_utilization,
+        "operating_point": operating_point,
+        "planned_per_core_rps": per_core_rps,
+        "shapes": shapes,
+    }
+
+
+def build_capacity_plan(model_path: str, target_qps: float, p99_slo_ms: float, explain_qps: float = 0.0,
+                        explain_p99_slo_ms: float = None, batch_size: int = 1, path_count: int = 10,
+                        duration_s: float = 3.0, **plan_options) -> dict:
+    """Measure the artifact and plan the prediction endpoint and (optionally) the explanation endpoint"""
+    points = measure_serving(model_path, batch_sizes=sorted({1, 8, 32, batch_size}), duration_s=duration_s)
+    plan = {
+        "model_path": os.path.abspath(model_path),
+        "created_at": time.time(),
+        "cpu_count": os.cpu_count(),
+        "measurements": points,
+        "deployment": plan_capacity(points, target_qps, p99_slo_ms, batch_size, **plan_options),
+    }
+    if explain_qps:
+        explain_points = measure_explanations(model_path, batch_sizes=(batch_size,), path_count=path_count)
+        plan["measurements"] += explain_points
+        plan["explanation"] = plan_capacity(
+            explain_points, explain_qps, explain_p99_slo_ms or p99_slo_ms, batch_size, **plan_options
+        )
+    return plan
+
+
+def deployment_config(plan: dict = None, section: str = "deployment") -> dict:
+    """machine_type / min_replica_count / max_replica_count from a plan, or the section's previous defaults"""
+    if not plan or section not in plan:
+        return dict(DEFAULT_EXPLANATION if section == "explanation" else DEFAULT_DEPLOYMENT)
+    return {key: plan[section][key] for key in DEFAULT_DEPLOYMENT}
+
+
+def load_capacity_plan(path: str):
+    """The plan at `path`, or None when it does not exist"""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def format_plan(plan: dict) -> str:
+    lines = []
+    for point in plan["measurements"]:
+        lines.append(
+            f"  {point['kind']:<7} batch {point['batch_size']:>3}  concurrency {point['concurrency']:>2}: "
+            f"{point['throughput_rps']:>8,.0f} req/s  p99 {point['p99_ms']:7.2f} ms  "
+            f"{point['per_core_rps']:>8,.0f} req/s per core"
+        )
+    for section in ("deployment", "explanation"):
+        if section not in plan:
+            continue
+        p = plan[section]
+        lines.append(
+            f"{section}: {p['machine_type']} x {p['min_replica_count']}-{p['max_replica_count']} replicas "
+            f"for {p['target_qps']:g} req/s (peak x{p['peak_factor']:g}) at p99 <= {p['p99_slo_ms']:g} ms; "
+            f"{p['planned_per_core_rps']:,.0f} req/s per core planned "
+            f"(batch {p['operating_point']['batch_size']}, concurrency {p['operating_point']['concurrency']}, "
+            f"p99 {p['operating_point']['p99_ms']:.2f} ms measured)"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Size Vertex AI endpoints from local serving measurements")
+    parser.add_argument("model_path")
+    parser.add_argument("--target-qps", type=float, required=True)
+    parser.add_argument("--p99-slo-ms", type=float, required=True)
+    parser.add_argument("--batch-size", type=int, default=1, help="Instances per request")
+    parser.add_argument("--explain-qps", type=float, default=0.0)
+    parser.add_argument("--explain-p99-slo-ms", type=float)
+    parser.add_argument("--peak-factor", type=float, default=2.0)
+    parser.add_argument("--target-utilization", type=float, default=0.6)
+    parser.add_argument("--min-replicas", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds per load point")
+    parser.add_argument("--output", default="capacity_plan.json")
+    args = parser.parse_args()
+
+    plan = build_capacity_plan(
+        args.model_path, args.target_qps, args.p99_slo_ms, args.explain_qps, args.explain_p99_slo_ms,
+        args.batch_size, duration_s=args.duration, peak_factor=args.peak_factor,
+        target_utilization=args.target_utilization, min_replicas=args.min_replicas
+    )
+    with open(args.output, "w") as f:
+        json.dump(plan, f, indent=2)
+    print(format_plan(plan))
+    print(f"Wrote {args.output}")
@@ -0,0 +1,505 @@
+# data_stats.py
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch (DDSketch) with `relative_accuracy` error on every quantile
+
+    A value x > 0 falls in bucket ceil(log(x) / log(gamma)), gamma = (1 + a) / (1 - a);
+    negative values use a mirrored store and zeros a counter. Counts live in dense arrays
+    indexed from an offset, so updating is one vectorized bincount per batch and sketches
+    merge by adding counts. At most `max_buckets` buckets are kept per sign (the smallest
+    magnitudes collapse first), which bounds memory for any input.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+        self.zeros = 0
+        # sign -> [offset, counts]
+        self.stores = {1: [0, np.zeros(0, dtype=np.int64)], -1: [0, np.zeros(0, dtype=np.int64)]}
+
+    @property
+    def count(self) -> int:
+        return self.zeros + sum(int(counts.sum()) for _, counts in self.stores.values())
+
+    def _add(self, sign: int, keys: np.ndarray, counts: np.ndarray = None):
+        if not len(keys):
+            return
+        offset, current = self.stores[sign]
+        low = min(int(keys.min()), offset) if len(current) else int(keys.min())
+        high = max(int(keys.max()), offset + len(current) - 1) if len(current) else int(keys.max())
+        merged = np.zeros(high - low + 1, dtype=np.int64)
+        merged[offset - low:offset - low + len(current)] += current
+        merged += np.bincount(keys - low, weights=counts, minlength=len(merged)).astype(np.int64)
+        if len(merged) > self.max_buckets:
+            # Collapse the smallest magnitudes into one bucket
+            excess = len(merged) - self.max_buckets
+            merged[excess] += merged[:excess].sum()
+            merged = merged[excess:]
+            low += excess
+        self.stores[sign] = [low, merged]
+
+    def _keys(self, magnitudes: np.ndarray) -> np.ndarray:
+        # Logs stay in the column's dtype: float32 feature columns are bucketed with float32
+        # logs, which are precise enough for ~2% wide buckets and twice as fast as float64
+        logs = np.log(magnitudes)
+        logs /= self._log_gamma
+        return np.ceil(logs, out=logs).astype(np.int64)
+
+    def update(self, values: np.ndarray):
+        """Add finite values (any float dtype)"""
+        if not len(values):
+            return
+        if values.min() > 0:
+            self._add(1, self._keys(values))
+            return
+        positive = values > 0
+        negative = values < 0
+        self.zeros += int(len(values) - positive.sum() - negative.sum())
+        self._add(1, self._keys(values[positive]))
+        self._add(-1, self._keys(-values[negative]))
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        self.zeros += other.zeros
+        for sign, (offset, counts) in other.stores.items():
+            nonzero = np.flatnonzero(counts)
+            self._add(sign, nonzero + offset, counts[nonzero])
+        return self
+
+    def quantiles(self, qs) -> list:
+        """Estimates for quantiles `qs` (0..1), or None for each when the sketch is empty"""
+        total = self.count
+        if not total:
+            return [None for _ in qs]
+        # Ascending order: negatives by decreasing magnitude, zeros, positives
+        neg_offset, neg_counts = self.stores[-1]
+        pos_offset, pos_counts = self.stores[1]
+        counts = np.concatenate([neg_counts[::-1], [self.zeros], pos_counts])
+        neg_keys = neg_offset + np.arange(len(neg_counts))[::-1]
+        pos_keys = pos_offset + np.arange(len(pos_counts))
+        # Bucket midpoint that keeps the relative error bound
+        values = np.concatenate([
+            -2 * self.gamma ** neg_keys / (self.gamma + 1), [0.0], 2 * self.gamma ** pos_keys / (self.gamma + 1)
+        ])
+        cumulative = np.cumsum(counts)
+        ranks = np.asarray(qs, dtype=np.float64) * (total - 1)
+        return values[np.searchsorted(cumulative, ranks, side="right")].tolist()
+
+    def to_dict(self) -> dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "zeros": self.zeros,
+            "stores": {str(sign): [offset, counts.tolist()] for sign, (offset, counts) in self.stores.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"], data["max_buckets"])
+        sketch.zeros = data["zeros"]
+        sketch.stores = {
+            int(sign): [offset, np.asarray(counts, dtype=np.int64)] for sign, (offset, counts) in data["stores"].items()
+        }
+        return sketch
+
+
+class NumericStats:
+    """count, nulls (incl. NaN), non-finite values, min/max, mean/variance and a quantile sketch
+
+    Mean and variance are merged with Chan et al.'s pairwise update, so batches, files
+    and processes combine exactly (up to rounding) in any order.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.count = 0
+        self.nulls = 0
+        self.infinite = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def update(self, values: np.ndarray, nulls: int = 0):
+        """Add one column batch; NaN entries count as nulls, +/-inf are counted and excluded"""
+        low, high = values.min(initial=np.inf), values.max(initial=-np.inf)
+        if not (np.isfinite(low) and np.isfinite(high)):
+            finite = np.isfinite(values)
+            nan = int(np.isnan(values).sum())
+            self.infinite += int(len(values) - finite.sum()) - nan
+            nulls = max(nulls, nan)
+            values = values[finite]
+            low, high = values.min(initial=np.inf), values.max(initial=-np.inf)
+        batch = NumericStats(self.sketch.relative_accuracy)
+        batch.count = len(values)
+        batch.nulls = nulls
+        if batch.count:
+            batch.min, batch.max = float(low), float(high)
+            batch.mean = float(values.sum(dtype=np.float64)) / batch.count
+            deviations = values.astype(np.float64) - batch.mean
+            batch.m2 = float(np.dot(deviations, deviations))
+            batch.sketch.update(values)
+        self.merge(batch)
+
+    def merge(self, other: "NumericStats") -> "NumericStats":
+        count = self.count + other.count
+        if count:
+            delta = other.mean - self.mean
+            self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+            self.mean += delta * other.count / count
+        self.count = count
+        self.nulls += other.nulls
+        self.infinite += other.infinite
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def summary(self) -> dict:
+        quantiles = self.sketch.quantiles([0.01, 0.25, 0.5, 0.75, 0.99])
+        if self.count:
+            # Bucket midpoints can fall just outside the observed range
+            quantiles = [min(max(q, self.min), self.max) for q in quantiles]
+        p01, p25, p50, p75, p99 = quantiles
+        return {
+            "count": self.count,
+            "nulls": self.nulls,
+            "infinite": self.infinite,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "mean": self.mean if self.count else None,
+            "std": (self.m2 / self.count) ** 0.5 if self.count else None,
+            "p01": p01, "p25": p25, "p50": p50, "p75": p75, "p99": p99,
+        }
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "nulls": self.nulls, "infinite": self.infinite, "min": self.min,
+                "max": self.max, "mean": self.mean, "m2": self.m2, "sketch": self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NumericStats":
+        stats = cls()
+        for name in ("count", "nulls", "infinite", "min", "max", "mean", "m2"):
+            setattr(stats, name, data[name])
+        stats.sketch = QuantileSketch.from_dict(data["sketch"])
+        return stats
+
+
+class CategoryStats:
+    """Null count and per-value frequencies of a string column (Arrow value_counts per batch)"""
+
+    def __init__(self):
+        self.counts = {}
+        self.nulls = 0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts.values())
+
+    def update(self, array):
+        import pyarrow.compute as pc
+
+        self.nulls += array.null_count
+        for item in pc.value_counts(array.drop_null()).to_pylist():
+            self.counts[item["values"]] = self.counts.get(item["values"], 0) + item["counts"]
+
+    def merge(self, other: "CategoryStats") -> "CategoryStats":
+        for value, count in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+        self.nulls += other.nulls
+        return self
+
+    def summary(self) -> dict:
+        return {"count": self.count, "nulls": self.nulls, "distinct": len(self.counts),
+                "frequencies": dict(sorted(self.counts.items(), key=lambda item: -item[1]))}
+
+    def to_dict(self) -> dict:
+        return {"counts": self.counts, "nulls": self.nulls}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CategoryStats":
+        stats = cls()
+        stats.counts = dict(data["counts"])
+        stats.nulls = data["nulls"]
+        return stats
+
+
+class TableStats:
+    """Per-column statistics of a table with a schema config's columns (see preprocessing.load_schema)
+
+    update() takes one Arrow record batch; stats of different row ranges (batches, files,
+    processes, earlier runs) merge into the stats of their union.
+    """
+
+    def __init__(self, numeric: list, categorical: list, relative_accuracy: float = 0.01):
+        self.rows = 0
+        self.columns = {name: NumericStats(relative_accuracy) for name in numeric}
+        self.columns.update({name: CategoryStats() for name in categorical})
+
+    @classmethod
+    def from_schema(cls, config: dict, relative_accuracy: float = 0.01) -> "TableStats":
+        numeric = [f["name"] for f in config["features"] if f["dtype"] == "float32"]
+        categorical = [f["name"] for f in config["features"] if f["dtype"] == "category"]
+        return cls(numeric, categorical + [config["target"]["name"]], relative_accuracy)
+
+    def update(self, batch):
+        self.rows += batch.num_rows
+        for name, stats in self.columns.items():
+            column = batch.column(name)
+            if isinstance(stats, CategoryStats):
+                stats.update(column)
+            else:
+                # Nulls come back as NaN, which update() counts once
+                stats.update(column.to_numpy(zero_copy_only=False), column.null_count)
+
+    def merge(self, other: "TableStats") -> "TableStats":
+        self.rows += other.rows
+        for name, stats in self.columns.items():
+            stats.merge(other.columns[name])
+        return self
+
+    def summary(self) -> dict:
+        return {"rows": self.rows, "columns": {name: stats.summary() for name, stats in self.columns.items()}}
+
+    def to_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "numeric": {n: s.to_dict() for n, s in self.columns.items() if isinstance(s, NumericStats)},
+            "categorical": {n: s.to_dict() for n, s in self.columns.items() if isinstance(s, CategoryStats)},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TableStats":
+        stats = cls([], [])
+        stats.rows = data["rows"]
+        stats.columns = {name: NumericStats.from_dict(d) for name, d in data["numeric"].items()}
+        stats.columns.update({name: CategoryStats.from_dict(d) for name, d in data["categorical"].items()})
+        return stats
+
+
+def _open_ipc(path: str):
+    import pyarrow as pa
+
+    return pa.ipc.open_file(pa.memory_map(path, "r"))
+
+
+def _scan(path: str, config: dict, first_batch: int, last_batch: int, skip_rows: int) -> dict:
+    """Stats of batches [first_batch, last_batch) of an IPC file, dropping its first `skip_rows` rows"""
+    reader = _open_ipc(path)
+    stats = TableStats.from_schema(config)
+    for i in range(first_batch, last_batch):
+        batch = reader.get_batch(i)
+        if skip_rows:
+            batch, skip_rows = batch.slice(min(skip_rows, batch.num_rows)), max(0, skip_rows - batch.num_rows)
+        if batch.num_rows:
+            stats.update(batch)
+    return stats.to_dict()
+
+
+def compute_stats(path: str, config: dict, start_row: int = 0, workers: int = 0) -> TableStats:
+    """One pass over an Arrow IPC file (memory-mapped), from `start_row`; batch ranges split over `workers` processes"""
+    reader = _open_ipc(path)
+    sizes = np.array([reader.get_batch(i).num_rows for i in range(reader.num_record_batches)], dtype=np.int64)
+    ends = np.cumsum(sizes)
+    first = int(np.searchsorted(ends, start_row, side="right"))
+    skip = start_row - int(ends[first - 1] if first else 0)
+    workers = min(workers or 1, len(sizes) - first)
+    if workers <= 1:
+        return TableStats.from_dict(_scan(path, config, first, len(sizes), skip))
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Contiguous batch ranges of about equal rows, merged in order
+    bounds = np.searchsorted(ends, np.linspace(start_row, ends[-1], workers + 1)[1:-1], side="right")
+    edges = [first] + sorted(set(int(b) for b in bounds if first < b < len(sizes))) + [len(sizes)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(
+            _scan, [path] * (len(edges) - 1), [config] * (len(edges) - 1), edges[:-1], edges[1:],
+            [skip] + [0] * (len(edges) - 2)
+        ))
+    stats = TableStats.from_dict(parts[0])
+    for part in parts[1:]:
+        stats.merge(TableStats.from_dict(part))
+    return stats
+
+
+def _hash_column(digest, array):
+    # Values and null positions rather than Arrow buffers as stored: a slice's buffers depend
+    # on how the file was batched
+    import pyarrow as pa
+
+    digest.update(str(array.type).encode())
+    if array.null_count:
+        digest.update(array.is_null().to_numpy(zero_copy_only=False).tobytes())
+    if pa.types.is_string(array.type) or pa.types.is_binary(array.type) or \
+            pa.types.is_large_string(array.type) or pa.types.is_large_binary(array.type):
+        # Offsets rebased to the slice, and the bytes they span
+        offset_type = np.int64 if pa.types.is_large_string(array.type) or pa.types.is_large_binary(array.type) \
+            else np.int32
+        _, offsets, data = array.buffers()
+        offsets = np.frombuffer(offsets, dtype=offset_type)[array.offset:array.offset + len(array) + 1]
+        digest.update((offsets - offsets[0]).tobytes())
+        digest.update(memoryview(data)[offsets[0]:offsets[-1]] if data is not None else b"")
+        return
+    values = array.to_numpy(zero_copy_only=False)
+    if values.dtype == object:
+        digest.update("\x1f".join(map(str, values)).encode())
+    else:
+        digest.update(np.ascontiguousarray(values).tobytes())
+
+
+def _block_fingerprints(path: str, start: int, stop: int, block_rows: int) -> list:
+    """sha256 of each `block_rows` block of rows [start, stop) (the last one may be shorter)
+
+    The file is memory-mapped and each block is hashed column by column from its values,
+    a pass far cheaper than computing statistics over the same rows.
+    """
+    table = _open_ipc(path).read_all()
+    fingerprints = []
+    for block_start in range(start, stop, block_rows):
+        digest = hashlib.sha256()
+        for column in table.slice(block_start, min(block_rows, stop - block_start)).columns:
+            _hash_column(digest, column.combine_chunks())
+        fingerprints.append(digest.hexdigest())
+    return fingerprints
+
+
+class StatsCache:
+    """Statistics of a table's rows from earlier runs, so a grown table only has its new rows scanned
+
+    One JSON entry per key (source and table) holds the stats of the first `rows` rows and a
+    fingerprint of every `block_rows` block of them. When a new dataset starts with exactly
+    those rows (append-only tables loaded in a stable order, e.g. SQLite/DuckDB rowid order),
+    which every block is checked for, only the rows after them are scanned; any changed,
+    deleted or reordered row rebuilds the stats.
+    """
+
+    def __init__(self, root: str, block_rows: int = 65_536):
+        self.root = root
+        self.block_rows = block_rows
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{hashlib.sha256(key.encode()).hexdigest()}.json")
+
+    def stats(self, key: str, path: str, config: dict, workers: int = 0) -> tuple:
+        """(TableStats of the whole file, rows scanned now)"""
+        reader = _open_ipc(path)
+        num_rows = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+        entry = None
+        if os.path.exists(self._path(key)):
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+        cached_rows = 0
+        blocks = []
+        if (entry is not None and entry["schema"] == config and entry.get("block_rows") == self.block_rows
+                and 0 < entry["rows"] <= num_rows
+                and _block_fingerprints(path, 0, entry["rows"], self.block_rows) == entry["blocks"]):
+            cached_rows = entry["rows"]
+            stats = TableStats.from_dict(entry["stats"])
+            if num_rows > cached_rows:
+                stats.merge(compute_stats(path, config, start_row=cached_rows, workers=workers))
+            # Complete blocks stay valid; a trailing partial one is re-hashed with the new rows
+            blocks = entry["blocks"][:cached_rows // self.block_rows]
+        else:
+            stats = compute_stats(path, config, workers=workers)
+        if num_rows:
+            blocks += _block_fingerprints(path, len(blocks) * self.block_rows, num_rows, self.block_rows)
+            entry = {"schema": config, "rows": num_rows, "block_rows": self.block_rows, "blocks": blocks,
+                     "stats": stats.to_dict()}
+            fd, tmp = tempfile.mkstemp(dir=self.root)
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp, self._path(key))
+        return stats, num_rows - cached_rows
+
+
+def schema_violations(dataset_schema, config: dict) -> list:
+    """Columns of the schema config that are missing from an Arrow schema or have another type"""
+    from local_mlops.preprocessing import arrow_schema
+
+    violations = []
+    for field in arrow_schema(config):
+        if field.name not in dataset_schema.names:
+            violations.append(f"{field.name}: missing column")
+        elif not dataset_schema.field(field.name).type.equals(field.type):
+            violations.append(f"{field.name}: type {dataset_schema.field(field.name).type}, expected {field.type}")
+    return violations
+
+
+def validate_stats(stats: TableStats, config: dict) -> list:
+    """Violations of the schema config's "validation" expectations; an empty list means the data passes
+
+        "validation": {"min_rows": 100, "columns": {
+            "sepal_length": {"min": 0, "max": 15},
+            "species": {"categories": ["setosa", ...], "min_fraction": 0.05}}}
+
+    Every column defaults to max_null_fraction 0 and (numeric) no infinite values.
+    """
+    expectations = config.get("validation", {})
+    violations = []
+    min_rows = expectations.get("min_rows", 1)
+    if stats.rows < min_rows:
+        violations.append(f"{stats.rows} rows, expected at least {min_rows}")
+    for name, column in stats.columns.items():
+        expected = expectations.get("columns", {}).get(name, {})
+        null_fraction = column.nulls / stats.rows if stats.rows else 0.0
+        if null_fraction > expected.get("max_null_fraction", 0.0):
+            violations.append(f"{name}: {column.nulls} nulls ({null_fraction:.2%})")
+        if isinstance(column, NumericStats):
+            if column.infinite:
+                violations.append(f"{name}: {column.infinite} infinite values")
+            if "min" in expected and column.count and column.min < expected["min"]:
+                violations.append(f"{name}: min {column.min:g} < {expected['min']:g}")
+            if "max" in expected and column.count and column.max > expected["max"]:
+                violations.append(f"{name}: max {column.max:g} > {expected['max']:g}")
+            continue
+        if "categories" in expected:
+            unexpected = sorted(set(column.counts) - set(expected["categories"]))
+            if unexpected:
+                violations.append(f"{name}: unexpected values {unexpected[:10]}")
+            min_fraction = expected.get("min_fraction", 0.0)
+            for category in expected["categories"]:
+                fraction = column.counts.get(category, 0) / column.count if column.count else 0.0
+                if fraction < min_fraction or (min_fraction == 0.0 and not fraction):
+                    violations.append(f"{name}: {category!r} is {fraction:.2%} of rows")
+    return violations
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    from local_mlops.preprocessing import load_schema
+
+    parser = argparse.ArgumentParser(description="Column statistics of an Arrow IPC dataset, checked against a schema")
+    parser.add_argument("dataset", help="Arrow IPC file written by load_data")
+    parser.add_argument("--schema", default="iris", help="local_mlops/schemas name or JSON path")
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--cache-dir", default="", help="Reuse statistics of rows seen before (StatsCache)")
+    args = parser.parse_args()
+
+    config = load_schema(args.schema)
+    import pyarrow as pa
+
+    violations = schema_violations(pa.ipc.open_file(pa.memory_map(args.dataset, "r")).schema, config)
+    if not violations:
+        if args.cache_dir:
+            stats, _ = StatsCache(args.cache_dir).stats(os.path.abspath(args.dataset), args.dataset, config, args.workers)
+        else:
+            stats = compute_stats(args.dataset, config, workers=args.workers)
+        print(json.dumps(stats.summary(), indent=2))
+        violations = validate_stats(stats, config)
+    for violation in violations:
+        print(f"FAILED: {violation}", file=sys.stderr)
+    sys.exit(1 if violations else 0)
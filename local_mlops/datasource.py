@@ -0,0 +1,134 @@
+# datasource.py
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+IRIS_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Iris.csv")
+
+FEATURE_COLUMNS = ["sepal_length", "sepal_width", "petal_length", "petal_width"]
+TARGET_COLUMN = "species"
+
+# Iris.csv uses the Kaggle column names, the BigQuery table uses snake_case
+CSV_COLUMN_MAP = {
+    "SepalLengthCm": "sepal_length",
+    "SepalWidthCm": "sepal_width",
+    "PetalLengthCm": "petal_length",
+    "PetalWidthCm": "petal_width",
+    "Species": "species",
+}
+
+
+def load_iris_frame(csv_path: str = IRIS_CSV) -> pd.DataFrame:
+    """Load Iris.csv with the same columns as iris_dataset.iris_data"""
+    df = pd.read_csv(csv_path).rename(columns=CSV_COLUMN_MAP)
+    return df[FEATURE_COLUMNS + [TARGET_COLUMN]]
+
+
+def iter_synthetic_iris(num_rows: int, chunk_size: int = 100_000, seed: int = 42, csv_path: str = IRIS_CSV):
+    """Yield Iris-like DataFrame chunks by resampling the real rows with 0.1 cm jitter"""
+    base = load_iris_frame(csv_path)
+    features = base[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    species = base[TARGET_COLUMN].to_numpy()
+    rng = np.random.default_rng(seed)
+
+    produced = 0
+    while produced < num_rows:
+        n = min(chunk_size, num_rows - produced)
+        idx = rng.integers(0, len(base), size=n)
+        jitter = rng.integers(-1, 2, size=(n, len(FEATURE_COLUMNS))) * 0.1
+        values = np.round(np.clip(features[idx] + jitter, 0.1, None), 1)
+        chunk = pd.DataFrame(values, columns=FEATURE_COLUMNS)
+        chunk[TARGET_COLUMN] = species[idx]
+        yield chunk
+        produced += n
+
+
+def create_local_iris_table(db_path: str, num_rows: int = 0, backend: str = "sqlite", csv_path: str = IRIS_CSV,
+                            feature_timestamp: str = None) -> int:
+    """Create a local stand-in for `iris_dataset.iris_data`
+
+    With num_rows=0 the real Iris.csv rows are loaded, otherwise synthetic rows are generated.
+    The database file is meant to be attached as `iris_dataset` by the load_data component.
+    """
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    if backend == "sqlite":
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE iris_data (sepal_length REAL, sepal_width REAL, "
+            "petal_length REAL, petal_width REAL, species TEXT, feature_timestamp TEXT)"
+        )
+    elif backend == "duckdb":
+        import duckdb
+
+        conn = duckdb.connect(db_path)
+        conn.execute(
+            "CREATE TABLE iris_data (sepal_length DOUBLE, sepal_width DOUBLE, "
+            "petal_length DOUBLE, petal_width DOUBLE, species VARCHAR, feature_timestamp TIMESTAMP)"
+        )
+    else:
+        raise ValueError(f"Unknown backend: {backend}")
+    conn.close()
+
+    if num_rows:
+        chunks = iter_synthetic_iris(num_rows, csv_path=csv_path)
+    else:
+        chunks = iter([load_iris_frame(csv_path)])
+    return append_local_iris_rows(db_path, chunks, backend, feature_timestamp)
+
+
+def append_local_iris_rows(db_path: str, chunks, backend: str = "sqlite", feature_timestamp: str = None,
+                           marker_path: str = None) -> int:
+    """Append DataFrame chunks to the stand-in table, stamped with feature_timestamp (default now)
+
+    With `marker_path`, a table change marker is bumped after the commit (see
+    local_mlops.retrain_trigger.ChangeMarkerSource).
+    """
+    feature_timestamp = feature_timestamp or pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    total = 0
+    if backend == "sqlite":
+        conn = sqlite3.connect(db_path)
+        for chunk in chunks:
+            conn.executemany(
+                "INSERT INTO iris_data VALUES (?, ?, ?, ?, ?, ?)",
+                (row + (feature_timestamp,) for row in chunk.itertuples(index=False, name=None))
+            )
+            total += len(chunk)
+        conn.commit()
+        conn.close()
+    else:
+        import duckdb
+
+        conn = duckdb.connect(db_path)
+        for chunk in chunks:
+            conn.register("chunk_df", chunk)
+            conn.execute("INSERT INTO iris_data SELECT *, CAST(? AS TIMESTAMP) FROM chunk_df", [feature_timestamp])
+            conn.unregister("chunk_df")
+            total += len(chunk)
+        conn.close()
+
+    if marker_path:
+        from local_mlops.retrain_trigger import write_change_marker
+
+        write_change_marker(marker_path, total)
+    return total
+
+
+def read_dataset_arrays(dataset_path: str = None):
+    """Return (X float32, species labels) from a load_data Arrow IPC file, or from Iris.csv"""
+    if dataset_path is None:
+        df = load_iris_frame()
+        return df[FEATURE_COLUMNS].to_numpy(dtype=np.float32), df[TARGET_COLUMN].to_numpy()
+
+    import pyarrow as pa
+
+    with pa.memory_map(dataset_path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    X = np.empty((table.num_rows, len(FEATURE_COLUMNS)), dtype=np.float32, order="F")
+    for i, name in enumerate(FEATURE_COLUMNS):
+        X[:, i] = table.column(name).to_numpy()
+    return X, table.column(TARGET_COLUMN).to_numpy()
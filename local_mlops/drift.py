@@ -0,0 +1,208 @@
+# drift.py
+import json
+from collections import deque
+
+import numpy as np
+
+
+class HistogramSketch:
+    """Fixed-bin histograms for several numeric features, stored as one (features, bins) array
+
+    Bin edges come from the training baseline; two extra outer bins catch values below the
+    training minimum and above the maximum. Sketches with the same edges merge by adding
+    counts, so shards can be sketched in parallel and combined.
+    """
+
+    def __init__(self, feature_names: list, lows, highs, num_bins: int = 64):
+        self.feature_names = list(feature_names)
+        self.lows = np.asarray(lows, dtype=np.float64)
+        self.highs = np.asarray(highs, dtype=np.float64)
+        self.num_bins = num_bins
+        self.widths = np.where(self.highs > self.lows, (self.highs - self.lows) / num_bins, 1.0)
+        self.counts = np.zeros((len(self.feature_names), num_bins + 2), dtype=np.int64)
+        # Offset of each feature's row in the flattened counts array
+        self._offsets = np.arange(len(self.feature_names)) * (num_bins + 2)
+
+    @classmethod
+    def from_baseline(cls, feature_names: list, X, num_bins: int = 64) -> "HistogramSketch":
+        """Build edges from the training table and count it in one pass"""
+        X = np.asarray(X, dtype=np.float64)
+        sketch = cls(feature_names, X.min(axis=0), X.max(axis=0), num_bins)
+        sketch.update(X)
+        return sketch
+
+    def empty_like(self) -> "HistogramSketch":
+        return HistogramSketch(self.feature_names, self.lows, self.highs, self.num_bins)
+
+    def bin_counts(self, X) -> np.ndarray:
+        """Vectorized histogram of a (rows, features) block, without touching self.counts"""
+        X = np.asarray(X, dtype=np.float64)
+        idx = np.floor((X - self.lows) / self.widths).astype(np.int64) + 1
+        np.clip(idx, 0, self.num_bins + 1, out=idx)
+        idx += self._offsets
+        counts = np.bincount(idx.ravel(), minlength=self.counts.size)
+        return counts.reshape(self.counts.shape)
+
+    def update(self, X):
+        self.counts += self.bin_counts(X)
+
+    def merge(self, other: "HistogramSketch") -> "HistogramSketch":
+        if self.num_bins != other.num_bins or not (
+            np.array_equal(self.lows, other.lows) and np.array_equal(self.highs, other.highs)
+        ):
+            raise ValueError("Cannot merge sketches with different bin edges")
+        self.counts += other.counts
+        return self
+
+    def distributions(self) -> np.ndarray:
+        totals = self.counts.sum(axis=1, keepdims=True)
+        return self.counts / np.maximum(totals, 1)
+
+    def to_dict(self) -> dict:
+        return {
+            "feature_names": self.feature_names,
+            "lows": self.lows.tolist(),
+            "highs": self.highs.tolist(),
+            "num_bins": self.num_bins,
+            "counts": self.counts.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HistogramSketch":
+        sketch = cls(data["feature_names"], data["lows"], data["highs"], data["num_bins"])
+        sketch.counts = np.asarray(data["counts"], dtype=np.int64)
+        return sketch
+
+
+def linf_distance(p: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """L-infinity distance per feature between (features, bins) distributions"""
+    return np.abs(p - q).max(axis=1)
+
+
+def js_divergence(p: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """Jensen-Shannon divergence (base 2, in [0, 1]) per feature"""
+    m = (p + q) / 2
+
+    def kl(a, b):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            terms = np.where(a > 0, a * np.log2(a / np.where(b > 0, b, 1)), 0.0)
+        return terms.sum(axis=1)
+
+    return 0.5 * kl(p, m) + 0.5 * kl(q, m)
+
+
+DISTANCES = {"linf": linf_distance, "jensen_shannon": js_divergence}
+
+
+class DriftEngine:
+    """Streaming skew/drift detection over sliding windows in fixed memory
+
+    The window is made of `slots` tumbling slots of `window_size // slots` rows each. Only
+    the last 2 * slots slot histograms are kept: the newest `slots` form the current window,
+    the ones before form the previous window. Skew compares the current window with the
+    training baseline, drift compares it with the previous window. Only the newest
+    `max_results` evaluations are kept in `results`; update() returns each one as it completes.
+    """
+
+    def __init__(
+        self,
+        baseline: HistogramSketch,
+        skew_thresholds: dict,
+        drift_thresholds: dict,
+        window_size: int = 100_000,
+        slots: int = 4,
+        distance: str = "jensen_shannon",
+        max_results: int = 1000
+    ):
+        self.baseline = baseline
+        self.feature_names = baseline.feature_names
+        self.skew_thresholds = np.array([skew_thresholds[f] for f in self.feature_names])
+        self.drift_thresholds = np.array([drift_thresholds[f] for f in self.feature_names])
+        self.slot_size = max(window_size // slots, 1)
+        self.slots = slots
+        self.distance = DISTANCES[distance]
+
+        shape = baseline.counts.shape
+        self._ring = np.zeros((2 * slots,) + shape, dtype=np.int64)
+        self._slot = 0
+        self._slot_rows = 0
+        self._filled_slots = 0
+        self.rows_seen = 0
+        self.windows_evaluated = 0
+        self.results = deque(maxlen=max_results)
+
+    def update(self, X) -> list:
+        """Consume a block of logged feature rows; returns any window evaluations it completed"""
+        X = np.asarray(X, dtype=np.float64)
+        completed = []
+        start = 0
+        while start < len(X):
+            take = min(self.slot_size - self._slot_rows, len(X) - start)
+            self._ring[self._slot] += self.baseline.bin_counts(X[start:start + take])
+            self._slot_rows += take
+            self.rows_seen += take
+            start += take
+            if self._slot_rows == self.slot_size:
+                self._filled_slots += 1
+                if self._filled_slots >= self.slots:
+                    completed.append(self.evaluate())
+                self._slot = (self._slot + 1) % len(self._ring)
+                self._ring[self._slot] = 0
+                self._slot_rows = 0
+        self.windows_evaluated += len(completed)
+        self.results.extend(completed)
+        return completed
+
+    def _window(self, end_slot: int) -> np.ndarray:
+        idx = [(end_slot - i) % len(self._ring) for i in range(self.slots)]
+        return self._ring[idx].sum(axis=0)
+
+    def evaluate(self) -> dict:
+        """Skew and drift of the window ending at the current slot, per feature"""
+        current = self._window(self._slot)
+        current_dist = current / np.maximum(current.sum(axis=1, keepdims=True), 1)
+        skew = self.distance(current_dist, self.baseline.distributions())
+
+        result = {"rows_seen": self.rows_seen, "skew": {}, "drift": {}}
+        for i, name in enumerate(self.feature_names):
+            result["skew"][name] = {
+                "distance": float(skew[i]),
+                "threshold": float(self.skew_thresholds[i]),
+                "alert": bool(skew[i] > self.skew_thresholds[i]),
+            }
+        if self._filled_slots >= 2 * self.slots:
+            previous = self._window(self._slot - self.slots)
+            previous_dist = previous / np.maximum(previous.sum(axis=1, keepdims=True), 1)
+            drift = self.distance(current_dist, previous_dist)
+            for i, name in enumerate(self.feature_names):
+                result["drift"][name] = {
+                    "distance": float(drift[i]),
+                    "threshold": float(self.drift_thresholds[i]),
+                    "alert": bool(drift[i] > self.drift_thresholds[i]),
+                }
+        return result
+
+
+def sketch_shard(baseline: HistogramSketch, chunks) -> HistogramSketch:
+    """Histogram one shard of prediction logs with the baseline's edges (for parallel merging)"""
+    sketch = baseline.empty_like()
+    for X in chunks:
+        sketch.update(X)
+    return sketch
+
+
+def iter_jsonl_instances(path: str, chunk_rows: int = 65536):
+    """Stream `{"instances": [[...], ...]}` lines as float64 blocks of at most chunk_rows rows"""
+    buffer = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            buffer.extend(record["instances"] if "instances" in record else [record["features"]])
+            if len(buffer) >= chunk_rows:
+                yield np.asarray(buffer, dtype=np.float64)
+                buffer = []
+    if buffer:
+        yield np.asarray(buffer, dtype=np.float64)
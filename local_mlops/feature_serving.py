@@ -0,0 +1,245 @@
+# feature_serving.py
+import hashlib
+import multiprocessing
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# iris_featurestore / iris_entity as created by 4_feature_store_setup.py
+FEATURESTORE_ID = "iris_featurestore"
+ENTITY_TYPE_ID = "iris_entity"
+FEATURE_IDS = ["sepal_length", "sepal_width", "petal_length", "petal_width"]
+
+
+class DictBackend:
+    """In-memory stand-in for the online store"""
+
+    def __init__(self, rows: dict = None):
+        self.rows = dict(rows or {})
+        self.calls = 0
+
+    def write(self, entity_ids: list, values):
+        for entity_id, row in zip(entity_ids, np.asarray(values, dtype=np.float64)):
+            self.rows[entity_id] = row
+
+    def read(self, entity_ids: list, feature_ids: list) -> dict:
+        self.calls += 1
+        return {e: self.rows[e] for e in entity_ids if e in self.rows}
+
+
+class SqliteBackend:
+    """SQLite stand-in for the online store: one table per entity type, keyed by entity_id"""
+
+    def __init__(self, db_path: str, entity_type_id: str = ENTITY_TYPE_ID, feature_ids: list = FEATURE_IDS):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.table = entity_type_id
+        self.feature_ids = list(feature_ids)
+        self.calls = 0
+        self._lock = threading.Lock()
+        columns = ", ".join(f"{f} REAL" for f in self.feature_ids)
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table} (entity_id TEXT PRIMARY KEY, {columns})")
+
+    def write(self, entity_ids: list, values):
+        placeholders = ", ".join("?" for _ in range(len(self.feature_ids) + 1))
+        rows = [(e, *map(float, row)) for e, row in zip(entity_ids, np.asarray(values))]
+        with self._lock:
+            self.conn.executemany(f"INSERT OR REPLACE INTO {self.table} VALUES ({placeholders})", rows)
+            self.conn.commit()
+
+    def read(self, entity_ids: list, feature_ids: list) -> dict:
+        self.calls += 1
+        columns = ", ".join(feature_ids)
+        result = {}
+        # SQLite limits bound parameters, so very large batches go in slices
+        with self._lock:
+            for i in range(0, len(entity_ids), 500):
+                ids = entity_ids[i:i + 500]
+                query = (f"SELECT entity_id, {columns} FROM {self.table} "
+                         f"WHERE entity_id IN ({', '.join('?' for _ in ids)})")
+                for entity_id, *values in self.conn.execute(query, ids):
+                    result[entity_id] = np.asarray(values, dtype=np.float64)
+        return result
+
+
+class VertexBackend:
+    """Online serving reads from the Vertex AI Featurestore entity type"""
+
+    def __init__(self, project_id: str, region: str, featurestore_id: str = FEATURESTORE_ID,
+                 entity_type_id: str = ENTITY_TYPE_ID):
+        from google.cloud import aiplatform
+
+        aiplatform.init(project=project_id, location=region)
+        self.entity_type = aiplatform.EntityType(entity_type_id, featurestore_id=featurestore_id)
+        self.calls = 0
+
+    def read(self, entity_ids: list, feature_ids: list) -> dict:
+        self.calls += 1
+        df = self.entity_type.read(entity_ids=entity_ids, feature_ids=feature_ids)
+        return {row.entity_id: row[feature_ids].to_numpy(dtype=np.float64) for _, row in df.iterrows()}
+
+
+def entity_hash(entity_id: str) -> int:
+    """Stable 64-bit hash (Python's hash() differs between processes)"""
+    return int.from_bytes(hashlib.blake2b(entity_id.encode(), digest_size=8).digest(), "little") | 1
+
+
+class SharedMemoryTier:
+    """Fixed-size hash table in shared memory, shared by worker processes on one host
+
+    Each slot holds (seq, key hash, write time, values). Writers make seq odd while
+    writing and even when done; readers retry-free check seq before and after copying
+    and treat a change as a miss (seqlock). That only holds with one writer per slot at a
+    time, so writers are serialized by a multiprocessing.Lock: the creating tier makes
+    one, and processes attaching by name must pass it (tier.lock) along with the name.
+    Colliding entities overwrite each other, which only costs a miss.
+    """
+
+    def __init__(self, num_features: int, slots: int = 65536, name: str = None, lock=None):
+        self.dtype = np.dtype([
+            ("seq", np.uint64), ("key", np.uint64), ("ts", np.float64), ("values", np.float64, (num_features,))
+        ])
+        self.slots = slots
+        if name is not None and lock is None:
+            raise ValueError("Attaching to a shared tier needs the lock of the tier that created it")
+        self.lock = lock if lock is not None else multiprocessing.Lock()
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.dtype.itemsize * slots)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.table = np.ndarray((slots,), dtype=self.dtype, buffer=self.shm.buf)
+        if self.owner:
+            self.table[:] = np.zeros((), dtype=self.dtype)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def get(self, entity_id: str, ttl_s: float, now: float):
+        key = entity_hash(entity_id)
+        index = key % self.slots
+        table = self.table
+        seq = int(table["seq"][index])
+        if seq % 2 or int(table["key"][index]) != key or now - float(table["ts"][index]) > ttl_s:
+            return None
+        values = table["values"][index].copy()
+        if int(table["seq"][index]) != seq or int(table["key"][index]) != key:
+            return None
+        return values
+
+    def put(self, entity_id: str, values, now: float):
+        key = entity_hash(entity_id)
+        index = key % self.slots
+        with self.lock:
+            table = self.table
+            table["seq"][index] += 1
+            table["key"][index] = key
+            table["ts"][index] = now
+            table["values"][index] = values
+            table["seq"][index] += 1
+
+    def close(self):
+        del self.table
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class FeatureServingClient:
+    """Batched multi-entity feature reads behind an LRU+TTL cache and optional shared tier
+
+    read() returns a (entities, features) float64 array in request order, with NaN for
+    entities the backend does not know. Only entities missing from both cache tiers are
+    sent to the backend, in a single batched call.
+    """
+
+    def __init__(self, backend, feature_ids: list = FEATURE_IDS, max_entries: int = 100_000,
+                 ttl_s: float = 60.0, shared_tier: SharedMemoryTier = None, latency_window: int = 10_000):
+        self.backend = backend
+        self.feature_ids = list(feature_ids)
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.shared_tier = shared_tier
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._latencies = np.zeros(latency_window)
+        self._lookups = 0
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def read(self, entity_ids: list) -> np.ndarray:
+        start = time.perf_counter()
+        now = time.time()
+        out = np.full((len(entity_ids), len(self.feature_ids)), np.nan)
+        missing = {}
+
+        with self._lock:
+            for i, entity_id in enumerate(entity_ids):
+                entry = self._cache.get(entity_id)
+                if entry is not None and now - entry[1] <= self.ttl_s:
+                    self._cache.move_to_end(entity_id)
+                    out[i] = entry[0]
+                    self.local_hits += 1
+                else:
+                    missing.setdefault(entity_id, []).append(i)
+
+        if missing and self.shared_tier is not None:
+            for entity_id in list(missing):
+                values = self.shared_tier.get(entity_id, self.ttl_s, now)
+                if values is not None:
+                    out[missing[entity_id]] = values
+                    self._remember(entity_id, values, now)
+                    self.shared_hits += len(missing.pop(entity_id))
+
+        if missing:
+            self.misses += sum(len(rows) for rows in missing.values())
+            fetched = self.backend.read(list(missing), self.feature_ids)
+            for entity_id, values in fetched.items():
+                out[missing[entity_id]] = values
+                self._remember(entity_id, values, now)
+                if self.shared_tier is not None:
+                    self.shared_tier.put(entity_id, values, now)
+
+        self._latencies[self._lookups % len(self._latencies)] = time.perf_counter() - start
+        self._lookups += 1
+        return out
+
+    def _remember(self, entity_id: str, values, now: float):
+        with self._lock:
+            self._cache[entity_id] = (values, now)
+            self._cache.move_to_end(entity_id)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Cache hit ratios per tier and per-lookup latency over the recent window"""
+        recorded = self._latencies[:min(self._lookups, len(self._latencies))] * 1e3
+        total = self.local_hits + self.shared_hits + self.misses
+        return {
+            "lookups": self._lookups,
+            "entities": total,
+            "local_hit_ratio": self.local_hits / total if total else 0.0,
+            "shared_hit_ratio": self.shared_hits / total if total else 0.0,
+            "hit_ratio": (self.local_hits + self.shared_hits) / total if total else 0.0,
+            "backend_calls": getattr(self.backend, "calls", None),
+            "p50_ms": float(np.percentile(recorded, 50)) if len(recorded) else None,
+            "p99_ms": float(np.percentile(recorded, 99)) if len(recorded) else None,
+        }
+
+
+def load_iris_features(backend) -> list:
+    """Populate a local backend from Iris.csv with entity ids iris_<Id>; returns the ids"""
+    import pandas as pd
+
+    from local_mlops.datasource import CSV_COLUMN_MAP, IRIS_CSV
+
+    df = pd.read_csv(IRIS_CSV).rename(columns=CSV_COLUMN_MAP)
+    entity_ids = [f"iris_{i}" for i in df["Id"]]
+    backend.write(entity_ids, df[FEATURE_IDS].to_numpy())
+    return entity_ids
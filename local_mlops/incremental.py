@@ -0,0 +1,286 @@
+# incremental.py
+import contextlib
+import importlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+from local_mlops.artifacts import LocalArtifact
+from local_mlops.datasource import FEATURE_COLUMNS, TARGET_COLUMN
+
+STATE_FILE = "state.json"
+
+
+def max_feature_timestamp(source: str, source_uri: str, project_id: str = None) -> str:
+    """Latest feature_timestamp in iris_dataset.iris_data (a cheap aggregate, not a scan of rows)"""
+    if source == "bigquery":
+        from google.cloud import bigquery
+
+        query = f"SELECT MAX(feature_timestamp) FROM `{project_id}.iris_dataset.iris_data`"
+        value = list(bigquery.Client(project=project_id).query(query).result())[0][0]
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f") if value else ""
+    if source == "sqlite":
+        import sqlite3
+
+        conn = sqlite3.connect(source_uri)
+        value = conn.execute("SELECT MAX(feature_timestamp) FROM iris_data").fetchone()[0]
+        conn.close()
+        return value or ""
+    if source == "duckdb":
+        import duckdb
+
+        conn = duckdb.connect(source_uri, read_only=True)
+        value = conn.execute("SELECT MAX(feature_timestamp) FROM iris_data").fetchone()[0]
+        conn.close()
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f") if value else ""
+    raise ValueError(f"Unknown data source: {source}")
+
+
+def _held_rows(rows, held) -> np.ndarray:
+    """Mask of `rows` (a DataFrame) accounted for by the multiset `held`
+
+    Rows equal in every column are interchangeable, so the first n copies of a row are
+    held when `held` has n copies of it.
+    """
+    columns = list(rows.columns)
+    if held is None or held.empty or rows.empty:
+        return np.zeros(len(rows), dtype=bool)
+    occurrence = rows.groupby(columns, sort=False).cumcount().to_numpy()
+    counts = held.groupby(columns, sort=False).size().rename("_held").reset_index()
+    held_count = rows.merge(counts, on=columns, how="left")["_held"].fillna(0).to_numpy()
+    return occurrence < held_count
+
+
+class IncrementalTrainer:
+    """Watermark-driven loading into a local columnar snapshot, with warm-start retraining
+
+    `state_dir` holds state.json (watermark, part count, parts already trained on), the
+    snapshot as one Arrow IPC file per load, the rows stamped exactly at the watermark
+    (boundary-<part>.arrow) and the latest model. Each run loads rows in [watermark,
+    current max] through the load_data component and drops the boundary rows it already
+    holds, so rows committed later with the watermark's timestamp are not lost. It then
+    refits LogisticRegression from the previous coefficients on the new parts plus a
+    uniform sample of older rows (replay_rows), instead of the whole snapshot.
+    full=True drops the snapshot and trains from scratch.
+    """
+
+    def __init__(self, state_dir: str, source: str = "sqlite", source_uri: str = "", project_id: str = "local",
+                 learning_rate: float = 0.01, max_iter: int = 1000, replay_rows: int = 10_000):
+        self.state_dir = state_dir
+        self.source = source
+        self.source_uri = source_uri
+        self.project_id = project_id
+        self.learning_rate = learning_rate
+        self.max_iter = max_iter
+        self.replay_rows = replay_rows
+        self.snapshot_dir = os.path.join(state_dir, "snapshot")
+        self.model_path = os.path.join(state_dir, "model.joblib")
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        self.state = self._load_state()
+
+    def _load_state(self) -> dict:
+        path = os.path.join(self.state_dir, STATE_FILE)
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+        return {"watermark": "", "parts": 0, "rows": 0, "trained_parts": 0}
+
+    def _save_state(self):
+        fd, tmp = tempfile.mkstemp(dir=self.state_dir)
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, os.path.join(self.state_dir, STATE_FILE))
+
+    def _part_paths(self) -> list:
+        return [os.path.join(self.snapshot_dir, f"part-{i:06d}.arrow") for i in range(self.state["parts"])]
+
+    def _boundary_path(self, parts: int) -> str:
+        return os.path.join(self.state_dir, f"boundary-{parts:06d}.arrow")
+
+    @staticmethod
+    def _read_frame(path: str):
+        import pyarrow as pa
+
+        with pa.memory_map(path, "r") as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+
+    @staticmethod
+    def _write_frame(frame, path: str):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        tmp = path + ".tmp"
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+
+    def load_delta(self) -> int:
+        """Append rows in [watermark, current max] not yet held as a new snapshot part; returns the row count"""
+        import pandas as pd
+
+        pipeline = importlib.import_module("5_training_pipeline")
+        new_watermark = max_feature_timestamp(self.source, self.source_uri, self.project_id)
+        if not new_watermark:
+            return 0
+
+        loaded = os.path.join(self.state_dir, "delta.arrow")
+        pipeline.load_data.python_func(
+            project_id=self.project_id,
+            dataset=LocalArtifact(loaded),
+            profile=LocalArtifact(os.path.join(self.state_dir, "load_profile.json")),
+            source=self.source,
+            source_uri=self.source_uri,
+            min_feature_timestamp=self.state["watermark"],
+            max_feature_timestamp=new_watermark
+        )
+        frame = self._read_frame(loaded)
+        os.remove(loaded)
+        stamps = pd.to_datetime(frame.pop("feature_timestamp"), utc=True, format="mixed")
+
+        boundary = None
+        if self.state["watermark"]:
+            at_watermark = (stamps == pd.to_datetime(self.state["watermark"], utc=True)).to_numpy()
+            held = np.zeros(len(frame), dtype=bool)
+            if os.path.exists(self._boundary_path(self.state["parts"])):
+                boundary = self._read_frame(self._boundary_path(self.state["parts"]))
+                held[at_watermark] = _held_rows(frame[at_watermark].reset_index(drop=True), boundary)
+            else:
+                # State written before boundary rows were kept: the watermark was exclusive
+                held[at_watermark] = True
+            frame, stamps = frame[~held].reset_index(drop=True), stamps[~held].reset_index(drop=True)
+        if frame.empty:
+            return 0
+
+        at_new = (stamps == pd.to_datetime(new_watermark, utc=True)).to_numpy()
+        if boundary is not None and pd.to_datetime(new_watermark, utc=True) == pd.to_datetime(
+                self.state["watermark"], utc=True):
+            # Late rows at the same timestamp join the ones already held
+            new_boundary = pd.concat([boundary, frame[at_new]], ignore_index=True)
+        else:
+            new_boundary = frame[at_new]
+
+        parts = self.state["parts"]
+        self._write_frame(frame, os.path.join(self.snapshot_dir, f"part-{parts:06d}.arrow"))
+        self._write_frame(new_boundary, self._boundary_path(parts + 1))
+        # The watermark only moves once the part and its boundary rows are fully written
+        self.state.update({"watermark": new_watermark, "parts": parts + 1, "rows": self.state["rows"] + len(frame)})
+        self._save_state()
+        if os.path.exists(self._boundary_path(parts)):
+            os.remove(self._boundary_path(parts))
+        return len(frame)
+
+    def read_snapshot(self, paths: list = None, sample_rows: int = None, seed: int = 0):
+        """(X float32, species) from snapshot parts (all by default), or a uniform sample of sample_rows rows
+
+        Parts are memory-mapped, only the rows needed are copied out, and the mappings are
+        closed before returning.
+        """
+        import pyarrow as pa
+
+        paths = self._part_paths() if paths is None else paths
+        with contextlib.ExitStack() as stack:
+            tables = [pa.ipc.open_file(stack.enter_context(pa.memory_map(path, "r"))).read_all() for path in paths]
+            if not tables:
+                return np.empty((0, len(FEATURE_COLUMNS)), dtype=np.float32), np.empty(0, dtype=object)
+            table = pa.concat_tables(tables)
+            if sample_rows is not None and sample_rows < table.num_rows:
+                rng = np.random.default_rng(seed)
+                table = table.take(np.sort(rng.choice(table.num_rows, sample_rows, replace=False)))
+            X = np.empty((table.num_rows, len(FEATURE_COLUMNS)), dtype=np.float32, order="F")
+            for i, column in enumerate(FEATURE_COLUMNS):
+                X[:, i] = table.column(column).to_numpy()
+            species = table.column(TARGET_COLUMN).to_numpy(zero_copy_only=False)
+        return X, species
+
+    def train(self, warm_start: bool = True) -> dict:
+        """Fit on the new parts plus replayed older rows from the previous model, or on the whole snapshot"""
+        import joblib
+        from sklearn.exceptions import ConvergenceWarning
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.model_selection import train_test_split
+        from sklearn.preprocessing import LabelEncoder
+
+        paths = self._part_paths()
+        trained = self.state.get("trained_parts", 0)
+        previous = joblib.load(self.model_path) if warm_start and os.path.exists(self.model_path) else None
+        if previous is not None and 0 < trained < len(paths):
+            X_new, species_new = self.read_snapshot(paths[trained:])
+            # Replaying a sample of older rows keeps the fit from drifting to the delta alone
+            X_old, species_old = self.read_snapshot(paths[:trained], max(self.replay_rows, len(X_new)))
+            X, species = np.concatenate([X_new, X_old]), np.concatenate([species_new, species_old])
+        else:
+            previous = None
+            X, species = self.read_snapshot(paths)
+        if previous is not None and set(np.unique(species)) <= set(previous["label_encoder"].classes_):
+            le = previous["label_encoder"]
+        else:
+            # A new class changes the coefficient shape, so it needs a cold fit on everything
+            if previous is not None:
+                X, species = self.read_snapshot(paths)
+            previous = None
+            le = LabelEncoder().fit(species)
+        y = le.transform(species)
+
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        clf = LogisticRegression(
+            C=1 / self.learning_rate,
+            max_iter=self.max_iter,
+            random_state=42,
+            warm_start=previous is not None
+        )
+        if previous is not None:
+            clf.coef_ = previous["model"].coef_.copy()
+            clf.intercept_ = previous["model"].intercept_.copy()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", ConvergenceWarning)
+            clf.fit(X_train, y_train)
+        accuracy = float((clf.predict(X_test) == y_test).mean())
+
+        joblib.dump({
+            "model": clf,
+            "label_encoder": le,
+            "feature_names": list(FEATURE_COLUMNS),
+            "feature_means": X_train.mean(axis=0).tolist(),
+        }, self.model_path)
+        self.state["trained_parts"] = len(paths)
+        self._save_state()
+        return {
+            "accuracy": accuracy,
+            "samples_count": len(X),
+            "snapshot_rows": self.state["rows"],
+            "warm_started": previous is not None,
+            "n_iter": int(np.max(clf.n_iter_)),
+        }
+
+    def run(self, full: bool = False) -> dict:
+        """One incremental (or full, on demand) load + retrain cycle with timings"""
+        if full:
+            shutil.rmtree(self.snapshot_dir, ignore_errors=True)
+            os.makedirs(self.snapshot_dir)
+            for name in os.listdir(self.state_dir):
+                if name.startswith("boundary-") or name == "model.joblib":
+                    os.remove(os.path.join(self.state_dir, name))
+            self.state = {"watermark": "", "parts": 0, "rows": 0, "trained_parts": 0}
+            self._save_state()
+
+        start = time.perf_counter()
+        delta_rows = self.load_delta()
+        load_s = time.perf_counter() - start
+        if self.state.get("trained_parts", 0) == self.state["parts"] and os.path.exists(self.model_path):
+            return {"mode": "noop", "delta_rows": 0, "load_s": load_s, "train_s": 0.0}
+
+        start = time.perf_counter()
+        metrics = self.train(warm_start=not full)
+        metrics.update({
+            "mode": "full" if full else "incremental",
+            "delta_rows": delta_rows,
+            "load_s": load_s,
+            "train_s": time.perf_counter() - start,
+            "watermark": self.state["watermark"],
+        })
+        return metrics
@@ -0,0 +1,164 @@
+# ingestion.py
+import math
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+
+def existing_feature_ids(entity_type) -> set:
+    """List the entity type's features once (not once per column)"""
+    return {feature.name.split("/")[-1] for feature in entity_type.list_features()}
+
+
+def missing_feature_columns(entity_type, feature_columns: list) -> list:
+    existing = existing_feature_ids(entity_type)
+    return [col for col in feature_columns if col not in existing]
+
+
+def iter_column_chunks(df: pd.DataFrame, entity_id_column: str, feature_columns: list,
+                       columns_per_chunk: int = 10, rows_per_chunk: int = 100_000):
+    """Yield (chunk_id, frame) with the entity id plus a group of feature columns and a row range"""
+    chunk_id = 0
+    for r in range(0, len(df), rows_per_chunk):
+        for c in range(0, len(feature_columns), columns_per_chunk):
+            columns = feature_columns[c:c + columns_per_chunk]
+            yield chunk_id, df.iloc[r:r + rows_per_chunk][[entity_id_column] + columns]
+            chunk_id += 1
+
+
+class LocalIngestionBackend:
+    """Filesystem/in-memory stand-in: each chunk is written as Parquet, then merged into a dict store
+
+    `latency_s` simulates the remote ingestion call; `fail_every` makes every n-th call fail
+    once so the retry path can be exercised offline.
+    """
+
+    def __init__(self, root: str, latency_s: float = 0.0, fail_every: int = 0):
+        self.root = root
+        self.latency_s = latency_s
+        self.fail_every = fail_every
+        self.store = {}
+        self._calls = 0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def ingest_chunk(self, chunk_id: int, frame: pd.DataFrame, entity_id_column: str, feature_time) -> int:
+        with self._lock:
+            self._calls += 1
+            call = self._calls
+        if self.fail_every and call % self.fail_every == 0:
+            raise ConnectionError(f"Simulated transient failure on call {call}")
+
+        path = os.path.join(self.root, f"chunk-{chunk_id:06d}.parquet")
+        frame.to_parquet(path, index=False)
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+        records = frame.set_index(entity_id_column).to_dict("index")
+        with self._lock:
+            for entity_id, values in records.items():
+                self.store.setdefault(entity_id, {}).update(values)
+        return os.path.getsize(path)
+
+
+class VertexIngestionBackend:
+    """Ingests each chunk with EntityType.ingest_from_df, skipping the GCS CSV export
+
+    Every ingest_from_df call stages its frame and runs a separate ingestion job with
+    minutes of fixed overhead, and concurrent jobs per entity type are limited. So
+    ChunkedIngestor sends at most `max_jobs` chunks (max_chunks), each with every feature
+    column: by default the whole frame goes in one job.
+    """
+
+    def __init__(self, entity_type, max_jobs: int = 1):
+        self.entity_type = entity_type
+        self.max_chunks = max_jobs
+
+    def ingest_chunk(self, chunk_id: int, frame: pd.DataFrame, entity_id_column: str, feature_time) -> int:
+        feature_ids = [c for c in frame.columns if c != entity_id_column]
+        self.entity_type.ingest_from_df(
+            feature_ids=feature_ids,
+            feature_time=feature_time,
+            df_source=frame,
+            entity_id_field=entity_id_column
+        )
+        return int(frame.memory_usage(index=False, deep=True).sum())
+
+
+class ChunkedIngestor:
+    """Ingests column/row chunks concurrently with bounded in-flight work and retries
+
+    Backends with a `max_chunks` attribute (VertexIngestionBackend) are sent at most that
+    many chunks, each holding all feature columns, whatever chunk sizes are requested.
+    metrics covers the latest ingest() call only.
+    """
+
+    def __init__(self, backend, max_in_flight: int = 4, max_retries: int = 3, backoff_s: float = 0.5,
+                 progress_every: int = 0):
+        self.backend = backend
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.progress_every = progress_every
+        self.metrics = self._empty_metrics()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _empty_metrics() -> dict:
+        return {"chunks": 0, "rows": 0, "cells": 0, "bytes": 0, "retries": 0, "failed_chunks": 0}
+
+    def _ingest_with_retries(self, chunk_id, frame, entity_id_column, feature_time):
+        for attempt in range(self.max_retries + 1):
+            try:
+                written = self.backend.ingest_chunk(chunk_id, frame, entity_id_column, feature_time)
+                break
+            except Exception:
+                if attempt == self.max_retries:
+                    with self._lock:
+                        self.metrics["failed_chunks"] += 1
+                    raise
+                with self._lock:
+                    self.metrics["retries"] += 1
+                time.sleep(self.backoff_s * 2 ** attempt)
+        with self._lock:
+            self.metrics["chunks"] += 1
+            self.metrics["cells"] += frame.shape[0] * (frame.shape[1] - 1)
+            self.metrics["bytes"] += written
+        return chunk_id
+
+    def ingest(self, df: pd.DataFrame, entity_id_column: str, feature_columns: list, feature_time=None,
+               columns_per_chunk: int = 10, rows_per_chunk: int = 100_000) -> dict:
+        feature_time = feature_time if feature_time is not None else pd.Timestamp.now()
+        max_chunks = getattr(self.backend, "max_chunks", None)
+        if max_chunks:
+            columns_per_chunk = max(len(feature_columns), 1)
+            rows_per_chunk = max(math.ceil(len(df) / max_chunks), 1)
+        self.metrics = self._empty_metrics()
+        start = time.perf_counter()
+        pending = set()
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            chunks = iter_column_chunks(df, entity_id_column, feature_columns, columns_per_chunk, rows_per_chunk)
+            for chunk_id, frame in chunks:
+                if len(pending) >= self.max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                    self._report(start)
+                pending.add(pool.submit(self._ingest_with_retries, chunk_id, frame, entity_id_column, feature_time))
+            for future in pending:
+                future.result()
+
+        elapsed = time.perf_counter() - start
+        self.metrics["rows"] = len(df)
+        self.metrics["elapsed_s"] = elapsed
+        self.metrics["cells_per_second"] = self.metrics["cells"] / elapsed if elapsed else 0.0
+        return dict(self.metrics)
+
+    def _report(self, start: float):
+        if self.progress_every and self.metrics["chunks"] % self.progress_every == 0:
+            elapsed = time.perf_counter() - start
+            print(f"  ingested {self.metrics['chunks']} chunks, {self.metrics['cells']:,} cells "
+                  f"({self.metrics['cells'] / elapsed:,.0f} cells/s, {self.metrics['retries']} retries)")
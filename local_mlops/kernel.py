@@ -0,0 +1,178 @@
+# kernel.py
+# Dependency-free inference for the train_model artifact: only NumPy is imported here.
+#
+# Kernel file format (uncompressed .npz, loaded with allow_pickle=False):
+#   format_version  int32 scalar, KERNEL_FORMAT_VERSION
+#   coef            float32 (classes, features), binary models expanded to two rows
+#   intercept       float32 (classes,)
+#   classes         unicode (classes,), the LabelEncoder classes
+#   feature_names   unicode (features,)
+#   link            unicode scalar, "softmax" (multinomial) or "ovr" (one-vs-rest)
+#
+# Members are stored uncompressed with their data aligned to KERNEL_ALIGNMENT bytes (see
+# save_kernel), so map_kernel can use them in place from a memory mapping.
+import io
+import mmap
+import struct
+import zipfile
+
+import numpy as np
+
+KERNEL_FORMAT_VERSION = 1
+KERNEL_ALIGNMENT = 64
+
+
+def kernel_arrays(model_artifacts: dict) -> dict:
+    """Arrays for the kernel file from the train_model artifact dict
+
+    Artifacts carrying a fitted transform (schema-trained, with category features) are
+    refused: the kernel has no preprocessing, so it would score unencoded request rows.
+    """
+    if model_artifacts.get("transform") is not None:
+        raise ValueError("The artifact carries a preprocessing transform, which the kernel cannot apply")
+    clf = model_artifacts["model"]
+    coef = np.asarray(clf.coef_, dtype=np.float64)
+    intercept = np.asarray(clf.intercept_, dtype=np.float64)
+    if coef.shape[0] == 1:
+        # softmax([-z/2, z/2]) == [1 - sigmoid(z), sigmoid(z)]
+        coef = np.vstack([-coef, coef]) / 2
+        intercept = np.array([-intercept[0], intercept[0]]) / 2
+        link = "softmax"
+    elif type(clf).__name__ == "SGDClassifier":
+        # SGDClassifier always fits one binary classifier per class
+        link = "ovr"
+    elif getattr(clf, "multi_class", "auto") == "ovr" or getattr(clf, "solver", None) == "liblinear":
+        link = "ovr"
+    else:
+        link = "softmax"
+
+    return {
+        "format_version": np.int32(KERNEL_FORMAT_VERSION),
+        "coef": coef.astype(np.float32),
+        "intercept": intercept.astype(np.float32),
+        "classes": np.asarray(model_artifacts["label_encoder"].classes_).astype(str),
+        "feature_names": np.asarray(model_artifacts["feature_names"]).astype(str),
+        "link": np.str_(link),
+    }
+
+
+def save_kernel(f, arrays: dict):
+    """np.savez layout with every member's data aligned to KERNEL_ALIGNMENT bytes
+
+    The local header's extra field is padded (as zipalign does) so each member starts
+    aligned; .npy headers are themselves padded to a multiple of 64 bytes. Timestamps are
+    fixed, so the same arrays always give the same bytes (and registry digest).
+    """
+    with zipfile.ZipFile(f, "w", zipfile.ZIP_STORED) as archive:
+        for name, array in arrays.items():
+            member = io.BytesIO()
+            np.lib.format.write_array(member, np.asanyarray(array), allow_pickle=False)
+            info = zipfile.ZipInfo(f"{name}.npy", date_time=(1980, 1, 1, 0, 0, 0))
+            padding = -(archive.fp.tell() + 30 + len(info.filename.encode()) + 4) % KERNEL_ALIGNMENT
+            info.extra = struct.pack("<HH", 0xD935, padding) + bytes(padding)
+            archive.writestr(info, member.getvalue())
+
+
+def export_kernel(model_path: str, kernel_path: str) -> str:
+    """Write the kernel file for a joblib artifact written by train_model"""
+    import joblib
+
+    arrays = kernel_arrays(joblib.load(model_path))
+    with open(kernel_path, "wb") as f:
+        save_kernel(f, arrays)
+    return kernel_path
+
+
+def map_kernel(kernel_path: str) -> dict:
+    """Arrays of a kernel file as read-only views of one shared mapping of the file
+
+    np.load cannot memory-map .npz members, but kernel files are stored uncompressed, so
+    each member is a plain .npy blob at a fixed offset. Processes mapping the same file
+    share its pages in the page cache instead of each holding a copy. Members that are
+    not aligned (files written by plain np.savez) are copied out instead.
+    """
+    with open(kernel_path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        arrays = {}
+        with zipfile.ZipFile(f) as archive:
+            for info in archive.infolist():
+                if info.compress_type != zipfile.ZIP_STORED:
+                    raise ValueError(f"{kernel_path}: {info.filename} is compressed and cannot be mapped")
+                # Local file header: 30 fixed bytes, then the name and extra field
+                name_length, extra_length = struct.unpack_from("<HH", buffer, info.header_offset + 26)
+                f.seek(info.header_offset + 30 + name_length + extra_length)
+                if np.lib.format.read_magic(f) == (1, 0):
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+                else:
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+                array = np.ndarray(
+                    shape, dtype, buffer=buffer, offset=f.tell(), order="F" if fortran_order else "C"
+                )
+                arrays[info.filename[:-len(".npy")]] = array if array.flags.aligned else array.copy()
+    return arrays
+
+
+class NumpyPredictor:
+    """Batched matmul + softmax over a kernel file, with preallocated output buffers
+
+    Results returned by predict_proba are views into the internal buffers and are only
+    valid until the next call; pass `out` to keep them. With mmap=True the weights stay in
+    the file mapping (see map_kernel) instead of being copied into this process.
+    """
+
+    def __init__(self, kernel_path: str, max_batch_size: int = 1024, mmap: bool = False):
+        if mmap:
+            self._load(map_kernel(kernel_path), copy=False)
+        else:
+            with np.load(kernel_path, allow_pickle=False) as data:
+                self._load(data, copy=True)
+        self.max_batch_size = max_batch_size
+        self._logits = np.empty((max_batch_size, len(self.classes)), dtype=np.float32)
+        self._sums = np.empty((max_batch_size, 1), dtype=np.float32)
+
+    def _load(self, data, copy: bool):
+        version = int(data["format_version"])
+        if version != KERNEL_FORMAT_VERSION:
+            raise ValueError(f"Unsupported kernel format version {version}, expected {KERNEL_FORMAT_VERSION}")
+        if copy:
+            # Transposed once so predict is a plain (rows, features) @ (features, classes)
+            self.coef_t = np.ascontiguousarray(data["coef"].T)
+            self.intercept = data["intercept"].copy()
+        else:
+            # A transposed view: matmul passes it to BLAS as-is
+            self.coef_t = data["coef"].T
+            self.intercept = data["intercept"]
+        self.classes = data["classes"].copy()
+        self.feature_names = data["feature_names"].tolist()
+        self.link = str(data["link"])
+
+    def predict_proba(self, X, out=None) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        rows = len(X)
+        if rows > self.max_batch_size:
+            # Grow the buffers once instead of allocating per call
+            self.max_batch_size = rows
+            self._logits = np.empty((rows, len(self.classes)), dtype=np.float32)
+            self._sums = np.empty((rows, 1), dtype=np.float32)
+        logits = self._logits[:rows] if out is None else out
+        sums = self._sums[:rows]
+
+        np.matmul(X, self.coef_t, out=logits)
+        logits += self.intercept
+        if self.link == "softmax":
+            logits -= logits.max(axis=1, keepdims=True)
+            np.exp(logits, out=logits)
+        else:
+            # One-vs-rest: independent sigmoids, then normalized like sklearn. exp overflows
+            # to inf for very negative logits, whose sigmoid is then exactly 0
+            np.negative(logits, out=logits)
+            with np.errstate(over="ignore"):
+                np.exp(logits, out=logits)
+            logits += 1
+            np.reciprocal(logits, out=logits)
+        np.sum(logits, axis=1, keepdims=True, out=sums)
+        logits /= sums
+        return logits
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes[self.predict_proba(X).argmax(axis=1)]
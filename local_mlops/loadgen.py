@@ -0,0 +1,348 @@
+# loadgen.py
+import http.client
+import json
+import os
+import platform
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import numpy as np
+
+
+def process_cpu_seconds(pid: int) -> float:
+    """User + system CPU time of another local process, from /proc"""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    # utime and stime are fields 14 and 15 of the full line
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class HttpTarget:
+    """POSTs payloads to a prediction server; one keep-alive connection per worker thread
+
+    The server's CPU time is only visible when it runs on this host: pass its server_pid
+    to report target CPU per request.
+    """
+
+    def __init__(self, url: str, path: str = "/predict", timeout: float = 10.0, server_pid: int = None):
+        parsed = urlparse(url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.path = path
+        self.timeout = timeout
+        self.server_pid = server_pid
+        self.name = f"http:{url}"
+        self._local = threading.local()
+
+    def cpu_seconds(self):
+        return process_cpu_seconds(self.server_pid) if self.server_pid else None
+
+    def _connection(self):
+        if getattr(self._local, "conn", None) is None:
+            self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return self._local.conn
+
+    def __call__(self, payload: dict):
+        body = json.dumps(payload)
+        conn = self._connection()
+        try:
+            conn.request("POST", self.path, body, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            data = response.read()
+        except (ConnectionError, http.client.HTTPException, OSError):
+            conn.close()
+            self._local.conn = None
+            raise
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}: {data[:200]!r}")
+        return json.loads(data)
+
+
+class InProcessTarget:
+    """Calls the model directly, without any transport"""
+
+    def __init__(self, model_path: str):
+        from local_mlops.server import load_model_artifacts, make_predict_fn
+
+        self.predict = make_predict_fn(load_model_artifacts(model_path))
+        # Applies the artifact's transform, if any, to the raw instances
+        self.prepare = self.predict.prepare
+        self.name = f"inprocess:{model_path}"
+
+    def cpu_seconds(self) -> float:
+        # The model runs in this process, so its CPU time is the target's
+        return time.process_time()
+
+    def __call__(self, payload: dict):
+        labels, _ = self.predict(self.prepare(payload["instances"]))
+        return {"predictions": labels.tolist()}
+
+
+class EndpointTarget:
+    """Wraps anything with predict(instances=...), e.g. aiplatform.Endpoint or a test stub"""
+
+    def __init__(self, endpoint, name: str = "endpoint"):
+        self.endpoint = endpoint
+        self.name = name
+
+    def __call__(self, payload: dict):
+        return {"predictions": self.endpoint.predict(instances=payload["instances"]).predictions}
+
+
+def load_request_payloads(path: str) -> list:
+    """Read `{"instances": [...]}` payloads, one per JSONL line"""
+    payloads = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                if "instances" in record:
+                    payloads.append({"instances": record["instances"]})
+    if not payloads:
+        raise ValueError(f"No prediction payloads with 'instances' found in {path}")
+    return payloads
+
+
+def synthetic_payloads(count: int = 1000, instances_per_request: int = 1, seed: int = 42) -> list:
+    """Iris-like payloads resampled from Iris.csv"""
+    from local_mlops.datasource import FEATURE_COLUMNS, iter_synthetic_iris
+
+    chunk = next(iter_synthetic_iris(count * instances_per_request, seed=seed))
+    rows = chunk[FEATURE_COLUMNS].to_numpy().tolist()
+    return [
+        {"instances": rows[i:i + instances_per_request]}
+        for i in range(0, len(rows), instances_per_request)
+    ]
+
+
+def _target_cpu_seconds(target):
+    """The target's CPU clock if it exposes one (see HttpTarget.server_pid), else None"""
+    cpu_seconds = getattr(target, "cpu_seconds", None)
+    return cpu_seconds() if cpu_seconds else None
+
+
+def summarize(latencies: list, errors: int, elapsed: float, client_cpu_seconds: float,
+              target_cpu_seconds: float = None) -> dict:
+    """Latency percentiles (ms), throughput, error rate and CPU per request
+
+    elapsed is the measured wall time of the run, not its nominal duration, so requests
+    still in flight at the end do not inflate throughput. client_cpu_ms_per_request is
+    this process (the load generator, plus the model for in-process targets);
+    target_cpu_ms_per_request is the serving side when the target can be measured.
+    """
+    completed = len(latencies) + errors
+    lat = np.asarray(latencies) * 1e3
+    return {
+        "requests": completed,
+        "errors": errors,
+        "error_rate": errors / completed if completed else 0.0,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": float(np.percentile(lat, 50)) if len(lat) else None,
+        "p95_ms": float(np.percentile(lat, 95)) if len(lat) else None,
+        "p99_ms": float(np.percentile(lat, 99)) if len(lat) else None,
+        "max_ms": float(lat.max()) if len(lat) else None,
+        "client_cpu_ms_per_request": client_cpu_seconds * 1e3 / completed if completed else None,
+        "target_cpu_ms_per_request": (target_cpu_seconds * 1e3 / completed
+                                      if completed and target_cpu_seconds is not None else None),
+        "elapsed_s": elapsed,
+    }
+
+
+def run_closed_loop(target, payloads: list, concurrency: int, duration_s: float = 5.0,
+                    warmup_s: float = 1.0) -> dict:
+    """`concurrency` workers each send the next request as soon as the previous one returns"""
+    lock = threading.Lock()
+    latencies, errors = [], [0]
+    counter = [0]
+    measure_from = time.perf_counter() + warmup_s
+    stop_at = measure_from + duration_s
+
+    def worker():
+        local_lat, local_err = [], 0
+        while True:
+            with lock:
+                i = counter[0]
+                counter[0] += 1
+            payload = payloads[i % len(payloads)]
+            start = time.perf_counter()
+            if start >= stop_at:
+                break
+            try:
+                target(payload)
+                ok = True
+            except Exception:
+                ok = False
+            if start >= measure_from:
+                if ok:
+                    local_lat.append(time.perf_counter() - start)
+                else:
+                    local_err += 1
+        with lock:
+            latencies.extend(local_lat)
+            errors[0] += local_err
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    # Warmup requests are excluded from latency and from the CPU measurement
+    time.sleep(max(measure_from - time.perf_counter(), 0))
+    cpu_start = time.process_time()
+    target_cpu_start = _target_cpu_seconds(target)
+    for t in threads:
+        t.join()
+    # The last requests started before stop_at may finish after it
+    elapsed = time.perf_counter() - measure_from
+    target_cpu_end = _target_cpu_seconds(target)
+    target_cpu = target_cpu_end - target_cpu_start if target_cpu_start is not None else None
+    result = summarize(latencies, errors[0], elapsed, time.process_time() - cpu_start, target_cpu)
+    result.update({"mode": "closed_loop", "concurrency": concurrency})
+    return result
+
+
+def run_open_loop(target, payloads: list, rate_rps: float, duration_s: float = 5.0,
+                  warmup_s: float = 1.0, max_workers: int = 64, seed: int = 0) -> dict:
+    """Poisson arrivals at `rate_rps`, independent of response times
+
+    Latency is measured from each request's scheduled arrival, so queueing delay caused by a
+    slow target is included instead of hidden (no coordinated omission).
+    """
+    rng = np.random.default_rng(seed)
+    total = int(rate_rps * (warmup_s + duration_s))
+    arrivals = np.cumsum(rng.exponential(1 / rate_rps, total))
+    lock = threading.Lock()
+    latencies, errors = [], [0]
+
+    def send(payload, scheduled: float, measured: bool):
+        try:
+            target(payload)
+            ok = True
+        except Exception:
+            ok = False
+        if measured:
+            with lock:
+                if ok:
+                    latencies.append(time.perf_counter() - scheduled)
+                else:
+                    errors[0] += 1
+
+    begin = time.perf_counter()
+    cpu_start = target_cpu_start = None
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for i, offset in enumerate(arrivals):
+            scheduled = begin + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            measured = offset >= warmup_s
+            if measured and cpu_start is None:
+                cpu_start = time.process_time()
+                target_cpu_start = _target_cpu_seconds(target)
+            pool.submit(send, payloads[i % len(payloads)], scheduled, measured)
+    # Measured from the first measured arrival until the last response, not the nominal duration
+    elapsed = time.perf_counter() - begin - warmup_s
+    cpu = time.process_time() - (cpu_start or time.process_time())
+    target_cpu_end = _target_cpu_seconds(target)
+    target_cpu = target_cpu_end - target_cpu_start if target_cpu_start is not None else None
+    result = summarize(latencies, errors[0], elapsed, cpu, target_cpu)
+    result.update({"mode": "open_loop", "target_rate_rps": rate_rps})
+    return result
+
+
+def run_benchmark(target, payloads: list, concurrency_levels=(1, 4, 16), rates=(),
+                  duration_s: float = 5.0, warmup_s: float = 1.0, output_path: str = None) -> dict:
+    """Concurrency sweep plus optional open-loop rates; optionally written as JSON"""
+    runs = []
+    for concurrency in concurrency_levels:
+        runs.append(run_closed_loop(target, payloads, concurrency, duration_s, warmup_s))
+    for rate in rates:
+        runs.append(run_open_loop(target, payloads, rate, duration_s, warmup_s))
+
+    report = {
+        "target": getattr(target, "name", type(target).__name__),
+        "timestamp": time.time(),
+        "host": platform.node(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "payloads": len(payloads),
+        "runs": runs,
+    }
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+def compare_reports(baseline: dict, current: dict, tolerance: float = 0.10) -> list:
+    """Regressions between two reports: runs matched by mode and concurrency/rate"""
+    def run_key(run):
+        return run["mode"], run.get("concurrency"), run.get("target_rate_rps")
+
+    baseline_runs = {run_key(r): r for r in baseline["runs"]}
+    regressions = []
+    for run in current["runs"]:
+        before = baseline_runs.get(run_key(run))
+        if before is None:
+            continue
+        for metric in ("p50_ms", "p99_ms"):
+            if before[metric] and run[metric] and run[metric] > before[metric] * (1 + tolerance):
+                regressions.append((run_key(run), metric, before[metric], run[metric]))
+        if run["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append((run_key(run), "throughput_rps", before["throughput_rps"], run["throughput_rps"]))
+        if run["error_rate"] > before["error_rate"]:
+            regressions.append((run_key(run), "error_rate", before["error_rate"], run["error_rate"]))
+    return regressions
+
+
+def format_report(report: dict) -> str:
+    lines = [f"target: {report['target']}"]
+    for run in report["runs"]:
+        load = (f"concurrency {run['concurrency']:>3}" if run["mode"] == "closed_loop"
+                else f"rate {run['target_rate_rps']:>7.0f}/s")
+        if run["p50_ms"] is None:
+            lines.append(f"  {load}: no successful requests ({run['errors']} errors)")
+            continue
+        lines.append(
+            f"  {load}: {run['throughput_rps']:>9,.0f} req/s  p50 {run['p50_ms']:.3f} ms  "
+            f"p95 {run['p95_ms']:.3f} ms  p99 {run['p99_ms']:.3f} ms  "
+            f"errors {run['error_rate']:.2%}  client cpu {run['client_cpu_ms_per_request']:.3f} ms/req"
+            + (f"  target cpu {run['target_cpu_ms_per_request']:.3f} ms/req"
+               if run["target_cpu_ms_per_request"] is not None else "")
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load generator for prediction targets")
+    target_group = parser.add_mutually_exclusive_group(required=True)
+    target_group.add_argument("--url", help="Prediction server base URL")
+    target_group.add_argument("--model", help="train_model artifact to call in-process")
+    parser.add_argument("--server-pid", type=int, help="PID of a local --url server, to report its CPU per request")
+    parser.add_argument("--requests-file", help="JSONL file of {\"instances\": [...]} payloads")
+    parser.add_argument("--instances-per-request", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, nargs="*", default=[1, 4, 16])
+    parser.add_argument("--rate", type=float, nargs="*", default=[])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--baseline", help="Previous JSON report to compare against")
+    args = parser.parse_args()
+
+    target = HttpTarget(args.url, server_pid=args.server_pid) if args.url else InProcessTarget(args.model)
+    payloads = (load_request_payloads(args.requests_file) if args.requests_file
+                else synthetic_payloads(instances_per_request=args.instances_per_request))
+    report = run_benchmark(target, payloads, args.concurrency, args.rate,
+                           args.duration, args.warmup, args.output)
+    print(format_report(report))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_reports(json.load(f), report)
+        for key, metric, before, after in regressions:
+            print(f"REGRESSION {key} {metric}: {before:.3f} -> {after:.3f}")
+        if regressions:
+            raise SystemExit(1)
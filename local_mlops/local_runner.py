@@ -0,0 +1,338 @@
+# local_runner.py
+import importlib
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from local_mlops.artifacts import LocalArtifact
+from local_mlops.pipeline_compile import PIPELINE_MODULE, ROOT, compile_pipeline
+
+RUNS_ROOT = os.getenv("LOCAL_PIPELINE_ROOT", os.path.expanduser("~/.iris_pipeline_runs"))
+
+_PARAMETER_TYPES = {
+    "NUMBER_INTEGER": int,
+    "NUMBER_DOUBLE": float,
+    "STRING": str,
+    "BOOLEAN": bool,
+    "STRUCT": dict,
+    "LIST": list,
+}
+
+
+def _coerce(value, parameter_type: str):
+    if value is None or parameter_type not in _PARAMETER_TYPES:
+        return value
+    return _PARAMETER_TYPES[parameter_type](value)
+
+
+def load_pipeline_dag(spec: dict) -> dict:
+    """Tasks of a compiled pipeline's root DAG: the function to run, input bindings, outputs, dependencies"""
+    tasks = {}
+    for name, task in spec["root"]["dag"]["tasks"].items():
+        component = spec["components"][task["componentRef"]["name"]]
+        container = spec["deploymentSpec"]["executors"][component["executorLabel"]]["container"]
+        args = container["args"]
+        inputs = task.get("inputs", {})
+        artifacts = {
+            key: (binding["taskOutputArtifact"]["producerTask"], binding["taskOutputArtifact"]["outputArtifactKey"])
+            for key, binding in inputs.get("artifacts", {}).items()
+        }
+        parameter_types = {
+            key: definition["parameterType"]
+            for key, definition in component.get("inputDefinitions", {}).get("parameters", {}).items()
+        }
+        outputs = component.get("outputDefinitions", {})
+        producers = {producer for producer, _ in artifacts.values()}
+        producers |= {
+            binding["taskOutputParameter"]["producerTask"]
+            for binding in inputs.get("parameters", {}).values() if "taskOutputParameter" in binding
+        }
+        tasks[name] = {
+            "function": args[args.index("--function_to_execute") + 1],
+            "parameters": inputs.get("parameters", {}),
+            "parameter_types": parameter_types,
+            "artifacts": artifacts,
+            "output_artifacts": list(outputs.get("artifacts", {})),
+            "output_parameters": list(outputs.get("parameters", {})),
+            "depends_on": sorted(set(task.get("dependentTasks", [])) | producers),
+        }
+    return tasks
+
+
+def pipeline_defaults(spec: dict) -> dict:
+    return {
+        name: _coerce(definition.get("defaultValue"), definition["parameterType"])
+        for name, definition in spec["root"].get("inputDefinitions", {}).get("parameters", {}).items()
+    }
+
+
+def _output_values(result, output_parameters: list) -> dict:
+    if result is None:
+        return {}
+    if hasattr(result, "_asdict"):
+        return dict(result._asdict())
+    if output_parameters == ["Output"]:
+        return {"Output": result}
+    return {}
+
+
+def _prewarm(module_name: str):
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    importlib.import_module(module_name)
+
+
+def _run_component(module_name: str, function_name: str, arguments: dict, artifacts: dict,
+                   output_parameters: list) -> dict:
+    """Call a component's Python function with local artifacts; runs in a thread or a worker process"""
+    _prewarm(module_name)
+    module, _, attribute = function_name.rpartition(":")
+    function = getattr(importlib.import_module(module or module_name), attribute)
+    function = getattr(function, "python_func", function)
+    handles = {name: LocalArtifact(path, dict(metadata)) for name, (path, metadata) in artifacts.items()}
+    start = time.perf_counter()
+    result = function(**arguments, **handles)
+    return {
+        "outputs": _output_values(result, output_parameters),
+        "metadata": {name: handle.metadata for name, handle in handles.items()},
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def deploy_model_locally(model, endpoint_name: str, profile, **_) -> str:
+    """deploy_model stand-in: serves the model artifact from a LocalPredictionServer; returns its URL"""
+    from local_mlops.server import LocalPredictionServer
+
+    start = time.perf_counter()
+    server = LocalPredictionServer(model.path).start()
+    _LOCAL_ENDPOINTS[server.url] = server
+    with open(profile.path, "w") as f:
+        json.dump({"step": "deploy_model", "endpoint": endpoint_name, "deploy_s": time.perf_counter() - start}, f)
+    return server.url
+
+
+# URL -> LocalPredictionServer started by deploy_model_locally in this process
+_LOCAL_ENDPOINTS = {}
+
+# Components replaced when running locally; always run in the runner's own process
+DEFAULT_OVERRIDES = {"deploy_model": "local_mlops.local_runner:deploy_model_locally"}
+
+
+class LocalPipelineRun:
+    """Result of one local run: per-task timings and outputs, artifact paths, local endpoints"""
+
+    def __init__(self, run_dir: str, tasks: dict, wall_s: float, setup_s: float, status: str):
+        self.run_dir = run_dir
+        self.tasks = tasks
+        self.wall_s = wall_s
+        self.setup_s = setup_s
+        self.status = status
+
+    @property
+    def endpoints(self) -> list:
+        return [
+            task["outputs"]["Output"] for task in self.tasks.values()
+            if task["outputs"].get("Output") in _LOCAL_ENDPOINTS
+        ]
+
+    def endpoint(self):
+        """A LocalEndpoint for the (first) locally deployed model"""
+        from local_mlops.server import LocalEndpoint
+
+        return LocalEndpoint(self.endpoints[0])
+
+    def close(self):
+        """Stop the local endpoints this run started"""
+        for url in self.endpoints:
+            _LOCAL_ENDPOINTS.pop(url).stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def summary(self) -> dict:
+        busy = sum(t["seconds"] or 0.0 for t in self.tasks.values())
+        return {
+            "status": self.status,
+            "wall_s": self.wall_s,
+            "setup_s": self.setup_s,
+            "task_seconds": busy,
+            "parallelism": busy / (self.wall_s - self.setup_s) if self.wall_s > self.setup_s else 0.0,
+            "run_dir": self.run_dir,
+        }
+
+    def format_timeline(self) -> str:
+        lines = [f"  {'setup':<22} {0.0:7.2f} s -> {self.setup_s:7.2f} s  (compile, imports, workers)"]
+        for name, task in sorted(self.tasks.items(), key=lambda item: item[1]["started_s"] or float("inf")):
+            if task["started_s"] is None:
+                lines.append(f"  {name:<22} {task['status']}")
+                continue
+            lines.append(
+                f"  {name:<22} {task['started_s']:7.2f} s -> {task['finished_s']:7.2f} s  "
+                f"({task['seconds']:.2f} s in step, {task['status']})"
+            )
+        summary = self.summary()
+        lines.append(
+            f"  wall {summary['wall_s']:.2f} s end to end, {summary['task_seconds']:.2f} s of step time "
+            f"({summary['parallelism']:.2f}x overlap after setup), artifacts in {self.run_dir}"
+        )
+        return "\n".join(lines)
+
+
+class LocalPipelineRunner:
+    """Runs iris_training_pipeline's @component functions locally, from its compiled spec
+
+    The DAG (tasks, parameter bindings, artifact producers) is read from the compiled
+    pipeline spec (compile_pipeline, cached), so the local run wires steps exactly like
+    Vertex Pipelines. Every task whose inputs are ready is submitted at once to a thread
+    pool (mode="thread") or a process pool (mode="process") of `workers`. Output artifacts
+    are files under <root>/<run_id>/<task>/<name>, and downstream tasks get the same path.
+    Datasets are Arrow IPC and are memory-mapped by the consumers, not copied or
+    re-serialized. Components named in `overrides` ("module:function") run instead in the
+    runner's process. By default deploy_model is replaced by a LocalPredictionServer.
+    """
+
+    def __init__(self, module: str = PIPELINE_MODULE, root: str = RUNS_ROOT, workers: int = 0,
+                 mode: str = "thread", overrides: dict = None):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown mode: {mode}")
+        self.module = module
+        self.root = root
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.mode = mode
+        self.overrides = dict(DEFAULT_OVERRIDES, **(overrides or {}))
+
+    def run(self, arguments: dict = None, run_id: str = None) -> LocalPipelineRun:
+        """Execute the pipeline with `arguments` over its defaults; raises RuntimeError on a failed step"""
+        run_id = run_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        run_dir = os.path.join(self.root, run_id)
+        os.makedirs(run_dir)
+        start = time.perf_counter()
+
+        spec_path = os.path.join(run_dir, "pipeline.json")
+        compile_pipeline(package_path=spec_path, module=self.module)
+        with open(spec_path) as f:
+            spec = json.load(f)
+        dag = load_pipeline_dag(spec)
+        parameters = dict(pipeline_defaults(spec), **(arguments or {}))
+        _prewarm(self.module)
+
+        state = {
+            name: {"status": "pending", "started_s": None, "finished_s": None, "seconds": None, "outputs": {},
+                   "artifacts": {}}
+            for name in dag
+        }
+        pool_cls = ProcessPoolExecutor if self.mode == "process" else ThreadPoolExecutor
+        pool_options = {"initializer": _prewarm, "initargs": (self.module,)} if self.mode == "process" else {}
+        pending = {}
+        failure = None
+        with pool_cls(max_workers=self.workers, **pool_options) as pool, \
+                ThreadPoolExecutor(max_workers=max(len(self.overrides), 1)) as local_pool:
+            if self.mode == "process":
+                # Start every worker (and its imports) before the clock for the first step starts
+                wait([pool.submit(_prewarm, self.module) for _ in range(self.workers)])
+            setup_s = time.perf_counter() - start
+            while True:
+                if failure is None:
+                    for name, task in dag.items():
+                        ready = state[name]["status"] == "pending" and all(
+                            state[dep]["status"] == "succeeded" for dep in task["depends_on"]
+                        )
+                        if ready:
+                            pending[self._submit(pool, local_pool, name, task, parameters, state, run_dir)] = name
+                            state[name]["status"] = "running"
+                            state[name]["started_s"] = time.perf_counter() - start
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = pending.pop(future)
+                    state[name]["finished_s"] = time.perf_counter() - start
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        state[name]["status"] = "failed"
+                        state[name]["error"] = repr(e)
+                        failure = failure or (name, e)
+                        continue
+                    state[name].update(status="succeeded", outputs=result["outputs"], seconds=result["seconds"])
+                    for key, metadata in result["metadata"].items():
+                        if key in state[name]["artifacts"]:
+                            state[name]["artifacts"][key]["metadata"] = metadata
+
+        for task in state.values():
+            if task["status"] == "pending":
+                task["status"] = "skipped"
+        run = LocalPipelineRun(run_dir, state, time.perf_counter() - start, setup_s,
+                               "failed" if failure else "succeeded")
+        with open(os.path.join(run_dir, "run.json"), "w") as f:
+            json.dump({"arguments": parameters, "mode": self.mode, "workers": self.workers,
+                       "summary": run.summary(), "tasks": state}, f, indent=2, default=str)
+        if failure:
+            run.close()
+            raise RuntimeError(f"Task {failure[0]} failed: {failure[1]!r} (see {run_dir}/run.json)") from failure[1]
+        return run
+
+    def _submit(self, pool, local_pool, name: str, task: dict, parameters: dict, state: dict, run_dir: str):
+        arguments = {}
+        for key, binding in task["parameters"].items():
+            if "componentInputParameter" in binding:
+                value = parameters[binding["componentInputParameter"]]
+            elif "taskOutputParameter" in binding:
+                source = binding["taskOutputParameter"]
+                value = state[source["producerTask"]]["outputs"][source["outputParameterKey"]]
+            else:
+                value = binding["runtimeValue"]["constant"]
+            arguments[key] = _coerce(value, task["parameter_types"].get(key))
+
+        artifacts = {}
+        for key, (producer, output_key) in task["artifacts"].items():
+            produced = state[producer]["artifacts"][output_key]
+            artifacts[key] = (produced["path"], produced["metadata"])
+        task_dir = os.path.join(run_dir, name)
+        os.makedirs(task_dir, exist_ok=True)
+        for key in task["output_artifacts"]:
+            path = os.path.join(task_dir, key)
+            state[name]["artifacts"][key] = {"path": path, "metadata": {}}
+            artifacts[key] = (path, {})
+
+        function = task["function"]
+        if function in self.overrides:
+            return local_pool.submit(_run_component, self.module, self.overrides[function], arguments, artifacts,
+                                     task["output_parameters"])
+        return pool.submit(_run_component, self.module, function, arguments, artifacts, task["output_parameters"])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run iris_training_pipeline locally")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUE",
+                        help="Pipeline parameter (repeatable); values are parsed as JSON when possible")
+    parser.add_argument("--mode", choices=("thread", "process"), default="thread")
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--root", default=RUNS_ROOT)
+    parser.add_argument("--serve", action="store_true", help="Keep the local endpoint up until interrupted")
+    args = parser.parse_args()
+
+    arguments = {}
+    for item in args.param:
+        key, _, value = item.partition("=")
+        try:
+            arguments[key] = json.loads(value)
+        except ValueError:
+            arguments[key] = value
+    with LocalPipelineRunner(root=args.root, workers=args.workers, mode=args.mode).run(arguments) as run:
+        print(run.format_timeline())
+        if args.serve:
+            print(f"Serving at {run.endpoints[0]} (Ctrl-C to stop)")
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                pass
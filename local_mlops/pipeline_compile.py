@@ -0,0 +1,56 @@
+# pipeline_compile.py
+import hashlib
+import importlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from importlib import metadata
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PIPELINE_MODULE = "5_training_pipeline"
+CACHE_DIR = os.getenv("PIPELINE_CACHE_DIR", os.path.expanduser("~/.cache/iris_mlops/pipelines"))
+
+
+def pipeline_cache_key(params: dict = None, module: str = PIPELINE_MODULE) -> str:
+    """Hash of the pipeline source, the kfp version and the parameters, computed without importing kfp"""
+    digest = hashlib.sha256()
+    with open(os.path.join(ROOT, f"{module}.py"), "rb") as f:
+        digest.update(f.read())
+    try:
+        digest.update(metadata.version("kfp").encode())
+    except metadata.PackageNotFoundError:
+        pass
+    digest.update(json.dumps(params or {}, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def compile_pipeline(package_path: str = "iris_pipeline.json", params: dict = None,
+                     module: str = PIPELINE_MODULE, cache_dir: str = CACHE_DIR) -> dict:
+    """Compile iris_training_pipeline, reusing the cached spec when the key matches
+
+    `params` become pipeline parameter defaults in the compiled spec.
+    """
+    key = pipeline_cache_key(params, module)
+    cached = os.path.join(cache_dir, f"{key}.json")
+    if os.path.exists(cached):
+        shutil.copyfile(cached, package_path)
+        return {"cache_key": key, "cache_hit": True, "package_path": package_path}
+
+    from kfp import compiler
+
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    pipeline = importlib.import_module(module)
+    compiler.Compiler().compile(
+        pipeline_func=pipeline.iris_training_pipeline,
+        package_path=package_path,
+        pipeline_parameters=params or None
+    )
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=cache_dir)
+    os.close(fd)
+    shutil.copyfile(package_path, tmp)
+    os.replace(tmp, cached)
+    return {"cache_key": key, "cache_hit": False, "package_path": package_path}
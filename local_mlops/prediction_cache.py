@@ -0,0 +1,207 @@
+# prediction_cache.py
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+# Live caches by model id in this process, invalidated when a new version is promoted.
+# Caches in other processes follow the registry through `version_fn` instead.
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+
+class PredictionCache:
+    """Memoizes per-row predictions keyed on the quantized feature vector and model version
+
+    Iris measurements are recorded to 0.1 cm, so rows are rounded to `decimals` places
+    before hashing. Entries are evicted LRU beyond `max_entries` and expire after `ttl_s`.
+    A batch is split into hits and misses and only the misses reach `predict_fn`, which
+    takes a (rows, features) array and returns one prediction per row.
+
+    With `version_fn` (e.g. registry_version_fn) the served version is re-read at most
+    every `version_check_s` seconds; when it changes the cache is cleared and switches to
+    it, so a promotion made by another process is picked up without waiting for the TTL.
+    """
+
+    def __init__(self, predict_fn, model_version: str, max_entries: int = 100_000,
+                 ttl_s: float = 3600.0, decimals: int = 1, model_id: str = None,
+                 version_fn=None, version_check_s: float = 1.0):
+        self.predict_fn = predict_fn
+        self.model_version = model_version
+        self.model_id = model_id
+        self.version_fn = version_fn
+        self.version_check_s = version_check_s
+        self._version_checked = time.monotonic()
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.scale = 10 ** decimals
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.calls = 0
+        self.total_latency_s = 0.0
+        self.model_calls = 0
+        if model_id is not None:
+            register_cache(model_id, self)
+
+    def _keys(self, X: np.ndarray) -> list:
+        quantized = np.rint(X * self.scale).astype(np.int32)
+        version = self.model_version
+        return [(version, row.tobytes()) for row in quantized]
+
+    def _check_version(self, now: float):
+        if now - self._version_checked < self.version_check_s:
+            return
+        self._version_checked = now
+        version = self.version_fn()
+        if version is not None and version != self.model_version:
+            self.invalidate(version)
+
+    def predict(self, instances) -> list:
+        start = time.perf_counter()
+        X = np.asarray(instances, dtype=np.float64)
+        now = time.monotonic()
+        if self.version_fn is not None:
+            self._check_version(now)
+        keys = self._keys(X)
+        results = [None] * len(keys)
+        miss_rows = []
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[1] > self.ttl_s:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    miss_rows.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    results[i] = entry[0]
+            self.hits += len(keys) - len(miss_rows)
+            self.misses += len(miss_rows)
+
+        if miss_rows:
+            # Duplicate rows within the batch are predicted once
+            unique = {}
+            for i in miss_rows:
+                unique.setdefault(keys[i], i)
+            predicted = self.predict_fn(X[list(unique.values())])
+            self.model_calls += 1
+            by_key = dict(zip(unique, predicted))
+            with self._lock:
+                for key, value in by_key.items():
+                    self._entries[key] = (value, now)
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            for i in miss_rows:
+                results[i] = by_key[keys[i]]
+
+        self.calls += 1
+        self.total_latency_s += time.perf_counter() - start
+        return results
+
+    def invalidate(self, model_version: str = None):
+        """Drop all entries, optionally switching to a new model version"""
+        with self._lock:
+            self._entries.clear()
+            if model_version is not None:
+                self.model_version = model_version
+            self.invalidations += 1
+
+    def close(self):
+        """Drop all entries and unregister from invalidate_caches"""
+        with self._lock:
+            self._entries.clear()
+        if self.model_id is not None:
+            unregister_cache(self.model_id, self)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "model_version": self.model_version,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "model_calls": self.model_calls,
+            "mean_latency_ms": self.total_latency_s * 1e3 / self.calls if self.calls else 0.0,
+        }
+
+
+def register_cache(model_id: str, cache: PredictionCache):
+    # Weak references: a cache that is dropped without close() does not stay registered
+    with _CACHES_LOCK:
+        _CACHES.setdefault(model_id, weakref.WeakSet()).add(cache)
+
+
+def unregister_cache(model_id: str, cache: PredictionCache):
+    with _CACHES_LOCK:
+        caches = _CACHES.get(model_id)
+        if caches is not None:
+            caches.discard(cache)
+            if not caches:
+                del _CACHES[model_id]
+
+
+def invalidate_caches(model_id: str, model_version: str = None) -> int:
+    """Invalidate every cache registered for `model_id` in this process; returns how many were cleared"""
+    with _CACHES_LOCK:
+        caches = list(_CACHES.get(model_id, ()))
+        if not caches:
+            _CACHES.pop(model_id, None)
+    for cache in caches:
+        cache.invalidate(model_version)
+    return len(caches)
+
+
+def registry_version_fn(registry_root: str, model_id: str, alias: str = "production"):
+    """version_fn following an alias in a local_mlops.registry_index index
+
+    Each call costs one stat() of index.json unless another process replaced it, so
+    promote_model_to_production in any process reaches every cache following the alias.
+    """
+    from local_mlops.registry_index import RegistryIndex
+
+    index = RegistryIndex(registry_root)
+
+    def version_fn():
+        index.refresh()
+        entry = index.index["models"].get(model_id, {}).get("aliases", {}).get(alias, {})
+        return entry.get("version_id")
+
+    return version_fn
+
+
+class CachedEndpoint:
+    """Puts a PredictionCache in front of anything with predict(instances=...)"""
+
+    def __init__(self, endpoint, model_id: str, model_version: str, **cache_options):
+        from local_mlops.server import Prediction
+
+        self.endpoint = endpoint
+        self._prediction_cls = Prediction
+        self.cache = PredictionCache(
+            lambda X: endpoint.predict(instances=X.tolist()).predictions,
+            model_version,
+            model_id=model_id,
+            **cache_options
+        )
+
+    def predict(self, instances: list):
+        return self._prediction_cls(self.cache.predict(instances))
+
+    def close(self):
+        self.cache.close()
@@ -0,0 +1,287 @@
+# prediction_log.py
+import math
+import os
+import random
+import threading
+import time
+
+import numpy as np
+
+LOG_SUFFIX = ".arrow"
+PARTIAL_SUFFIX = ".arrow.partial"
+
+
+class PredictionLogger:
+    """Sampled prediction logging off the request path, into rotating Arrow IPC files
+
+    log() is called by the serving thread with each predicted block. Rows are sampled,
+    either independently with probability `sample_rate`, or with `reservoir_size`, as a
+    uniform reservoir (Algorithm L) of at most that many rows per `window_s` window. The
+    sampled rows and their probabilities are copied into a preallocated ring of `capacity`
+    rows, and that copy is all a request pays for. A background thread drains the ring every
+    `flush_interval_s`, or as soon as `flush_rows` rows are waiting. It writes each drain as
+    one record batch: timestamp, the features as float32, the predicted class and its
+    probability (derived on the flusher side). When the ring is full, rows are dropped and
+    counted rather than blocking the request.
+
+    The ring is single-producer: the head is only moved by the serving thread and the tail
+    only by the flusher, so neither side takes a lock. Callers logging from several threads
+    should use one logger per thread, or call log() under a lock they already hold.
+    Files rotate after `rotate_rows` rows or `rotate_s` seconds. An open file carries the
+    ".arrow.partial" suffix and is renamed once complete, so readers only see finished files.
+    """
+
+    def __init__(self, log_dir: str, feature_names: list, classes: list, sample_rate: float = 0.1,
+                 reservoir_size: int = 0, window_s: float = 1.0, capacity: int = 65536, flush_rows: int = 4096,
+                 flush_interval_s: float = 1.0, rotate_rows: int = 1_000_000, rotate_s: float = 3600.0,
+                 seed: int = None):
+        import pyarrow as pa
+
+        self.log_dir = log_dir
+        os.makedirs(log_dir, exist_ok=True)
+        self.feature_names = list(feature_names)
+        self.classes = [str(c) for c in classes]
+        self.sample_rate = sample_rate
+        self.reservoir_size = reservoir_size
+        self.window_s = window_s
+        self.capacity = capacity
+        self.flush_rows = flush_rows
+        self.flush_interval_s = flush_interval_s
+        self.rotate_rows = rotate_rows
+        self.rotate_s = rotate_s
+        self.schema = pa.schema(
+            [pa.field("timestamp", pa.timestamp("us", tz="UTC"))]
+            + [pa.field(name, pa.float32()) for name in self.feature_names]
+            + [pa.field("prediction", pa.dictionary(pa.int16(), pa.string())),
+               pa.field("confidence", pa.float32())]
+        )
+        self._class_array = pa.array(self.classes, pa.string())
+
+        width = len(self.feature_names)
+        self._X = np.zeros((capacity, width), dtype=np.float32)
+        self._proba = np.zeros((capacity, len(self.classes)), dtype=np.float32)
+        self._ts = np.zeros(capacity, dtype=np.float64)
+        # Monotonic row counters; the ring slot of row i is i % capacity
+        self._head = 0
+        self._tail = 0
+
+        self._random = random.Random(seed).random
+        self._rng = np.random.default_rng(seed)
+        if reservoir_size:
+            self._rX = np.zeros((reservoir_size, width), dtype=np.float32)
+            self._rproba = np.zeros((reservoir_size, len(self.classes)), dtype=np.float32)
+            self._rts = np.zeros(reservoir_size, dtype=np.float64)
+            self._start_window(time.time())
+
+        self.seen = 0
+        self.dropped = 0
+        self.written = 0
+        self.files = 0
+        self.flush_errors = 0
+        self._writer = None
+        self._sink = None
+        self._file_rows = 0
+        self._file_opened = 0.0
+        self._path = None
+
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # Request path
+
+    def log(self, X, proba):
+        """Offer a predicted (rows, features) block and its (rows, classes) probabilities"""
+        n = len(X)
+        self.seen += n
+        if self.reservoir_size:
+            self._offer(X, proba)
+            return
+        if n == 1:
+            if self._random() >= self.sample_rate:
+                return
+        else:
+            keep = self._rng.random(n) < self.sample_rate
+            if not keep.any():
+                return
+            X, proba = X[keep], proba[keep]
+        self._push(X, proba, time.time())
+
+    def _push(self, X, proba, ts) -> bool:
+        n = len(X)
+        head = self._head
+        if head + n - self._tail > self.capacity:
+            self.dropped += n
+            return False
+        start = head % self.capacity
+        end = start + n
+        if end <= self.capacity:
+            self._X[start:end] = X
+            self._proba[start:end] = proba
+            self._ts[start:end] = ts
+        else:
+            slots = np.arange(head, head + n) % self.capacity
+            self._X[slots] = X
+            self._proba[slots] = proba
+            self._ts[slots] = ts
+        # Publish only after the rows are in place
+        self._head = head + n
+        if self._head - self._tail >= self.flush_rows and not self._wake.is_set():
+            self._wake.set()
+        return True
+
+    def _start_window(self, now: float):
+        self._window_end = (math.floor(now / self.window_s) + 1) * self.window_s
+        self._window_seen = 0
+        self._w = math.exp(math.log(1.0 - self._random()) / self.reservoir_size)
+        self._next_accept = self.reservoir_size - 1 + self._skip() + 1
+
+    def _skip(self) -> int:
+        return int(math.log(1.0 - self._random()) / math.log(1.0 - self._w)) if self._w < 1.0 else 0
+
+    def _offer(self, X, proba):
+        now = time.time()
+        if now >= self._window_end:
+            self._publish_reservoir(now)
+        k = self.reservoir_size
+        n = len(X)
+        if self._window_seen >= k and self._window_seen + n <= self._next_accept:
+            # Common case once the reservoir is full: no row of this block is selected
+            self._window_seen += n
+            return
+        for row in range(n):
+            i = self._window_seen
+            self._window_seen += 1
+            if i < k:
+                slot = i
+            elif i == self._next_accept:
+                slot = int(self._random() * k)
+                self._w *= math.exp(math.log(1.0 - self._random()) / k)
+                self._next_accept += self._skip() + 1
+            else:
+                continue
+            self._rX[slot] = X[row]
+            self._rproba[slot] = proba[row]
+            self._rts[slot] = now
+
+    def _publish_reservoir(self, now: float):
+        """Move the closing window's sample into the ring and start a new window"""
+        m = min(self._window_seen, self.reservoir_size)
+        if m:
+            order = np.argsort(self._rts[:m], kind="stable")
+            self._push(self._rX[order], self._rproba[order], self._rts[order])
+        self._start_window(now)
+
+    # Flusher
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval_s)
+            self._wake.clear()
+            stopping = self._stopping.is_set()
+            try:
+                self._drain()
+            except Exception:
+                self.flush_errors += 1
+            if stopping:
+                break
+
+    def _drain(self):
+        head, tail = self._head, self._tail
+        if self._writer is not None and (
+            self._file_rows >= self.rotate_rows or time.time() - self._file_opened >= self.rotate_s
+        ):
+            self._rotate()
+        if head == tail:
+            return
+        start, end = tail % self.capacity, head % self.capacity
+        if start < end:
+            X, proba, ts = self._X[start:end].copy(), self._proba[start:end].copy(), self._ts[start:end].copy()
+        else:
+            X, proba, ts = (np.concatenate([a[start:], a[:end]]) for a in (self._X, self._proba, self._ts))
+        # Copied out, so the producer may reuse the slots
+        self._tail = head
+        self._write(X, proba, ts)
+
+    def _write(self, X, proba, ts):
+        import pyarrow as pa
+
+        if self._writer is None:
+            self._path = os.path.join(self.log_dir, f"predictions-{time.time_ns()}")
+            self._sink = pa.OSFile(self._path + PARTIAL_SUFFIX, "wb")
+            self._writer = pa.ipc.new_file(self._sink, self.schema)
+            self._file_rows = 0
+            self._file_opened = time.time()
+        pred = proba.argmax(axis=1)
+        arrays = (
+            [pa.array((ts * 1e6).astype(np.int64), pa.timestamp("us", tz="UTC"))]
+            + [pa.array(X[:, j]) for j in range(X.shape[1])]
+            + [pa.DictionaryArray.from_arrays(pa.array(pred, pa.int16()), self._class_array),
+               pa.array(proba[np.arange(len(pred)), pred])]
+        )
+        self._writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self._file_rows += len(X)
+        self.written += len(X)
+
+    def _rotate(self):
+        self._writer.close()
+        self._sink.close()
+        os.replace(self._path + PARTIAL_SUFFIX, self._path + LOG_SUFFIX)
+        self._writer = None
+        self.files += 1
+
+    def stats(self) -> dict:
+        return {
+            "seen": self.seen,
+            "written": self.written,
+            "pending": self._head - self._tail,
+            "dropped": self.dropped,
+            "files": self.files,
+            "flush_errors": self.flush_errors,
+        }
+
+    def close(self):
+        """Flush everything logged so far and finish the open file (call from the logging thread)"""
+        if self.reservoir_size:
+            self._publish_reservoir(time.time())
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join()
+        if self._writer is not None:
+            self._rotate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def logged_files(log_dir: str) -> list:
+    """Completed log files, oldest first"""
+    return sorted(
+        os.path.join(log_dir, name) for name in os.listdir(log_dir) if name.endswith(LOG_SUFFIX)
+    )
+
+
+def iter_logged_features(log_dir: str, feature_names: list, chunk_rows: int = 65536):
+    """Stream the logged feature columns as float64 (rows, features) blocks, e.g. for DriftEngine"""
+    import pyarrow as pa
+
+    buffer, buffered = [], 0
+    for path in logged_files(log_dir):
+        with pa.memory_map(path, "r") as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                block = np.empty((batch.num_rows, len(feature_names)), dtype=np.float64)
+                for j, name in enumerate(feature_names):
+                    block[:, j] = batch.column(name).to_numpy()
+                buffer.append(block)
+                buffered += len(block)
+                if buffered >= chunk_rows:
+                    yield np.concatenate(buffer)
+                    buffer, buffered = [], 0
+    if buffer:
+        yield np.concatenate(buffer)
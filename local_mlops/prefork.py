@@ -0,0 +1,455 @@
+# prefork.py
+import asyncio
+import json
+import os
+import signal
+import socket
+import tempfile
+import time
+
+import numpy as np
+
+from local_mlops.server import MicroBatcher, PredictionServer, make_predict_fn
+
+
+def load_shared_model(path: str, mmap: bool = True):
+    """predict(X) -> (labels, probabilities) for a kernel (.npz) or a train_model joblib artifact
+
+    With mmap=True the weights are read from a memory mapping of the file, so every
+    process serving the same file shares one copy in the page cache: kernels through
+    local_mlops.kernel.map_kernel, joblib artifacts through joblib's mmap_mode (NumPy
+    attributes such as coef_ are mapped; estimators that copy arrays into their own
+    structures when unpickled, e.g. sklearn trees, still hold a private copy).
+    """
+    with open(path, "rb") as f:
+        is_kernel = f.read(4) == b"PK\x03\x04"
+    if not is_kernel:
+        import joblib
+
+        return make_predict_fn(joblib.load(path, mmap_mode="r" if mmap else None))
+
+    from local_mlops.kernel import NumpyPredictor
+
+    predictor = NumpyPredictor(path, mmap=mmap)
+    # Touch every weight page now rather than on the first request
+    predictor.predict_proba(np.zeros((1, predictor.coef_t.shape[0]), dtype=np.float32))
+
+    def predict(X):
+        # Own output buffer: results outlive this call while the batch's requests are answered
+        proba = predictor.predict_proba(X, out=np.empty((len(X), len(predictor.classes)), dtype=np.float32))
+        return predictor.classes[proba.argmax(axis=1)], proba
+
+    predict.n_features = predictor.coef_t.shape[0]
+    return predict
+
+
+def process_memory(pid: int) -> dict:
+    """RSS, PSS (shared pages divided among the processes mapping them), shared and private bytes"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if value.strip().endswith("kB"):
+                fields[name] = int(value.split()[0]) * 1024
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def _write_json(path: str, data: dict):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _read_json(path: str):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+class MultiModelServer(PredictionServer):
+    """PredictionServer for several named models, accepting on a listening socket shared by the workers
+
+    Routes: POST /models/<name>/predict (or /models/<name>:predict), POST /predict for the
+    first model, GET /models for the name -> version table, GET /health. Each model has its
+    own MicroBatcher; swapping a model replaces the batcher's predict function between two
+    batches, so a request is answered entirely by the old or entirely by the new version.
+    """
+
+    def __init__(self, sock: socket.socket, max_batch_size: int = 64, max_wait_us: int = 500):
+        self.sock = sock
+        self.host, self.port = sock.getsockname()[:2]
+        self.max_batch_size = max_batch_size
+        self.max_wait_us = max_wait_us
+        self.batchers = {}
+        self.versions = {}
+        self.requests = 0
+        self.in_flight = 0
+        self._server = None
+
+    def set_model(self, name: str, predict_fn, version: str):
+        batcher = self.batchers.get(name)
+        if batcher is None:
+            batcher = self.batchers[name] = MicroBatcher(predict_fn, self.max_batch_size, self.max_wait_us)
+            if self._server is not None:
+                batcher.start()
+        batcher.predict_fn = predict_fn
+        self.versions[name] = version
+
+    def remove_model(self, name: str):
+        self.versions.pop(name)
+        asyncio.get_running_loop().create_task(self._retire(self.batchers.pop(name)))
+
+    async def _retire(self, batcher: MicroBatcher):
+        # Requests already queued are still answered before the batcher stops
+        while not batcher._queue.empty():
+            await asyncio.sleep(batcher.max_wait)
+        await asyncio.sleep(batcher.max_wait * 2)
+        await batcher.stop()
+
+    async def start(self):
+        for batcher in self.batchers.values():
+            batcher.start()
+        self._server = await asyncio.start_server(self._handle, sock=self.sock)
+
+    async def stop(self, drain_s: float = 10.0):
+        """Stop accepting, then wait (up to drain_s) for requests in flight"""
+        self._server.close()
+        deadline = time.monotonic() + drain_s
+        while self.in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(0.005)
+        for batcher in self.batchers.values():
+            await batcher.stop()
+
+    async def predict_model(self, name: str, payload: dict) -> dict:
+        batcher, version = self.batchers[name], self.versions[name]
+        labels, proba = await batcher.submit(payload["instances"])
+        return {"predictions": labels.tolist(), "probabilities": proba.tolist(), "model": name,
+                "version": version}
+
+    async def _route(self, method: str, path: str, body: bytes) -> tuple:
+        if method == "GET" and path == "/health":
+            return "200 OK", {"status": "ok", "pid": os.getpid()}
+        if method == "GET" and path == "/models":
+            return "200 OK", {"models": self.versions, "pid": os.getpid()}
+        if method != "POST":
+            return "404 Not Found", {"error": f"No route for {method} {path}"}
+        if path == "/predict":
+            name = next(iter(self.versions), None)
+        elif path.startswith("/models/") and path.endswith(("/predict", ":predict")):
+            name = path[len("/models/"):-len("/predict")]
+        else:
+            return "404 Not Found", {"error": f"No route for {method} {path}"}
+        if name not in self.batchers:
+            return "404 Not Found", {"error": f"No model named {name!r}"}
+        self.requests += 1
+        self.in_flight += 1
+        try:
+            return "200 OK", await self.predict_model(name, json.loads(body))
+        except (KeyError, ValueError, TypeError) as e:
+            return "400 Bad Request", {"error": str(e)}
+        except Exception as e:
+            # A bug in the model or transform must not drop the connection without an answer
+            return "500 Internal Server Error", {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            self.in_flight -= 1
+
+
+class _Worker:
+    """One pre-forked serving process; follows the routes file through prepare (SIGHUP) and commit (SIGUSR1)"""
+
+    def __init__(self, index: int, sock: socket.socket, state_dir: str, mmap: bool, max_batch_size: int,
+                 max_wait_us: int):
+        self.index = index
+        self.state_dir = state_dir
+        self.mmap = mmap
+        self.server = MultiModelServer(sock, max_batch_size, max_wait_us)
+        self.paths = {}
+        self.generation = -1
+        self.prepared = None
+        self.swaps = []
+        self._stall = None
+
+    def _write_state(self, **fields):
+        state = {"index": self.index, "pid": os.getpid(), "generation": self.generation,
+                 "models": self.server.versions, "swaps": self.swaps[-20:]}
+        state.update(fields)
+        _write_json(os.path.join(self.state_dir, f"worker-{self.index}.json"), state)
+
+    async def _watch_stalls(self, interval_s: float = 0.001):
+        """Longest event-loop stall while a swap is in progress (the pause a request could see)"""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval_s)
+            self._stall = max(self._stall or 0.0, loop.time() - start - interval_s)
+
+    async def prepare(self):
+        """Load every model whose path changed in the routes file, off the event loop"""
+        routes = _read_json(os.path.join(self.state_dir, "routes.json"))
+        if routes["generation"] <= self.generation:
+            return
+        loop = asyncio.get_running_loop()
+        self._stall = 0.0
+        watcher = loop.create_task(self._watch_stalls())
+        start = time.perf_counter()
+        loaded = {}
+        for name, path in routes["models"].items():
+            if self.paths.get(name) != path:
+                loaded[name] = await loop.run_in_executor(None, load_shared_model, path, self.mmap)
+        self.prepared = (routes, loaded, time.perf_counter() - start, watcher)
+        self._write_state(prepared=routes["generation"])
+
+    def commit(self):
+        """Switch to the prepared models in one step on the event loop"""
+        if self.prepared is None:
+            return
+        routes, loaded, load_s, watcher = self.prepared
+        start = time.perf_counter()
+        for name, predict_fn in loaded.items():
+            self.server.set_model(name, predict_fn, os.path.basename(routes["models"][name]))
+        for name in set(self.server.versions) - set(routes["models"]):
+            self.server.remove_model(name)
+        pause_s = time.perf_counter() - start
+        watcher.cancel()
+        self.paths = dict(routes["models"])
+        self.generation = routes["generation"]
+        self.prepared = None
+        self.swaps.append({"generation": self.generation, "models": sorted(loaded), "load_s": load_s,
+                           "commit_pause_s": pause_s, "max_loop_stall_s": self._stall,
+                           "committed_at": time.time()})
+        self._write_state(prepared=self.generation)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        stopping = asyncio.Event()
+        loop.add_signal_handler(signal.SIGTERM, stopping.set)
+        loop.add_signal_handler(signal.SIGHUP, lambda: loop.create_task(self.prepare()))
+        loop.add_signal_handler(signal.SIGUSR1, self.commit)
+
+        await self.prepare()
+        self.commit()
+        self.swaps.clear()
+        await self.server.start()
+        self._write_state(prepared=self.generation, serving=True)
+        await stopping.wait()
+        await self.server.stop()
+        self._write_state(prepared=self.generation, serving=False)
+
+
+class PreforkModelServer:
+    """Pre-forked workers serving several model versions side by side, with atomic hot swap
+
+    The parent binds one listening socket and forks `workers` processes that accept on
+    it. `models` maps a name (e.g. a registry alias) to a kernel or joblib file; workers
+    load it with load_shared_model, so with mmap=True they share a single copy of the
+    weights instead of each unpickling its own.
+
+    swap() writes a new generation of the routes file (name -> path) and switches the
+    workers over in two phases: on SIGHUP each loads the changed models off its event
+    loop while serving the old ones, and once all of them are ready, SIGUSR1 makes each
+    swap the predict functions between two batches. In-flight requests finish on the
+    version they started with and nothing is dropped; the old mapping is released when
+    its last batch is done, so memory never holds more than the two versions' files.
+
+    Create and start() this before the process starts any threads (fork safety).
+    """
+
+    def __init__(self, models: dict, workers: int = 2, host: str = "127.0.0.1", port: int = 0,
+                 state_dir: str = None, mmap: bool = True, max_batch_size: int = 64, max_wait_us: int = 500):
+        self.models = {name: os.path.abspath(path) for name, path in models.items()}
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.state_dir = state_dir or tempfile.mkdtemp(prefix="prefork-")
+        self.mmap = mmap
+        self.max_batch_size = max_batch_size
+        self.max_wait_us = max_wait_us
+        self.generation = 0
+        self.pids = []
+        self._sock = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def model_url(self, name: str) -> str:
+        """Base URL for a LocalEndpoint (or loadgen HttpTarget) serving one named model"""
+        return f"{self.url}/models/{name}"
+
+    def start(self, timeout_s: float = 60.0) -> "PreforkModelServer":
+        os.makedirs(self.state_dir, exist_ok=True)
+        _write_json(os.path.join(self.state_dir, "routes.json"), {"generation": self.generation, "models": self.models})
+        self._sock = socket.create_server((self.host, self.port), backlog=1024)
+        self._sock.setblocking(False)
+        self.port = self._sock.getsockname()[1]
+        # Pay for imports once in the parent; forked workers share those pages
+        import joblib  # noqa: F401
+        import local_mlops.kernel  # noqa: F401
+
+        for index in range(self.workers):
+            pid = os.fork()
+            if pid == 0:
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
+                status = 0
+                try:
+                    asyncio.run(_Worker(index, self._sock, self.state_dir, self.mmap, self.max_batch_size,
+                                        self.max_wait_us).run())
+                except BaseException:
+                    import traceback
+
+                    traceback.print_exc()
+                    status = 1
+                finally:
+                    os._exit(status)
+            self.pids.append(pid)
+        self._wait_for(lambda state: state.get("serving") and state["generation"] == self.generation, timeout_s)
+        return self
+
+    def _worker_states(self) -> list:
+        return [_read_json(os.path.join(self.state_dir, f"worker-{i}.json")) for i in range(self.workers)]
+
+    def _wait_for(self, condition, timeout_s: float) -> list:
+        deadline = time.monotonic() + timeout_s
+        while True:
+            states = self._worker_states()
+            if all(state is not None and condition(state) for state in states):
+                return states
+            for pid in self.pids:
+                if os.waitpid(pid, os.WNOHANG)[0]:
+                    raise RuntimeError(f"Worker {pid} exited (see its stderr)")
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Workers not ready after {timeout_s} s: {states}")
+            time.sleep(0.005)
+
+    def _signal(self, signum):
+        for pid in self.pids:
+            os.kill(pid, signum)
+
+    def swap(self, models: dict, timeout_s: float = 60.0) -> dict:
+        """Point names at new files (adding names is allowed) on every worker; returns swap timings"""
+        routes = dict(self.models, **{name: os.path.abspath(path) for name, path in models.items()})
+        self.generation += 1
+        _write_json(os.path.join(self.state_dir, "routes.json"), {"generation": self.generation, "models": routes})
+        start = time.perf_counter()
+        self._signal(signal.SIGHUP)
+        self._wait_for(lambda state: state.get("prepared", -1) >= self.generation, timeout_s)
+        prepared_s = time.perf_counter() - start
+        self._signal(signal.SIGUSR1)
+        states = self._wait_for(lambda state: state["generation"] >= self.generation, timeout_s)
+        self.models = routes
+        swaps = [next(s for s in state["swaps"] if s["generation"] == self.generation) for state in states]
+        committed = [s["committed_at"] for s in swaps]
+        return {
+            "generation": self.generation,
+            "prepare_s": prepared_s,
+            "total_s": time.perf_counter() - start,
+            # Spread between the first and last worker serving the new version
+            "commit_skew_s": max(committed) - min(committed),
+            "max_commit_pause_s": max(s["commit_pause_s"] for s in swaps),
+            "max_loop_stall_s": max(s["max_loop_stall_s"] for s in swaps),
+            "workers": swaps,
+        }
+
+    def follow_registry(self, index, model_id: str, aliases: list) -> dict:
+        """Swap in whatever `aliases` of `model_id` resolve to now; returns swap() timings or None"""
+        index.refresh()
+        current = {alias: index.artifact_path(model_id, alias) for alias in aliases}
+        changed = {alias: path for alias, path in current.items() if self.models.get(alias) != path}
+        return self.swap(changed) if changed else None
+
+    def stats(self) -> dict:
+        workers = []
+        for pid, state in zip(self.pids, self._worker_states()):
+            try:
+                memory = process_memory(pid)
+            except FileNotFoundError:
+                memory = {}
+            workers.append(dict(memory, pid=pid, generation=state and state["generation"],
+                                models=state and state["models"]))
+        return {"generation": self.generation, "models": self.models, "workers": workers,
+                "parent": process_memory(os.getpid())}
+
+    def stop(self, timeout_s: float = 30.0):
+        self._signal(signal.SIGTERM)
+        deadline = time.monotonic() + timeout_s
+        for pid in self.pids:
+            while not os.waitpid(pid, os.WNOHANG)[0]:
+                if time.monotonic() > deadline:
+                    os.kill(pid, signal.SIGKILL)
+                    os.waitpid(pid, 0)
+                    break
+                time.sleep(0.01)
+        self.pids = []
+        self._sock.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def format_memory(stats: dict) -> str:
+    mb = 1 << 20
+    lines = [f"  {'pid':>7} {'gen':>4} {'RSS MB':>8} {'PSS MB':>8} {'shared MB':>10} {'private MB':>11}"]
+    for w in stats["workers"]:
+        lines.append(f"  {w['pid']:>7} {w['generation']:>4} {w.get('rss', 0) / mb:8.1f} {w.get('pss', 0) / mb:8.1f} "
+                     f"{w.get('shared', 0) / mb:10.1f} {w.get('private', 0) / mb:11.1f}")
+    total = sum(w.get("pss", 0) for w in stats["workers"])
+    lines.append(f"  workers' PSS total {total / mb:.1f} MB (parent {stats['parent']['pss'] / mb:.1f} MB)")
+    return "\n".join(lines)
+
+
+def serve(models: dict = None, registry_model: str = None, aliases: list = ("production",),
+          registry_root: str = None, workers: int = 2, host: str = "127.0.0.1", port: int = 8080,
+          poll_interval_s: float = 2.0, mmap: bool = True):
+    """Serve named models until interrupted; registry aliases are hot-swapped when they move"""
+    models = dict(models or {})
+    index = None
+    if registry_model:
+        from local_mlops.registry_index import RegistryIndex
+
+        index = RegistryIndex(registry_root or os.getenv("REGISTRY_INDEX_ROOT", os.path.expanduser("~/.iris_registry")))
+        models.update({alias: index.artifact_path(registry_model, alias) for alias in aliases})
+    server = PreforkModelServer(models, workers, host, port, mmap=mmap).start()
+    print(f"Serving {sorted(models)} on {server.url} with {workers} workers")
+    print(format_memory(server.stats()))
+    try:
+        while True:
+            time.sleep(poll_interval_s)
+            if index is not None:
+                result = server.follow_registry(index, registry_model, aliases)
+                if result is not None:
+                    print(f"Swapped to generation {result['generation']} in {result['total_s'] * 1e3:.0f} ms "
+                          f"(longest pause {result['max_loop_stall_s'] * 1e3:.2f} ms)")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pre-forked multi-model server with shared weights and hot swap")
+    parser.add_argument("--model", action="append", default=[], metavar="NAME=PATH",
+                        help="Model to host (repeatable): kernel .npz or train_model joblib artifact")
+    parser.add_argument("--registry-model", help="Host aliases of this model from the local registry index")
+    parser.add_argument("--alias", action="append", default=[], help="Registry alias to host (repeatable)")
+    parser.add_argument("--poll-interval-s", type=float, default=2.0, help="How often to check the aliases")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--no-mmap", action="store_true", help="Give each worker a private copy (for comparison)")
+    args = parser.parse_args()
+    serve(dict(item.split("=", 1) for item in args.model), args.registry_model, args.alias or ["production"],
+          workers=args.workers, host=args.host, port=args.port, poll_interval_s=args.poll_interval_s,
+          mmap=not args.no_mmap)
@@ -0,0 +1,195 @@
+# preprocessing.py
+import json
+import os
+
+import numpy as np
+
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schemas")
+FEATURE_DTYPES = ("float32", "category")
+
+
+def load_schema(schema: str) -> dict:
+    """Load a schema from a JSON path, or by name from local_mlops/schemas (e.g. "iris")
+
+    A schema lists the source table, the features with their dtype (float32 or category,
+    optionally with fixed "categories") and the target column.
+    """
+    path = schema if os.path.exists(schema) else os.path.join(SCHEMA_DIR, f"{schema}.json")
+    with open(path) as f:
+        config = json.load(f)
+    for feature in config["features"]:
+        if feature["dtype"] not in FEATURE_DTYPES:
+            raise ValueError(f"Unsupported dtype {feature['dtype']!r} for feature {feature['name']!r}")
+    return config
+
+
+def arrow_schema(schema: dict):
+    """Arrow schema load_data writes for this config: float32 features, string category/target columns"""
+    import pyarrow as pa
+
+    fields = [
+        pa.field(f["name"], pa.float32() if f["dtype"] == "float32" else pa.string())
+        for f in schema["features"]
+    ]
+    return pa.schema(fields + [pa.field(schema["target"]["name"], pa.string())])
+
+
+def _open_table(source):
+    """An Arrow table as-is, or an IPC file memory-mapped (columns are only paged in when read)"""
+    if not isinstance(source, str):
+        return source
+    import pyarrow as pa
+
+    return pa.ipc.open_file(pa.memory_map(source, "r")).read_all()
+
+
+def _num_rows(source) -> int:
+    # Memory-mapped, so only the file's metadata is read
+    return _open_table(source).num_rows
+
+
+def _iter_batches(source, columns: list = None):
+    """Record batches of a table, or read one at a time (not memory-mapped) from an IPC file"""
+    if not isinstance(source, str):
+        yield from (source.select(columns) if columns else source).to_batches()
+        return
+    import pyarrow as pa
+
+    if columns:
+        yield from _open_table(source).select(columns).to_batches()
+        return
+    with pa.OSFile(source, "rb") as f:
+        reader = pa.ipc.open_file(f)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+
+def _category_codes(table, name: str, categories: list) -> np.ndarray:
+    """int32 codes into `categories`, -1 for values outside them (and nulls)"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    codes = pc.index_in(table.column(name).cast(pa.string()), value_set=pa.array(categories, pa.string()))
+    return codes.fill_null(-1).to_numpy().astype(np.int32, copy=False)
+
+
+def _distinct(table, name: str) -> list:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    values = pc.unique(table.column(name).cast(pa.string())).drop_null()
+    return sorted(values.to_pylist())
+
+
+class TabularTransform:
+    """Schema-driven features -> one contiguous float32 matrix, fitted once and reused at serving
+
+    fit() learns category vocabularies (unless the schema fixes them) and the target classes.
+    transform() converts one record batch at a time into a float32 block and copies it into
+    a single preallocated C-ordered matrix, so no float64 or DataFrame copy of the whole
+    table exists. With split(), blocks are scattered to shuffled row positions so the train
+    and test sets are slices (views) of that one matrix. The fitted object is pickled into
+    the model artifact and transform_instances() prepares request rows the same way.
+    """
+
+    def __init__(self, schema: dict):
+        self.schema = schema
+        self.feature_names = [f["name"] for f in schema["features"]]
+        self.target_name = schema["target"]["name"]
+        self.categories = {
+            f["name"]: list(f["categories"]) for f in schema["features"]
+            if f["dtype"] == "category" and "categories" in f
+        }
+        self.classes = list(schema["target"].get("categories", [])) or None
+
+    def _is_category(self, index: int) -> bool:
+        return self.schema["features"][index]["dtype"] == "category"
+
+    def fit(self, source) -> "TabularTransform":
+        """Learn vocabularies from an Arrow table or IPC file path (reading only those columns)"""
+        table = _open_table(source)
+        for i, name in enumerate(self.feature_names):
+            if self._is_category(i) and name not in self.categories:
+                self.categories[name] = _distinct(table, name)
+        if self.classes is None:
+            self.classes = _distinct(table, self.target_name)
+        return self
+
+    def _block(self, batch) -> np.ndarray:
+        """One record batch as a C-ordered float32 (rows, features) block"""
+        # Columns are written contiguously into a (features, rows) buffer, then transposed
+        # once; writing columns straight into row-major memory is strided and ~2x slower
+        columns = np.empty((len(self.feature_names), batch.num_rows), dtype=np.float32)
+        for j, name in enumerate(self.feature_names):
+            if self._is_category(j):
+                columns[j] = _category_codes(batch, name, self.categories[name])
+            else:
+                columns[j] = batch.column(name).to_numpy(zero_copy_only=False)
+        return np.ascontiguousarray(columns.T)
+
+    def transform(self, source, order: np.ndarray = None) -> np.ndarray:
+        """(rows, features) float32 matrix; with `order`, output row i is input row order[i]
+
+        `source` is an Arrow table or the path of an Arrow IPC file. Rows are converted one
+        record batch at a time and copied into the preallocated matrix, so only one batch
+        of source data is resident at once when reading from a path.
+        """
+        num_rows = _num_rows(source)
+        X = np.empty((num_rows, len(self.feature_names)), dtype=np.float32)
+        if order is not None:
+            # Input row r lands at position[r]
+            position = np.empty(num_rows, dtype=np.int64)
+            position[order] = np.arange(num_rows)
+        start = 0
+        for batch in _iter_batches(source):
+            block = self._block(batch)
+            end = start + len(block)
+            if order is None:
+                X[start:end] = block
+            else:
+                X[position[start:end]] = block
+            start = end
+        return X
+
+    def encode_target(self, source, order: np.ndarray = None) -> np.ndarray:
+        codes = np.concatenate([
+            _category_codes(batch, self.target_name, self.classes) for batch in _iter_batches(source, [self.target_name])
+        ])
+        if (codes < 0).any():
+            raise ValueError(f"Target column {self.target_name!r} has values outside the fitted classes")
+        return codes if order is None else codes[order]
+
+    def split(self, source, test_size: float = 0.2, seed: int = 42) -> tuple:
+        """(X_train, X_test, y_train, y_test) as views of one shuffled matrix"""
+        num_rows = _num_rows(source)
+        order = np.random.default_rng(seed).permutation(num_rows)
+        X = self.transform(source, order)
+        y = self.encode_target(source, order)
+        n_test = int(np.ceil(num_rows * test_size))
+        return X[n_test:], X[:n_test], y[n_test:], y[:n_test]
+
+    def transform_instances(self, instances) -> np.ndarray:
+        """Request rows (lists in feature order, category values as strings) -> float32 matrix"""
+        if not self.categories:
+            return np.asarray(instances, dtype=np.float32)
+        rows = np.asarray(instances, dtype=object)
+        if rows.ndim != 2 or rows.shape[1] != len(self.feature_names):
+            raise ValueError(
+                f"instances must be rows of {len(self.feature_names)} features, got shape {rows.shape}"
+            )
+        X = np.empty(rows.shape, dtype=np.float32)
+        for j, name in enumerate(self.feature_names):
+            if self._is_category(j):
+                index = {c: i for i, c in enumerate(self.categories[name])}
+                X[:, j] = [index.get(str(v), -1) for v in rows[:, j]]
+            else:
+                X[:, j] = rows[:, j].astype(np.float32)
+        return X
+
+    def label_encoder(self):
+        """A fitted sklearn LabelEncoder over the target classes, for the existing artifact layout"""
+        from sklearn.preprocessing import LabelEncoder
+
+        le = LabelEncoder()
+        le.classes_ = np.asarray(self.classes)
+        return le
@@ -0,0 +1,295 @@
+# profiling.py
+import cProfile
+import fcntl
+import io
+import json
+import os
+import pstats
+import random
+import resource
+import threading
+import time
+import tracemalloc
+
+PROFILE_VERSION = 1
+
+# StepProfilers currently inside their `with` block in this process (e.g. parallel steps
+# of the local runner); peak RSS is process-wide, so it is per step only when alone
+_ACTIVE = set()
+_ACTIVE_LOCK = threading.Lock()
+
+
+def _proc_status_bytes(field: str):
+    """A kB field of /proc/self/status (e.g. VmHWM, VmRSS) in bytes, or None off Linux"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    """Reset VmHWM to the current RSS so the next reading is this step's peak (Linux >= 4.0)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_bytes() -> int:
+    peak = _proc_status_bytes("VmHWM")
+    if peak is None:
+        # ru_maxrss is kB on Linux, bytes on macOS; this fallback only runs off Linux
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak
+
+
+def _process_cpu_seconds() -> float:
+    """CPU time of this process (all threads, including BLAS pools) plus its reaped child processes"""
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def _thread_cpu_seconds():
+    """CPU time of the calling thread, or None where RUSAGE_THREAD is unavailable"""
+    if not hasattr(resource, "RUSAGE_THREAD"):
+        return None
+    usage = resource.getrusage(resource.RUSAGE_THREAD)
+    return usage.ru_utime + usage.ru_stime
+
+
+def append_trace_event(trace_path: str, event: dict):
+    """Append one event to a Chrome trace file (JSON array format, left unterminated)
+
+    chrome://tracing and Perfetto accept an array without the closing bracket, so every
+    step (even from concurrent processes) can append under a lock without rewriting.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(trace_path)), exist_ok=True)
+    with open(trace_path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        if f.tell() == 0:
+            f.write("[\n")
+        f.write(json.dumps(event) + ",\n")
+
+
+def read_trace(trace_path: str) -> list:
+    """Events of a trace file written by append_trace_event"""
+    with open(trace_path) as f:
+        text = f.read().rstrip().rstrip(",")
+    if not text.endswith("]"):
+        text += "]"
+    return json.loads(text)
+
+
+class StepProfiler:
+    """Context manager recording wall/CPU time, peak RSS, rows/sec and bytes for one step
+
+    On exit the record is written to `metrics_artifact` (JSON at its path, numeric fields
+    through log_metric when the artifact has it) and appended to `trace_path` as a
+    Chrome trace complete event. A `sample_rate` fraction of runs also capture cProfile
+    (a .prof file next to the trace) and tracemalloc (peak traced bytes, top sites).
+    Components report what they processed with record(rows=..., bytes_read=..., ...).
+
+    cpu_s covers the whole process plus child processes it reaped (worker pools), so BLAS
+    threads and process pools count. Like peak RSS, that is only the step's own figure
+    when no other step runs concurrently in the same process. Under overlap cpu_s falls
+    back to the CPU time of the thread running the step (cpu_scope "thread" instead of
+    "step"), and the high-water mark is not reset (peak_rss_scope "process").
+    """
+
+    def __init__(self, step: str, trace_path: str = "", metrics_artifact=None, sample_rate: float = 0.0,
+                 run_id: str = None):
+        self.step = step
+        self.trace_path = trace_path
+        self.metrics_artifact = metrics_artifact
+        self.sampled = sample_rate > 0 and random.random() < sample_rate
+        self.run_id = run_id or os.getenv("PIPELINE_RUN_ID", "")
+        self.counters = {"rows": 0, "bytes_read": 0, "bytes_written": 0}
+        self.attributes = {}
+        self.result = None
+        self._profiler = None
+
+    def record(self, rows: int = 0, bytes_read: int = 0, bytes_written: int = 0, **attributes):
+        self.counters["rows"] += rows
+        self.counters["bytes_read"] += bytes_read
+        self.counters["bytes_written"] += bytes_written
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        with _ACTIVE_LOCK:
+            self._overlapped = bool(_ACTIVE)
+            for other in _ACTIVE:
+                other._overlapped = True
+            _ACTIVE.add(self)
+            # Resetting VmHWM under a concurrent step would discard that step's peak
+            self._peak_reset = not self._overlapped and _reset_peak_rss()
+        self._rss_start = _proc_status_bytes("VmRSS")
+        # tracemalloc is process-wide too; a concurrent sampled step keeps it to itself
+        self._tracemalloc = self.sampled and not tracemalloc.is_tracing()
+        if self._tracemalloc:
+            tracemalloc.start()
+        if self.sampled:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._start_epoch = time.time()
+        self._cpu_start = _process_cpu_seconds()
+        self._thread_cpu_start = _thread_cpu_seconds()
+        self._wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall_start
+        cpu = _process_cpu_seconds() - self._cpu_start
+        thread_cpu = _thread_cpu_seconds()
+        peak = _peak_rss_bytes()
+        with _ACTIVE_LOCK:
+            _ACTIVE.discard(self)
+            overlapped = self._overlapped
+            peak_scope = "step" if self._peak_reset and not overlapped else "process"
+        cpu_scope = "step"
+        if overlapped:
+            # Other steps' threads share the process clock; only this thread's time is ours
+            if thread_cpu is not None:
+                cpu, cpu_scope = thread_cpu - self._thread_cpu_start, "thread"
+            else:
+                cpu_scope = "process"
+
+        result = {
+            "profile_version": PROFILE_VERSION,
+            "step": self.step,
+            "run_id": self.run_id,
+            "status": "error" if exc_type else "ok",
+            "sampled": self.sampled,
+            "wall_s": wall,
+            "cpu_s": cpu,
+            "cpu_scope": cpu_scope,
+            "cpu_utilization": cpu / wall if wall else 0.0,
+            "peak_rss_bytes": peak,
+            "peak_rss_scope": peak_scope,
+            **self.counters,
+            "rows_per_second": self.counters["rows"] / wall if wall else 0.0,
+            **self.attributes,
+        }
+        if self._rss_start is not None:
+            result["rss_start_bytes"] = self._rss_start
+
+        trace_args = dict(result)
+        if self._tracemalloc:
+            _, traced_peak = tracemalloc.get_traced_memory()
+            top_sites = tracemalloc.take_snapshot().statistics("lineno")[:5]
+            tracemalloc.stop()
+            result["tracemalloc_peak_bytes"] = traced_peak
+            trace_args["tracemalloc_top"] = [f"{s.traceback[0]}: {s.size} B" for s in top_sites]
+        if self.sampled:
+            self._profiler.disable()
+            trace_args["cprofile_top"] = self._top_functions()
+            if self.trace_path:
+                result["cprofile_path"] = self._dump_profile()
+
+        self.result = result
+        if self.metrics_artifact is not None:
+            self._write_metrics(result)
+        if self.trace_path:
+            append_trace_event(self.trace_path, {
+                "name": self.step,
+                "cat": "pipeline",
+                "ph": "X",
+                "ts": self._start_epoch * 1e6,
+                "dur": wall * 1e6,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": trace_args,
+            })
+        return False
+
+    def _top_functions(self, limit: int = 10) -> list:
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=stream)
+        rows = sorted(stats.stats.items(), key=lambda item: -item[1][3])[:limit]
+        return [f"{func[0]}:{func[1]}({func[2]}) {timing[3] * 1e3:.1f} ms cumulative" for func, timing in rows]
+
+    def _dump_profile(self) -> str:
+        profile_dir = os.path.join(os.path.dirname(os.path.abspath(self.trace_path)), "profiles")
+        os.makedirs(profile_dir, exist_ok=True)
+        path = os.path.join(profile_dir, f"{self.step}-{int(self._start_epoch * 1e3)}-{os.getpid()}.prof")
+        self._profiler.dump_stats(path)
+        return path
+
+    def _write_metrics(self, result: dict):
+        artifact = self.metrics_artifact
+        with open(artifact.path, "w") as f:
+            json.dump(result, f)
+        if hasattr(artifact, "log_metric"):
+            for name, value in result.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    artifact.log_metric(name, value)
+
+
+def step_history(trace_path: str) -> dict:
+    """Per-step list of trace records, oldest first"""
+    history = {}
+    for event in read_trace(trace_path):
+        if event.get("ph") == "X" and event.get("cat") == "pipeline":
+            history.setdefault(event["name"], []).append(event["args"])
+    return history
+
+
+def find_regressions(trace_path: str, metrics: tuple = ("wall_s", "cpu_s", "peak_rss_bytes"),
+                     tolerance: float = 0.2, window: int = 10) -> list:
+    """(step, metric, baseline median, latest) where the latest run exceeds the median of
+    the previous `window` runs by more than `tolerance`
+
+    Sampled runs carry cProfile/tracemalloc overhead and are left out of the comparison,
+    and so is peak_rss_bytes of runs that overlapped other steps (peak_rss_scope "process").
+    cpu_s is only compared between runs measured with the same cpu_scope.
+    """
+    regressions = []
+    for step, records in step_history(trace_path).items():
+        records = [r for r in records if not r.get("sampled") and r.get("status") == "ok"]
+        if len(records) < 2:
+            continue
+        latest, previous = records[-1], records[-window - 1:-1]
+        for metric in metrics:
+            if metric == "peak_rss_bytes":
+                if latest.get("peak_rss_scope") != "step":
+                    continue
+                values = sorted(r[metric] for r in previous if r.get("peak_rss_scope") == "step")
+            elif metric == "cpu_s":
+                # Traces written before cpu_scope existed measured the step's thread
+                scope = latest.get("cpu_scope", "thread")
+                values = sorted(r[metric] for r in previous if r.get("cpu_scope", "thread") == scope)
+            else:
+                values = sorted(r[metric] for r in previous if metric in r)
+            if not values or metric not in latest:
+                continue
+            baseline = values[len(values) // 2]
+            if baseline and latest[metric] > baseline * (1 + tolerance):
+                regressions.append((step, metric, baseline, latest[metric]))
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize a pipeline trace file")
+    parser.add_argument("trace_path")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    for step, records in step_history(args.trace_path).items():
+        latest = records[-1]
+        print(f"{step:<22} runs {len(records):>4}  wall {latest['wall_s']:.3f} s  cpu {latest['cpu_s']:.3f} s  "
+              f"peak rss {latest['peak_rss_bytes'] / 2**20:.1f} MB  {latest['rows_per_second']:,.0f} rows/s")
+    regressions = find_regressions(args.trace_path, tolerance=args.tolerance)
+    for step, metric, before, after in regressions:
+        print(f"REGRESSION {step} {metric}: {before:.3f} -> {after:.3f}")
+    if regressions:
+        raise SystemExit(1)
@@ -0,0 +1,287 @@
+# registry_index.py
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+from local_mlops.step_cache import fingerprint_file
+
+INDEX_FILE = "index.json"
+
+
+def _empty_index() -> dict:
+    return {"generation": 0, "models": {}}
+
+
+def _merge_aliases(aliases: dict, incoming: dict):
+    """Last writer wins per alias; removals are tombstones (version_id None) so they win too"""
+    for alias, entry in incoming.items():
+        current = aliases.get(alias)
+        if current is None or entry["updated"] > current["updated"]:
+            aliases[alias] = entry
+
+
+class RegistryIndex:
+    """Local model registry index with content-addressed artifacts
+
+    index.json holds, per model, its versions (artifact digest, description, labels,
+    metrics) and aliases (alias -> version plus update time; a removed alias stays as a
+    tombstone with version_id None, so sync does not bring it back). It is replaced atomically
+    under a file lock, and kept in memory so resolving an alias is a dict lookup.
+    Artifacts live under blobs/<sha256>, so registering an unchanged artifact copies
+    nothing and returns the existing version.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._index_path = os.path.join(root, INDEX_FILE)
+        self._signature = None
+        self.index = _empty_index()
+        self.refresh()
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload the index if another process replaced it (or always with force); returns True when reloaded
+
+        Every replacement is a new file, so its inode changes even when two writes land
+        within the filesystem's mtime granularity.
+        """
+        try:
+            with open(self._index_path) as f:
+                stat = os.fstat(f.fileno())
+                signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+                if signature == self._signature and not force:
+                    return False
+                self.index = json.load(f)
+        except FileNotFoundError:
+            return False
+        self._signature = signature
+        return True
+
+    @contextmanager
+    def _transaction(self):
+        """Lock, reload unconditionally, let the caller mutate self.index, then atomically replace the file"""
+        with open(os.path.join(self.root, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.refresh(force=True)
+            yield self.index
+            self.index["generation"] += 1
+            fd, tmp = tempfile.mkstemp(dir=self.root)
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.index, f)
+            os.replace(tmp, self._index_path)
+            stat = os.stat(self._index_path)
+            self._signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _model(self, index: dict, model_id: str) -> dict:
+        return index["models"].setdefault(model_id, {"versions": {}, "aliases": {}, "digests": {}})
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest)
+
+    def put_blob(self, artifact_path: str) -> tuple:
+        """Store an artifact by content; returns (digest, bytes copied)"""
+        digest = fingerprint_file(artifact_path)
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        fd, tmp = tempfile.mkstemp(dir=self.blob_dir)
+        os.close(fd)
+        shutil.copyfile(artifact_path, tmp)
+        os.replace(tmp, path)
+        return digest, os.path.getsize(path)
+
+    def register(self, model_id: str, artifact_path: str, description: str = "", labels: dict = None,
+                 metrics: dict = None, aliases: list = None, version_id: str = None) -> dict:
+        """Register an artifact as a new version, or return the version that already has its bytes
+
+        Versions are immutable: a version_id already registered with other bytes raises ValueError.
+        """
+        digest, copied = self.put_blob(artifact_path)
+        with self._transaction() as index:
+            model = self._model(index, model_id)
+            existing = model["digests"].get(digest)
+            if existing is not None:
+                version = dict(model["versions"][existing], bytes_copied=0, deduplicated=True)
+            else:
+                if version_id is None:
+                    version_id = str(len(model["versions"]) + 1)
+                    while version_id in model["versions"]:
+                        version_id = str(int(version_id) + 1)
+                elif version_id in model["versions"]:
+                    raise ValueError(
+                        f"Version {version_id} of model {model_id} is already registered with digest "
+                        f"{model['versions'][version_id]['digest']}"
+                    )
+                version = {
+                    "version_id": version_id,
+                    "digest": digest,
+                    "description": description,
+                    "labels": labels or {},
+                    "metrics": metrics or {},
+                    "created": time.time(),
+                }
+                model["versions"][version_id] = version
+                model["digests"][digest] = version_id
+                version = dict(version, bytes_copied=copied, deduplicated=False)
+            for alias in aliases or []:
+                model["aliases"][alias] = {"version_id": version["version_id"], "updated": time.time()}
+        return version
+
+    def set_aliases(self, model_id: str, version_id: str, add: list = (), remove: list = ()):
+        with self._transaction() as index:
+            model = self._model(index, model_id)
+            if version_id not in model["versions"]:
+                raise KeyError(f"Unknown version {version_id} of model {model_id}")
+            now = time.time()
+            for alias in add:
+                model["aliases"][alias] = {"version_id": version_id, "updated": now}
+            for alias in remove:
+                if model["aliases"].get(alias, {}).get("version_id") == version_id:
+                    model["aliases"][alias] = {"version_id": None, "updated": now}
+
+    def aliases(self, model_id: str) -> dict:
+        """alias -> version id for the model's live (not removed) aliases"""
+        aliases = self.index["models"].get(model_id, {}).get("aliases", {})
+        return {alias: entry["version_id"] for alias, entry in aliases.items() if entry["version_id"] is not None}
+
+    def resolve(self, model_id: str, alias: str) -> str:
+        """Version id for an alias, from memory (call refresh() to pick up other writers)"""
+        version_id = self.index["models"][model_id]["aliases"][alias]["version_id"]
+        if version_id is None:
+            raise KeyError(f"Alias {alias} of model {model_id} was removed")
+        return version_id
+
+    def find_digest(self, digest: str):
+        """(model_id, version_id) already holding these artifact bytes, or None"""
+        for model_id, model in self.index["models"].items():
+            if digest in model["digests"]:
+                return model_id, model["digests"][digest]
+        return None
+
+    def version(self, model_id: str, version_id: str) -> dict:
+        return self.index["models"][model_id]["versions"][version_id]
+
+    def artifact_path(self, model_id: str, alias_or_version: str) -> str:
+        model = self.index["models"][model_id]
+        if alias_or_version in model["aliases"]:
+            version_id = self.resolve(model_id, alias_or_version)
+        else:
+            version_id = alias_or_version
+        return self.blob_path(model["versions"][version_id]["digest"])
+
+    # --- Sync ---
+
+    def export_state(self) -> dict:
+        return self.index
+
+    def sync(self, remote) -> dict:
+        """Two-way sync with a remote exposing export_state/merge_state and blob transfer methods
+
+        Versions are immutable and merged as a union; each alias, including removals,
+        takes the side with the newer update time. Only blobs the other side lacks are transferred, and none for
+        remotes with transfers_blobs = False. Remotes with authoritative_aliases = True list
+        only live aliases (removals leave no trace there), so a local alias on one of their
+        versions that they no longer list is removed.
+        """
+        remote_state = remote.export_state()
+        transfers_blobs = getattr(remote, "transfers_blobs", True)
+        pushed = pulled = 0
+
+        with self._transaction() as index:
+            for model_id, remote_model in remote_state.get("models", {}).items():
+                model = self._model(index, model_id)
+                for version_id, version in remote_model["versions"].items():
+                    if version_id not in model["versions"]:
+                        missing = not os.path.exists(self.blob_path(version["digest"]))
+                        if transfers_blobs and missing and remote.has_blob(version["digest"]):
+                            remote.get_blob(version["digest"], self.blob_path(version["digest"]))
+                            pulled += 1
+                        model["versions"][version_id] = version
+                        model["digests"].setdefault(version["digest"], version_id)
+                _merge_aliases(model["aliases"], remote_model["aliases"])
+                if getattr(remote, "authoritative_aliases", False):
+                    now = time.time()
+                    for alias, entry in model["aliases"].items():
+                        if (entry["version_id"] in remote_model["versions"]
+                                and alias not in remote_model["aliases"]):
+                            model["aliases"][alias] = {"version_id": None, "updated": now}
+
+        for model in self.index["models"].values() if transfers_blobs else ():
+            for version in model["versions"].values():
+                if not remote.has_blob(version["digest"]) and os.path.exists(self.blob_path(version["digest"])):
+                    remote.put_blob_from(self.blob_path(version["digest"]), version["digest"])
+                    pushed += 1
+        remote.merge_state(self.index)
+        return {"blobs_pushed": pushed, "blobs_pulled": pulled, "generation": self.index["generation"]}
+
+
+class DirectoryRemote:
+    """A RegistryIndex in another directory (e.g. a mounted bucket) acting as the remote"""
+
+    def __init__(self, root: str):
+        self.registry = RegistryIndex(root)
+
+    def export_state(self) -> dict:
+        self.registry.refresh()
+        return self.registry.export_state()
+
+    def has_blob(self, digest: str) -> bool:
+        return os.path.exists(self.registry.blob_path(digest))
+
+    def get_blob(self, digest: str, dest: str):
+        shutil.copyfile(self.registry.blob_path(digest), dest)
+
+    def put_blob_from(self, path: str, digest: str):
+        self.registry.put_blob(path)
+
+    def merge_state(self, state: dict):
+        with self.registry._transaction() as index:
+            for model_id, model in state["models"].items():
+                target = self.registry._model(index, model_id)
+                for version_id, version in model["versions"].items():
+                    target["versions"].setdefault(version_id, version)
+                    target["digests"].setdefault(version["digest"], version_id)
+                _merge_aliases(target["aliases"], model["aliases"])
+
+
+class VertexRemote:
+    """Pull-only view of the Vertex AI Model Registry: versions and aliases, no blobs
+
+    Uploads still go through register_model_version; this keeps the local alias index in
+    step with aliases changed remotely. Vertex lists only the aliases a version has now, so
+    it is authoritative for aliases on its versions: one missing there was removed.
+    """
+
+    transfers_blobs = False
+    authoritative_aliases = True
+
+    def __init__(self, model_id: str, project_id: str, region: str):
+        from google.cloud import aiplatform
+
+        aiplatform.init(project=project_id, location=region)
+        self.model_id = model_id
+        self.registry = aiplatform.models.ModelRegistry(model_id)
+
+    def export_state(self) -> dict:
+        versions, aliases = {}, {}
+        for info in self.registry.list_versions():
+            updated = info.version_update_time.timestamp()
+            versions[info.version_id] = {
+                "version_id": info.version_id,
+                "digest": f"vertex:{info.model_resource_name}@{info.version_id}",
+                "description": info.version_description,
+                "labels": {},
+                "metrics": {},
+                "created": info.version_create_time.timestamp(),
+            }
+            for alias in info.version_aliases:
+                aliases[alias] = {"version_id": info.version_id, "updated": updated}
+        return {"models": {self.model_id: {"versions": versions, "aliases": aliases, "digests": {}}}}
+
+    def merge_state(self, state: dict):
+        pass
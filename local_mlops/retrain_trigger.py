@@ -0,0 +1,298 @@
+# retrain_trigger.py
+import asyncio
+import fnmatch
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+
+def write_change_marker(marker_path: str, rows_added: int, event_time: float = None):
+    """Bump a table change marker after an append: {"rows": running total, "updated_at": epoch s}"""
+    marker = {"rows": 0, "updated_at": 0.0}
+    if os.path.exists(marker_path):
+        with open(marker_path) as f:
+            marker = json.load(f)
+    marker["rows"] += rows_added
+    marker["updated_at"] = event_time or time.time()
+    directory = os.path.dirname(os.path.abspath(marker_path))
+    fd, tmp = tempfile.mkstemp(dir=directory)
+    with os.fdopen(fd, "w") as f:
+        json.dump(marker, f)
+    os.replace(tmp, marker_path)
+
+
+def count_file_rows(path: str) -> int:
+    """Rows in a landed file, from metadata where the format has it"""
+    if path.endswith((".arrow", ".feather", ".ipc")):
+        import pyarrow as pa
+
+        with pa.memory_map(path, "r") as source:
+            reader = pa.ipc.open_file(source)
+            return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(path).metadata.num_rows
+    with open(path, "rb") as f:
+        lines = sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+    return lines - 1 if path.endswith(".csv") else lines
+
+
+class FileLandingSource:
+    """Files landing in a directory; the cursor is the sorted names of the files already counted
+
+    Names rather than an mtime watermark: a file renamed in keeps its mtime, which can be
+    older than files already seen. Names of files that have since been removed are dropped
+    from the cursor, so it stays the size of the directory listing.
+    """
+
+    def __init__(self, directory: str, pattern: str = "*"):
+        self.directory = directory
+        self.pattern = pattern
+
+    def spec(self) -> dict:
+        return {"type": "files", "directory": self.directory, "pattern": self.pattern}
+
+    def poll(self, cursor):
+        # State written before the cursor held names is an (mtime_ns, name) watermark
+        watermark = tuple(cursor) if cursor and isinstance(cursor[0], int) else None
+        seen = set(cursor or ()) if watermark is None else set()
+        present, landed = [], []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                # Writers should land files atomically (write elsewhere, then rename in)
+                if entry.is_file() and fnmatch.fnmatch(entry.name, self.pattern):
+                    present.append(entry.name)
+                    key = (entry.stat().st_mtime_ns, entry.name)
+                    if entry.name not in seen and (watermark is None or key > watermark):
+                        landed.append((key, entry.path))
+        landed.sort()
+        events = [
+            {"id": path, "rows": count_file_rows(path), "event_time": key[0] / 1e9} for key, path in landed
+        ]
+        return events, sorted(present)
+
+
+class ChangeMarkerSource:
+    """A change marker file written by the loader (see write_change_marker); the cursor is its row total"""
+
+    def __init__(self, marker_path: str):
+        self.marker_path = marker_path
+
+    def spec(self) -> dict:
+        return {"type": "marker", "marker_path": self.marker_path}
+
+    def poll(self, cursor):
+        cursor = cursor or 0
+        if not os.path.exists(self.marker_path):
+            return [], cursor
+        with open(self.marker_path) as f:
+            marker = json.load(f)
+        if marker["rows"] <= cursor:
+            return [], cursor
+        event = {"id": f"rows:{marker['rows']}", "rows": marker["rows"] - cursor, "event_time": marker["updated_at"]}
+        return [event], marker["rows"]
+
+
+class BigQueryTableSource:
+    """Table metadata (num_rows, modified) as the change marker; a metadata call, not a query
+
+    Rows still in the streaming buffer are not counted until they are committed to storage.
+    """
+
+    def __init__(self, table_id: str, project_id: str = None):
+        self.table_id = table_id
+        self.project_id = project_id
+
+    def spec(self) -> dict:
+        return {"type": "bigquery_table", "table_id": self.table_id, "project_id": self.project_id}
+
+    def poll(self, cursor):
+        from google.cloud import bigquery
+
+        table = bigquery.Client(project=self.project_id).get_table(self.table_id)
+        cursor = cursor if cursor is not None else table.num_rows
+        if table.num_rows <= cursor:
+            return [], table.num_rows
+        event = {"id": f"rows:{table.num_rows}", "rows": table.num_rows - cursor,
+                 "event_time": table.modified.timestamp()}
+        return [event], table.num_rows
+
+
+SOURCES = {"files": FileLandingSource, "marker": ChangeMarkerSource, "bigquery_table": BigQueryTableSource}
+
+
+def source_from_spec(spec: dict):
+    spec = dict(spec)
+    return SOURCES[spec.pop("type")](**spec)
+
+
+class RetrainTrigger:
+    """Turns new-data notifications into coalesced retraining decisions, with persisted state
+
+    Each poll() asks the source for events (landed files or change-marker bumps) and adds
+    them to a pending batch, so a burst of notifications becomes a single run. The batch is
+    decided once no new data has arrived for `debounce_s`, or `max_delay_s` after its first
+    event, whichever comes first. A batch with fewer than `min_rows` rows is reported once
+    as "skip" and carried forward, so later deltas add up to the threshold. Otherwise it is
+    returned as "submit" and stays in flight until complete() records the data-to-model
+    latency: model ready time minus the first event's time.
+
+    State (source cursor, pending batch, in-flight batch, latency history) is one JSON file
+    at `state_path`, so a trigger that is restarted or re-created elsewhere (e.g. the Airflow
+    triggerer, then a worker) resumes where it stopped.
+    """
+
+    HISTORY = 1000
+
+    def __init__(self, source, state_path: str, min_rows: int = 1, debounce_s: float = 60.0,
+                 max_delay_s: float = 900.0):
+        self.source = source_from_spec(source) if isinstance(source, dict) else source
+        self.state_path = state_path
+        self.min_rows = min_rows
+        self.debounce_s = debounce_s
+        self.max_delay_s = max_delay_s
+        self.state = self._load_state()
+
+    def _load_state(self) -> dict:
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                return json.load(f)
+        return {"cursor": None, "pending": None, "in_flight": None, "runs": 0, "skipped": 0, "history": []}
+
+    def _save_state(self):
+        directory = os.path.dirname(os.path.abspath(self.state_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.state_path)
+
+    def poll(self, now: float = None):
+        """Collect new events; returns a submit/skip decision when the pending batch closes, else None"""
+        now = now or time.time()
+        previous_cursor = self.state["cursor"]
+        events, cursor = self.source.poll(previous_cursor)
+        pending = self.state["pending"]
+        if events:
+            if pending is None:
+                pending = {"rows": 0, "events": 0, "first_event_time": events[0]["event_time"], "first_seen": now}
+            pending["rows"] += sum(e["rows"] for e in events)
+            pending["events"] += len(events)
+            pending["last_event_time"] = max(e["event_time"] for e in events)
+            pending["last_seen"] = now
+            pending["skip_reported"] = False
+        self.state["cursor"] = cursor
+        self.state["pending"] = pending
+
+        decision = None
+        if pending is not None and not pending["skip_reported"]:
+            quiet = now - pending["last_seen"] >= self.debounce_s
+            overdue = now - pending["first_seen"] >= self.max_delay_s
+            if quiet or overdue:
+                decision = dict(pending, decided_at=now, reason="quiet" if quiet else "max_delay")
+                if pending["rows"] < self.min_rows:
+                    decision["action"] = "skip"
+                    pending["skip_reported"] = True
+                    self.state["skipped"] += 1
+                else:
+                    decision["action"] = "submit"
+                    decision["batch_id"] = f"batch-{self.state['runs'] + 1:06d}"
+                    self.state["runs"] += 1
+                    self.state["in_flight"] = decision
+                    self.state["pending"] = None
+        # A cursor that moved without events (e.g. the first poll's baseline) is saved too:
+        # callers such as a non-deferrable sensor build a new trigger for every poll
+        if events or decision is not None or cursor != previous_cursor:
+            self._save_state()
+        return decision
+
+    async def wait(self, poll_interval_s: float = 30.0) -> dict:
+        """Poll until a batch is submitted (for deferrable triggers); skip decisions are returned too"""
+        while True:
+            decision = await asyncio.get_running_loop().run_in_executor(None, self.poll)
+            if decision is not None:
+                return decision
+            await asyncio.sleep(poll_interval_s)
+
+    def complete(self, model_ready_time: float = None) -> dict:
+        """Close the in-flight batch once its model is trained/deployed; returns its latency record"""
+        batch = self.state["in_flight"]
+        if batch is None:
+            raise RuntimeError("No batch in flight")
+        model_ready_time = model_ready_time or time.time()
+        record = {
+            "batch_id": batch["batch_id"],
+            "rows": batch["rows"],
+            "events": batch["events"],
+            # First data in the batch -> model ready, and its two parts
+            "data_to_model_s": model_ready_time - batch["first_event_time"],
+            "data_to_trigger_s": batch["decided_at"] - batch["first_event_time"],
+            "trigger_to_model_s": model_ready_time - batch["decided_at"],
+        }
+        self.state["history"] = (self.state["history"] + [record])[-self.HISTORY:]
+        self.state["in_flight"] = None
+        self._save_state()
+        return record
+
+    def latency_summary(self) -> dict:
+        latencies = np.array([r["data_to_model_s"] for r in self.state["history"]])
+        summary = {"runs": self.state["runs"], "skipped": self.state["skipped"], "completed": len(latencies)}
+        if len(latencies):
+            summary.update({
+                "data_to_model_p50_s": float(np.percentile(latencies, 50)),
+                "data_to_model_p95_s": float(np.percentile(latencies, 95)),
+                "data_to_model_max_s": float(latencies.max()),
+            })
+        return summary
+
+
+def run_local(trigger: RetrainTrigger, retrain_fn, poll_interval_s: float = 1.0, max_runs: int = None,
+              log=print) -> list:
+    """Poll `trigger` and call retrain_fn(decision) for each submitted batch (local stand-in for the DAG)"""
+    records = []
+    while max_runs is None or len(records) < max_runs:
+        decision = trigger.poll()
+        if decision is None:
+            time.sleep(poll_interval_s)
+            continue
+        if decision["action"] == "skip":
+            log(f"Skipping: {decision['rows']} new rows < min_rows={trigger.min_rows}")
+            continue
+        log(f"{decision['batch_id']}: {decision['rows']} rows from {decision['events']} event(s), retraining")
+        retrain_fn(decision)
+        records.append(trigger.complete())
+        log(f"{decision['batch_id']}: data-to-model latency {records[-1]['data_to_model_s']:.1f} s")
+    return records
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Event-driven local retraining (IncrementalTrainer on new data)")
+    parser.add_argument("state_dir", help="IncrementalTrainer state directory; the trigger state is kept in it too")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--watch-dir", help="React to files landing in this directory")
+    group.add_argument("--marker", help="React to a table change marker written by append_local_iris_rows")
+    parser.add_argument("--pattern", default="*")
+    parser.add_argument("--source", default="sqlite", help="Table IncrementalTrainer loads from")
+    parser.add_argument("--source-uri", default="")
+    parser.add_argument("--min-rows", type=int, default=1)
+    parser.add_argument("--debounce-s", type=float, default=10.0)
+    parser.add_argument("--max-delay-s", type=float, default=300.0)
+    parser.add_argument("--poll-interval-s", type=float, default=1.0)
+    args = parser.parse_args()
+
+    from local_mlops.incremental import IncrementalTrainer
+
+    source = FileLandingSource(args.watch_dir, args.pattern) if args.watch_dir else ChangeMarkerSource(args.marker)
+    trainer = IncrementalTrainer(args.state_dir, args.source, args.source_uri)
+    trigger = RetrainTrigger(source, os.path.join(args.state_dir, "trigger_state.json"), args.min_rows,
+                             args.debounce_s, args.max_delay_s)
+    try:
+        run_local(trigger, lambda decision: trainer.run(), args.poll_interval_s)
+    except KeyboardInterrupt:
+        print(json.dumps(trigger.latency_summary()))
@@ -0,0 +1,334 @@
+# router.py
+import hashlib
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from local_mlops.server import Prediction, load_model_artifacts, make_predict_fn
+
+
+class LatencyHistogram:
+    """Log-spaced latency histogram (1 µs to ~17 min) with approximate percentiles in fixed memory"""
+
+    BINS_PER_DECADE = 20
+
+    def __init__(self):
+        self.counts = np.zeros(9 * self.BINS_PER_DECADE + 2, dtype=np.int64)
+        self.total_s = 0.0
+
+    def add(self, seconds):
+        """Record one latency or an array of them"""
+        seconds = np.atleast_1d(np.asarray(seconds, dtype=np.float64))
+        index = np.floor(np.log10(np.maximum(seconds, 1e-6) * 1e6) * self.BINS_PER_DECADE).astype(np.int64) + 1
+        index[seconds <= 1e-6] = 0
+        np.add.at(self.counts, np.minimum(index, len(self.counts) - 1), 1)
+        self.total_s += float(seconds.sum())
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        self.counts += other.counts
+        self.total_s += other.total_s
+        return self
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def percentile(self, q: float) -> float:
+        """Upper edge (seconds) of the bin holding the q-th percentile"""
+        total = self.count
+        if not total:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self.counts), q / 100 * total))
+        return 1e-6 * 10 ** (index / self.BINS_PER_DECADE)
+
+    def summary(self) -> dict:
+        count = self.count
+        return {
+            "count": count,
+            "mean_ms": self.total_s / count * 1e3 if count else 0.0,
+            "p50_ms": self.percentile(50) * 1e3,
+            "p99_ms": self.percentile(99) * 1e3,
+        }
+
+
+class ComparisonStats:
+    """Streaming agreement, confusion and latency delta between the served model and a shadow
+
+    Memory is fixed by the number of classes: a (classes, classes) confusion matrix of
+    served label vs shadow label, running mean/variance of the latency delta and the
+    L1 distance between probability vectors. Stats built from separate batches merge.
+    The delta is shadow minus served latency for the same request, both timed as one
+    predict call on that request's rows.
+    """
+
+    def __init__(self, classes: list):
+        self.classes = list(classes)
+        self.confusion = np.zeros((len(self.classes), len(self.classes)), dtype=np.int64)
+        self.rows = 0
+        self.probability_l1 = 0.0
+        self.requests = 0
+        self._delta_mean = 0.0
+        self._delta_m2 = 0.0
+
+    def update(self, served_idx, shadow_idx, served_proba, shadow_proba, latency_deltas_s):
+        """Add rows (class indices and aligned probabilities) and one latency delta per request"""
+        deltas = np.atleast_1d(np.asarray(latency_deltas_s, dtype=np.float64))
+        batch = ComparisonStats(self.classes)
+        np.add.at(batch.confusion, (served_idx, shadow_idx), 1)
+        batch.rows = len(served_idx)
+        batch.probability_l1 = float(np.abs(served_proba - shadow_proba).sum())
+        batch.requests = len(deltas)
+        batch._delta_mean = float(deltas.mean()) if len(deltas) else 0.0
+        batch._delta_m2 = float(((deltas - batch._delta_mean) ** 2).sum())
+        self.merge(batch)
+
+    def merge(self, other: "ComparisonStats") -> "ComparisonStats":
+        """Combine counts and (Chan et al.) the latency delta mean/variance of another shard"""
+        requests = self.requests + other.requests
+        if requests:
+            delta = other._delta_mean - self._delta_mean
+            self._delta_m2 += other._delta_m2 + delta ** 2 * self.requests * other.requests / requests
+            self._delta_mean += delta * other.requests / requests
+        self.confusion += other.confusion
+        self.rows += other.rows
+        self.probability_l1 += other.probability_l1
+        self.requests = requests
+        return self
+
+    def summary(self) -> dict:
+        agreement = np.trace(self.confusion) / self.rows if self.rows else 0.0
+        return {
+            "rows": self.rows,
+            "agreement_rate": float(agreement),
+            "mean_probability_l1": self.probability_l1 / self.rows if self.rows else 0.0,
+            "latency_delta_mean_ms": self._delta_mean * 1e3,
+            "latency_delta_std_ms": (self._delta_m2 / self.requests) ** 0.5 * 1e3 if self.requests else 0.0,
+            "confusion": {
+                served: {shadow: int(n) for shadow, n in zip(self.classes, row) if n}
+                for served, row in zip(self.classes, self.confusion) if row.any()
+            },
+        }
+
+
+class _Variant:
+    def __init__(self, name: str, model_artifacts: dict, class_index: dict):
+        self.name = name
+        predict = make_predict_fn(model_artifacts)
+        # Probabilities are re-ordered onto the router's class list so variants trained on
+        # different label sets stay comparable
+        columns = [class_index[c] for c in model_artifacts["label_encoder"].classes_]
+        width = len(class_index)
+
+        def predict_aligned(instances):
+            # Raw request rows: each variant applies its own transform, if it has one
+            labels, proba = predict(predict.prepare(instances))
+            aligned = np.zeros((len(labels), width))
+            aligned[:, columns] = proba
+            return labels, aligned
+
+        self.predict = predict_aligned
+        # Served and shadow calls are both timed per request, so the two are comparable
+        self.latency = LatencyHistogram()
+        self.shadow_latency = LatencyHistogram()
+        self.correct = 0
+        self.labeled = 0
+
+
+class TrafficRouter:
+    """Several model versions in one process, splitting traffic by weight and mirroring to shadows
+
+    `models` maps a variant name to a train_model joblib path (or an already loaded artifact
+    dict). Each request is served by one variant drawn from `weights` (sticky per `key`
+    when one is given). Requests are then appended to a shadow queue that
+    `shadow_workers` background threads drain every `shadow_interval_ms` and score with
+    every variant in `shadows`. A shadow predicts each drained request on its own, as the
+    served call did, so its latency and the served-vs-shadow delta measure the same thing;
+    the comparison stats are then folded in per drained batch. The served path only pays
+    for a deque append. When `max_pending_shadow` requests are queued, new ones are dropped and
+    counted. predict() has the same call shape as aiplatform.Endpoint.
+    """
+
+    def __init__(self, models: dict, weights: dict = None, shadows: list = (), shadow_workers: int = 1,
+                 shadow_interval_ms: float = 5.0, max_pending_shadow: int = 10_000, seed: int = 0):
+        artifacts = {
+            name: load_model_artifacts(m) if isinstance(m, str) else m for name, m in models.items()
+        }
+        self.classes = sorted({str(c) for a in artifacts.values() for c in a["label_encoder"].classes_})
+        self._class_index = {c: i for i, c in enumerate(self.classes)}
+        self.variants = {name: _Variant(name, a, self._class_index) for name, a in artifacts.items()}
+
+        weights = weights or {next(iter(models)): 1.0}
+        unknown = (set(weights) | set(shadows)) - set(self.variants)
+        if unknown:
+            raise KeyError(f"Unknown variants: {sorted(unknown)}")
+        self._served = list(weights)
+        cumulative = np.cumsum([weights[name] for name in self._served])
+        self._cumulative = cumulative / cumulative[-1]
+        self.shadows = list(shadows)
+        self.comparisons = {
+            (served, shadow): ComparisonStats(self.classes)
+            for served in self._served for shadow in self.shadows if shadow != served
+        }
+
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._queue = deque()
+        self._in_flight = 0
+        self.max_pending_shadow = max_pending_shadow
+        self.shadow_interval = shadow_interval_ms / 1e3
+        self.shadow_dropped = 0
+        self.shadow_errors = 0
+        self.shadow_last_error = None
+        self._stopping = threading.Event()
+        self._workers = [
+            threading.Thread(target=self._shadow_loop, daemon=True) for _ in range(shadow_workers if shadows else 0)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def choose(self, key: str = None) -> str:
+        if len(self._served) == 1:
+            return self._served[0]
+        if key is None:
+            with self._lock:
+                u = self._rng.random()
+        else:
+            u = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") / 2 ** 64
+        return self._served[int(np.searchsorted(self._cumulative, u, side="right"))]
+
+    def predict(self, instances: list, labels: list = None, key: str = None) -> Prediction:
+        """Serve from one variant; labels (ground truth, optional) feed per-variant accuracy"""
+        name = self.choose(key)
+        variant = self.variants[name]
+        start = time.perf_counter()
+        served_labels, served_proba = variant.predict(instances)
+        latency = time.perf_counter() - start
+
+        with self._lock:
+            variant.latency.add(latency)
+            self._score(variant, served_labels, labels)
+            if self._workers:
+                if self._in_flight >= self.max_pending_shadow:
+                    self.shadow_dropped += 1
+                else:
+                    self._in_flight += 1
+                    self._queue.append((name, instances, served_labels, served_proba, latency, labels))
+        return Prediction(served_labels.tolist(), deployed_model_id=name)
+
+    def _score(self, variant: _Variant, predicted, labels):
+        if labels is not None:
+            variant.correct += int((np.asarray(predicted) == np.asarray(labels)).sum())
+            variant.labeled += len(labels)
+
+    def _shadow_loop(self):
+        while not self._stopping.is_set() or self._queue:
+            time.sleep(self.shadow_interval)
+            with self._lock:
+                jobs = [self._queue.popleft() for _ in range(len(self._queue))]
+            if jobs:
+                self._run_shadows(jobs)
+
+    def _run_shadows(self, jobs: list):
+        """Score a batch of served requests with every shadow and fold the results into the stats
+
+        Everything is computed into batch-local stats first so the router lock, which the
+        served path also takes, is only held for the merge.
+        """
+        try:
+            index = self._class_index
+            sizes = np.array([len(job[2]) for job in jobs])
+            owner = np.repeat(np.arange(len(jobs)), sizes)
+            rows_total = int(sizes.sum())
+            served_names = np.array([job[0] for job in jobs])
+            served_idx = np.fromiter((index[str(c)] for job in jobs for c in job[2]), np.int64, rows_total)
+            served_proba = np.concatenate([job[3] for job in jobs])
+            served_latency = np.array([job[4] for job in jobs])
+            labeled = np.array([job[5] is not None for job in jobs])
+            labels = np.concatenate([np.asarray(job[5]) for job in jobs if job[5] is not None]) if labeled.any() else None
+
+            for shadow in self.shadows:
+                variant = self.variants[shadow]
+                mirrored = served_names != shadow
+                # Each request is scored alone and timed like its served call; batching them
+                # would amortize the per-call overhead and bias the delta negative
+                results, latency = [], np.zeros(len(jobs))
+                for i, job in enumerate(jobs):
+                    start = time.perf_counter()
+                    results.append(variant.predict(job[1]))
+                    latency[i] = time.perf_counter() - start
+                shadow_labels = np.concatenate([result[0] for result in results])
+                shadow_proba = np.concatenate([result[1] for result in results])
+                shadow_idx = np.fromiter((index[str(c)] for c in shadow_labels), np.int64, rows_total)
+
+                latencies = LatencyHistogram()
+                latencies.add(latency[mirrored])
+                correct = total = 0
+                if labels is not None:
+                    rows = (mirrored & labeled)[owner]
+                    label_rows = np.repeat(mirrored[labeled], sizes[labeled])
+                    correct = int((shadow_labels[rows] == labels[label_rows]).sum())
+                    total = int(rows.sum())
+                batches = {}
+                for served in set(served_names[mirrored]):
+                    requests = served_names == served
+                    rows = requests[owner]
+                    batches[served] = ComparisonStats(self.classes)
+                    batches[served].update(
+                        served_idx[rows], shadow_idx[rows], served_proba[rows], shadow_proba[rows],
+                        latency[requests] - served_latency[requests]
+                    )
+
+                with self._lock:
+                    variant.shadow_latency.merge(latencies)
+                    variant.correct += correct
+                    variant.labeled += total
+                    for served, batch in batches.items():
+                        self.comparisons[(served, shadow)].merge(batch)
+        except Exception as e:
+            with self._lock:
+                self.shadow_errors += 1
+                self.shadow_last_error = repr(e)
+        finally:
+            with self._lock:
+                self._in_flight -= len(jobs)
+                self._idle.notify_all()
+
+    def drain(self, timeout: float = None) -> bool:
+        """Wait until no shadow work is queued (e.g. before reading final stats)"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._in_flight == 0, timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "variants": {
+                    name: dict(
+                        v.latency.summary(),
+                        accuracy=v.correct / v.labeled if v.labeled else None,
+                        shadow_latency=v.shadow_latency.summary(),
+                    )
+                    for name, v in self.variants.items()
+                },
+                "comparisons": {
+                    f"{served}->{shadow}": stats.summary() for (served, shadow), stats in self.comparisons.items()
+                },
+                "shadow_pending": self._in_flight,
+                "shadow_dropped": self.shadow_dropped,
+                "shadow_errors": self.shadow_errors,
+                "shadow_last_error": self.shadow_last_error,
+            }
+
+    def close(self):
+        self._stopping.set()
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,331 @@
+# server.py
+import asyncio
+import json
+import threading
+import urllib.request
+
+import numpy as np
+
+
+def load_model_artifacts(model_path: str) -> dict:
+    """Load the model/label_encoder/feature_names dict written by train_model"""
+    import joblib
+
+    return joblib.load(model_path)
+
+
+def make_predict_fn(model_artifacts: dict):
+    """Vectorized predict over a (rows, features) block; returns (labels, probabilities)
+
+    The block is what the model takes. Its `prepare` attribute turns request instances
+    into such a block: artifacts trained with a schema carry the fitted transform, which
+    must see the raw rows (category values are still strings), so nothing is cast before it.
+    """
+    clf = model_artifacts["model"]
+    classes = model_artifacts["label_encoder"].classes_
+    transform = model_artifacts.get("transform")
+
+    def prepare(instances) -> np.ndarray:
+        if transform is not None:
+            return transform.transform_instances(instances)
+        return np.asarray(instances, dtype=np.float64)
+
+    def predict(X):
+        proba = clf.predict_proba(X)
+        return classes[proba.argmax(axis=1)], proba
+
+    predict.prepare = prepare
+    # Lets MicroBatcher reject rows of the wrong width before they reach a batch
+    predict.n_features = len(model_artifacts["feature_names"])
+    return predict
+
+
+def prepare_instances(predict_fn, instances) -> np.ndarray:
+    """Request instances as the block `predict_fn` takes (float64 unless it has a `prepare`)"""
+    prepare = getattr(predict_fn, "prepare", None)
+    return prepare(instances) if prepare is not None else np.asarray(instances, dtype=np.float64)
+
+
+class MicroBatcher:
+    """Groups concurrent requests into one predict call
+
+    A batch is flushed when it reaches max_batch_size rows or when the oldest request
+    has waited max_wait_us microseconds, whichever comes first. Each predicted batch is
+    offered to `prediction_logger` (a local_mlops.prediction_log.PredictionLogger) when set.
+    Malformed requests are rejected in submit(); a batch that still fails to predict fails
+    only its own requests, never the batching task.
+    """
+
+    def __init__(self, predict_fn, max_batch_size: int = 64, max_wait_us: int = 500, prediction_logger=None):
+        self.predict_fn = predict_fn
+        self.prediction_logger = prediction_logger
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_us / 1e6
+        self.batches = 0
+        self.rows = 0
+        self.log_errors = 0
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, instances) -> tuple:
+        """Queue one request's rows and wait for its slice of the batch result"""
+        X = prepare_instances(self.predict_fn, instances)
+        n_features = getattr(self.predict_fn, "n_features", None)
+        if X.ndim != 2 or len(X) == 0:
+            raise ValueError(f"instances must be a non-empty list of feature rows, got shape {X.shape}")
+        if n_features is not None and X.shape[1] != n_features:
+            raise ValueError(f"instances have {X.shape[1]} features, the model expects {n_features}")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((X, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            X, future = await self._queue.get()
+            pending = [(X, future)]
+            rows = len(X)
+            deadline = loop.time() + self.max_wait
+            while rows < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    X, future = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append((X, future))
+                rows += len(X)
+            try:
+                self._flush(pending)
+            except Exception as e:
+                self._fail(pending, e)
+
+    def _fail(self, pending: list, error: Exception):
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(error)
+
+    def _flush(self, pending: list):
+        try:
+            batch_X = np.concatenate([X for X, _ in pending])
+            labels, proba = self.predict_fn(batch_X)
+        except Exception as e:
+            self._fail(pending, e)
+            return
+        self.batches += 1
+        start = 0
+        for X, future in pending:
+            end = start + len(X)
+            if not future.done():
+                future.set_result((labels[start:end], proba[start:end]))
+            start = end
+        self.rows += start
+        if self.prediction_logger is not None:
+            # Only copies sampled rows into the logger's ring; files are written off this thread.
+            # Requests are already answered, and a logging failure must not reach the batcher
+            try:
+                self.prediction_logger.log(batch_X, proba)
+            except Exception:
+                self.log_errors += 1
+
+
+class PredictionServer:
+    """Minimal asyncio HTTP/1.1 server exposing POST /predict and GET /health
+
+    Accepts the Vertex `{"instances": [[...]]}` payload and answers with
+    `{"predictions": [...], "probabilities": [[...]]}`. Connections are kept alive.
+    """
+
+    def __init__(self, model_artifacts: dict, host: str = "127.0.0.1", port: int = 8080,
+                 max_batch_size: int = 64, max_wait_us: int = 500, prediction_logger=None):
+        self.model_artifacts = model_artifacts
+        self.host = host
+        self.port = port
+        self.batcher = MicroBatcher(
+            make_predict_fn(model_artifacts), max_batch_size, max_wait_us, prediction_logger
+        )
+        self.requests = 0
+        self._server = None
+
+    async def start(self):
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def predict(self, payload: dict) -> dict:
+        labels, proba = await self.batcher.submit(payload["instances"])
+        return {"predictions": labels.tolist(), "probabilities": proba.tolist()}
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, response = await self._route(method, path, body)
+                data = json.dumps(response).encode()
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> tuple:
+        if method == "GET" and path == "/health":
+            return "200 OK", {"status": "ok"}
+        if method == "POST" and (path == "/predict" or path.endswith(":predict")):
+            self.requests += 1
+            try:
+                return "200 OK", await self.predict(json.loads(body))
+            except (KeyError, ValueError, TypeError) as e:
+                return "400 Bad Request", {"error": str(e)}
+            except Exception as e:
+                # A bug in the model or transform must not drop the connection without an answer
+                return "500 Internal Server Error", {"error": f"{type(e).__name__}: {e}"}
+        return "404 Not Found", {"error": f"No route for {method} {path}"}
+
+
+class LocalPredictionServer:
+    """Runs a PredictionServer on a background event loop, e.g. as an endpoint stand-in in tests
+
+        with LocalPredictionServer("model.joblib") as server:
+            server.endpoint.predict(instances=[[5.1, 3.5, 1.4, 0.2]]).predictions
+    """
+
+    def __init__(self, model_path: str, port: int = 0, **batch_options):
+        self.server = PredictionServer(load_model_artifacts(model_path), port=port, **batch_options)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server.host}:{self.server.port}"
+
+    @property
+    def endpoint(self) -> "LocalEndpoint":
+        return LocalEndpoint(self.url)
+
+    def start(self) -> "LocalPredictionServer":
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.server.start(), self._loop).result()
+        return self
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.server.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class Prediction:
+    """Mirrors the `predictions` attribute of aiplatform's endpoint.predict response"""
+
+    def __init__(self, predictions: list, deployed_model_id: str = "local"):
+        self.predictions = predictions
+        self.deployed_model_id = deployed_model_id
+
+
+class LocalEndpoint:
+    """HTTP client with the same predict(instances=...) call as aiplatform.Endpoint"""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+
+    def predict(self, instances: list) -> Prediction:
+        request = urllib.request.Request(
+            f"{self.url}/predict",
+            data=json.dumps({"instances": instances}).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return Prediction(json.loads(response.read())["predictions"])
+
+
+def serve(model_path: str, host: str = "127.0.0.1", port: int = 8080,
+          max_batch_size: int = 64, max_wait_us: int = 500, log_dir: str = "",
+          log_sample_rate: float = 0.1, log_reservoir_size: int = 0):
+    """Serve a train_model artifact until interrupted, logging sampled predictions to `log_dir`"""
+    model_artifacts = load_model_artifacts(model_path)
+    prediction_logger = None
+    if log_dir:
+        from local_mlops.prediction_log import PredictionLogger
+
+        prediction_logger = PredictionLogger(
+            log_dir, model_artifacts["feature_names"], model_artifacts["label_encoder"].classes_,
+            sample_rate=log_sample_rate, reservoir_size=log_reservoir_size
+        )
+    server = PredictionServer(model_artifacts, host, port, max_batch_size, max_wait_us, prediction_logger)
+    print(f"Serving {model_path} on http://{host}:{port} "
+          f"(max_batch_size={max_batch_size}, max_wait_us={max_wait_us})")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if prediction_logger is not None:
+            prediction_logger.close()
+            print(f"Prediction log: {prediction_logger.stats()}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local micro-batching prediction server")
+    parser.add_argument("model_path")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-us", type=int, default=500)
+    parser.add_argument("--log-dir", default="", help="Write sampled predictions here (Arrow IPC files)")
+    parser.add_argument("--log-sample-rate", type=float, default=0.1)
+    parser.add_argument("--log-reservoir-size", type=int, default=0,
+                        help="Log a uniform sample of at most this many rows per second instead")
+    args = parser.parse_args()
+    serve(args.model_path, args.host, args.port, args.max_batch_size, args.max_wait_us,
+          args.log_dir, args.log_sample_rate, args.log_reservoir_size)
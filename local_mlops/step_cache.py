@@ -0,0 +1,133 @@
+# step_cache.py
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+INDEX_FILE = "index.json"
+
+
+def fingerprint_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """sha256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(*parts) -> str:
+    """Hash fingerprints, component source and parameters into one cache key"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, (str, bytes)):
+            part = json.dumps(part, sort_keys=True, default=str)
+        if isinstance(part, str):
+            part = part.encode()
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class StepCache:
+    """On-disk, content-addressed store for pipeline step outputs with size-based LRU eviction
+
+    Each entry is a directory named by its key holding the output files plus a small
+    JSON value (e.g. the step's NamedTuple outputs). The index keeps sizes, last access
+    time and hit/miss counters; it is re-read and replaced under a file lock, so steps
+    sharing a cache directory do not lose each other's entries or counters.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 1 << 30):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self.index = self._load_index()
+
+    def _load_index(self) -> dict:
+        path = os.path.join(self.root, INDEX_FILE)
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+        return {"entries": {}, "hits": 0, "misses": 0, "evictions": 0}
+
+    def _save_index(self):
+        # Write then rename so a crashed run never leaves a truncated index
+        fd, tmp = tempfile.mkstemp(dir=self.root)
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp, os.path.join(self.root, INDEX_FILE))
+
+    @contextmanager
+    def _transaction(self):
+        """Lock, reload, let the caller mutate self.index, then atomically replace the file"""
+        with open(os.path.join(self.root, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.index = self._load_index()
+            yield self.index
+            self._save_index()
+
+    def get(self, key: str, outputs: dict):
+        """Copy cached files to `outputs` ({name: destination path}) and return the stored value
+
+        Returns None on a miss. An entry whose directory or files are gone (e.g. removed
+        by hand or by a crashed eviction) counts as a miss and is dropped.
+        """
+        with self._transaction() as index:
+            entry = index["entries"].get(key)
+            entry_dir = os.path.join(self.root, key)
+            sources = [os.path.join(entry_dir, name) for name in outputs]
+            if entry is not None and not all(os.path.isfile(src) for src in sources):
+                index["entries"].pop(key)
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                entry = None
+            if entry is None:
+                index["misses"] += 1
+                return None
+
+            for src, dest in zip(sources, outputs.values()):
+                shutil.copyfile(src, dest)
+            entry["last_access"] = time.time()
+            index["hits"] += 1
+            return entry["value"]
+
+    def put(self, key: str, outputs: dict, value=None):
+        """Store the files in `outputs` ({name: source path}) and `value` under `key`"""
+        entry_dir = os.path.join(self.root, key)
+        tmp_dir = tempfile.mkdtemp(dir=self.root)
+        size = 0
+        for name, src in outputs.items():
+            shutil.copyfile(src, os.path.join(tmp_dir, name))
+            size += os.path.getsize(src)
+        with self._transaction() as index:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+            index["entries"][key] = {"size": size, "last_access": time.time(), "value": value}
+            self._evict()
+
+    def _evict(self):
+        entries = self.index["entries"]
+        total = sum(e["size"] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            total -= entries.pop(key)["size"]
+            shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+            self.index["evictions"] += 1
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        self.index = self._load_index()
+        lookups = self.index["hits"] + self.index["misses"]
+        return {
+            "hits": self.index["hits"],
+            "misses": self.index["misses"],
+            "evictions": self.index["evictions"],
+            "hit_rate": self.index["hits"] / lookups if lookups else 0.0,
+            "entries": len(self.index["entries"]),
+            "bytes": sum(e["size"] for e in self.index["entries"].values()),
+        }
@@ -0,0 +1,213 @@
+# tuning.py
+import math
+import os
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Arrays attached by each worker process, keyed by name
+_WORKER_ARRAYS = {}
+_WORKER_SEGMENTS = []
+
+
+def share_arrays(arrays: dict):
+    """Copy arrays into shared memory once; returns (segments, specs) for the workers"""
+    segments, specs = [], {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        segments.append(shm)
+        specs[name] = (shm.name, array.shape, array.dtype.str)
+    return segments, specs
+
+
+def attach_arrays(specs: dict) -> dict:
+    """Map the shared arrays described by `specs` without copying them"""
+    arrays = {}
+    for name, (shm_name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _WORKER_SEGMENTS.append(shm)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    return arrays
+
+
+def _init_worker(specs: dict):
+    _WORKER_ARRAYS.update(attach_arrays(specs))
+
+
+def _run_rung(learning_rate: float, iterations: int, coef, intercept):
+    """Fit `iterations` more lbfgs steps, warm-starting from the previous rung's weights"""
+    from sklearn.exceptions import ConvergenceWarning
+    from sklearn.linear_model import LogisticRegression
+
+    data = _WORKER_ARRAYS
+    clf = LogisticRegression(
+        C=1 / learning_rate,
+        max_iter=iterations,
+        random_state=42,
+        warm_start=True
+    )
+    if coef is not None:
+        clf.coef_ = coef
+        clf.intercept_ = intercept
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        clf.fit(data["X_train"], data["y_train"])
+    accuracy = float((clf.predict(data["X_test"]) == data["y_test"]).mean())
+    return accuracy, clf.coef_, clf.intercept_
+
+
+def rung_budgets(max_iter: int, min_iter: int, eta: int) -> list:
+    """Cumulative max_iter at each rung, ending at the trial's own max_iter"""
+    budgets = []
+    budget = min_iter
+    while budget < max_iter:
+        budgets.append(budget)
+        budget *= eta
+    budgets.append(max_iter)
+    return budgets
+
+
+def sample_trial(rng, learning_rate_range: tuple, max_iter_range: tuple) -> dict:
+    """Draw learning_rate on a log scale and max_iter on a linear scale"""
+    low, high = learning_rate_range
+    return {
+        "learning_rate": float(math.exp(rng.uniform(math.log(low), math.log(high)))),
+        "max_iter": int(rng.integers(max_iter_range[0], max_iter_range[1] + 1)),
+    }
+
+
+def run_asha(
+    X_train,
+    y_train,
+    X_test,
+    y_test,
+    learning_rate_range: tuple = (0.001, 0.1),
+    max_iter_range: tuple = (100, 2000),
+    max_trial_count: int = 20,
+    parallel_trial_count: int = 0,
+    min_iter: int = 100,
+    eta: int = 3,
+    seed: int = 42
+) -> dict:
+    """Asynchronous successive halving over the tuning search space
+
+    Workers share the training matrix through shared memory. A trial is promoted to its
+    next max_iter rung only if it is in the top 1/eta of the results recorded at its
+    current rung; the rest are stopped early. Returns the accuracy-maximizing trial.
+    """
+    workers = parallel_trial_count or os.cpu_count() or 1
+    rng = np.random.default_rng(seed)
+    segments, specs = share_arrays({
+        "X_train": X_train, "y_train": y_train, "X_test": X_test, "y_test": y_test
+    })
+
+    trials = []
+    rung_results = {}  # rung index -> list of (accuracy, trial id)
+    promoted = set()   # (rung index, trial id)
+    promotions = {}    # rung index -> trials promoted out of it
+    pending = {}
+    start = time.perf_counter()
+
+    def submit(pool, trial_id: int):
+        trial = trials[trial_id]
+        rung = trial["rung"]
+        budgets = trial["budgets"]
+        iterations = budgets[rung] - (budgets[rung - 1] if rung else 0)
+        future = pool.submit(_run_rung, trial["learning_rate"], iterations, trial["coef"], trial["intercept"])
+        pending[future] = trial_id
+
+    def next_promotion():
+        for rung in sorted(rung_results, reverse=True):
+            # At most floor(n / eta) promotions per rung; ties go to the earlier trial
+            quota = len(rung_results[rung]) // eta
+            if promotions.get(rung, 0) >= quota:
+                continue
+            results = sorted(rung_results[rung], key=lambda result: (-result[0], result[1]))
+            for _, trial_id in results[:quota]:
+                trial = trials[trial_id]
+                if (rung, trial_id) not in promoted and rung + 1 < len(trial["budgets"]):
+                    promoted.add((rung, trial_id))
+                    promotions[rung] = promotions.get(rung, 0) + 1
+                    return trial_id
+        return None
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(specs,)) as pool:
+            while True:
+                # Fill free workers: promotions first, then fresh trials
+                while len(pending) < workers:
+                    trial_id = next_promotion()
+                    if trial_id is not None:
+                        trials[trial_id]["rung"] += 1
+                    elif len(trials) < max_trial_count:
+                        trial = sample_trial(rng, learning_rate_range, max_iter_range)
+                        trial.update({
+                            "trial_id": len(trials),
+                            "budgets": rung_budgets(trial["max_iter"], min_iter, eta),
+                            "rung": 0,
+                            "coef": None,
+                            "intercept": None,
+                            "accuracy": None,
+                            "iterations_run": 0,
+                        })
+                        trials.append(trial)
+                        trial_id = trial["trial_id"]
+                    else:
+                        break
+                    submit(pool, trial_id)
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    trial_id = pending.pop(future)
+                    trial = trials[trial_id]
+                    accuracy, trial["coef"], trial["intercept"] = future.result()
+                    trial["accuracy"] = accuracy
+                    trial["iterations_run"] = trial["budgets"][trial["rung"]]
+                    rung_results.setdefault(trial["rung"], []).append((accuracy, trial_id))
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+
+    elapsed = time.perf_counter() - start
+    # Accuracies from different budgets are not comparable: pick among the trials that
+    # reached the highest rung, breaking ties toward earlier trials as promotion does
+    top_rung = max(t["rung"] for t in trials)
+    best = max((t for t in trials if t["rung"] == top_rung), key=lambda t: (t["accuracy"], -t["trial_id"]))
+    completed = sum(1 for t in trials if t["rung"] == len(t["budgets"]) - 1)
+    return {
+        "best_trial": {
+            "trial_id": best["trial_id"],
+            "parameters": {"learning_rate": best["learning_rate"], "max_iter": best["max_iter"]},
+            "iterations_run": best["iterations_run"],
+            "accuracy": best["accuracy"],
+        },
+        "trials": [
+            {
+                "trial_id": t["trial_id"],
+                "parameters": {"learning_rate": t["learning_rate"], "max_iter": t["max_iter"]},
+                "accuracy": t["accuracy"],
+                "iterations_run": t["iterations_run"],
+                "rung": t["rung"],
+                "stopped_early": t["rung"] < len(t["budgets"]) - 1,
+            }
+            for t in trials
+        ],
+        "rungs": [
+            {"rung": rung, "results": len(rung_results[rung]), "promoted": promotions.get(rung, 0)}
+            for rung in sorted(rung_results)
+        ],
+        "trial_count": len(trials),
+        "completed_trial_count": completed,
+        "workers": workers,
+        "elapsed_s": elapsed,
+        "trials_per_second": len(trials) / elapsed if elapsed else float("inf"),
+    }
@@ -0,0 +1,290 @@
+# mlops.py
+# Single entry point for the Iris MLOps scripts. Heavy SDKs (kfp, google.cloud.aiplatform,
+# sklearn, pyarrow) are imported inside the subcommand that needs them, so status and
+# predict start without paying for them.
+import argparse
+import builtins
+import importlib
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+class StartupProfiler:
+    """Times imports per top-level package (excluding nested imports of other packages) and named phases"""
+
+    def __init__(self):
+        self.imports = {}
+        self.phases = {}
+        self._stack = []
+        self._original_import = None
+        self._start = time.perf_counter()
+
+    def install(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        # Each frame accumulates time spent in nested imports so it can be subtracted
+        frame = [0.0]
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][0] += elapsed
+            package = name.split(".")[0]
+            self.imports[package] = self.imports.get(package, 0.0) + elapsed - frame[0]
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def report(self, top: int = 15) -> str:
+        total = time.perf_counter() - self._start
+        lines = [f"Startup profile ({total * 1e3:.1f} ms since interpreter reached mlops.py)"]
+        lines.append("  imports (self time per package):")
+        for name, seconds in sorted(self.imports.items(), key=lambda item: -item[1])[:top]:
+            lines.append(f"    {name:<30} {seconds * 1e3:>9.1f} ms")
+        if self.phases:
+            lines.append("  phases:")
+            for name, seconds in self.phases.items():
+                lines.append(f"    {name:<30} {seconds * 1e3:>9.1f} ms")
+        return "\n".join(lines)
+
+
+class _NullProfiler:
+    @contextmanager
+    def phase(self, name: str):
+        yield
+
+
+def _load_script(name: str):
+    """Import one of the numbered scripts (e.g. 11_model_deployment) as a module"""
+    return importlib.import_module(name)
+
+
+def cmd_compile(args, profiler):
+    from local_mlops.pipeline_compile import compile_pipeline
+
+    params = json.loads(args.params) if args.params else None
+    with profiler.phase("compile"):
+        result = compile_pipeline(package_path=args.output, params=params)
+    state = "cache hit" if result["cache_hit"] else "compiled"
+    print(f"{result['package_path']}: {state} (key {result['cache_key'][:12]})")
+
+
+def cmd_deploy(args, profiler):
+    with profiler.phase("import 11_model_deployment"):
+        deployment = _load_script("11_model_deployment")
+    with profiler.phase("deploy"):
+        job = deployment.deploy_complete_pipeline()
+    print(f"Submitted pipeline job: {job.resource_name}")
+
+
+def cmd_status(args, profiler):
+    from local_mlops.pipeline_compile import CACHE_DIR, pipeline_cache_key
+    from local_mlops.registry_index import RegistryIndex
+
+    registry_root = os.getenv("REGISTRY_INDEX_ROOT", os.path.expanduser("~/.iris_registry"))
+    print(f"Registry index: {registry_root}")
+    if os.path.exists(os.path.join(registry_root, "index.json")):
+        index = RegistryIndex(registry_root)
+        for model_id, model in index.index["models"].items():
+            aliases = ", ".join(f"{alias}->v{version_id}" for alias, version_id in index.aliases(model_id).items())
+            print(f"  {model_id}: {len(model['versions'])} versions  {aliases or '(no aliases)'}")
+    else:
+        print("  (empty)")
+
+    key = pipeline_cache_key()
+    specs = sorted(os.listdir(CACHE_DIR)) if os.path.isdir(CACHE_DIR) else []
+    current = "cached" if f"{key}.json" in specs else "needs compile"
+    print(f"Pipeline specs: {CACHE_DIR} ({len(specs)} cached, current source {current})")
+
+    if args.cache_dir:
+        from local_mlops.step_cache import StepCache
+
+        stats = StepCache(args.cache_dir).stats()
+        print(f"Step cache: {args.cache_dir} ({stats['entries']} entries, {stats['bytes'] / 1e6:.1f} MB, "
+              f"hit rate {stats['hit_rate']:.1%})")
+
+
+def cmd_predict(args, profiler):
+    instances = json.loads(args.instances)
+    with profiler.phase("load model"):
+        if args.model.endswith(".npz"):
+            from local_mlops.kernel import NumpyPredictor
+
+            predictor = NumpyPredictor(args.model)
+            predictions = predictor.predict(instances).tolist()
+        else:
+            import joblib
+
+            artifacts = joblib.load(args.model)
+            transform = artifacts.get("transform")
+            if transform is not None:
+                # Category values arrive as strings; the fitted transform encodes them
+                instances = transform.transform_instances(instances)
+            encoded = artifacts["model"].predict(instances)
+            predictions = artifacts["label_encoder"].inverse_transform(encoded).tolist()
+    print(json.dumps({"predictions": predictions}))
+
+
+def cmd_serve(args, profiler):
+    from local_mlops.server import serve
+
+    serve(args.model, args.host, args.port, args.max_batch_size, args.max_wait_us,
+          args.log_dir, args.log_sample_rate, args.log_reservoir_size)
+
+
+def cmd_batch_predict(args, profiler):
+    from local_mlops.batch_predict import batch_predict
+
+    with profiler.phase("batch_predict"):
+        result = batch_predict(args.input, args.model, args.output_dir, args.chunk_rows, args.workers,
+                               restart=args.restart)
+    print(json.dumps(result, indent=2))
+
+
+def cmd_tune(args, profiler):
+    tuning = _load_script("6_hyperparameter_tuning")
+    with profiler.phase("tune"):
+        tuning.run_local_hyperparameter_tuning(args.dataset, args.max_trial_count, args.parallel_trial_count)
+
+
+def cmd_capacity(args, profiler):
+    from local_mlops.capacity import build_capacity_plan, format_plan
+
+    with profiler.phase("capacity"):
+        plan = build_capacity_plan(
+            args.model, args.target_qps, args.p99_slo_ms, args.explain_qps, args.explain_p99_slo_ms,
+            args.batch_size, duration_s=args.duration
+        )
+    with open(args.output, "w") as f:
+        json.dump(plan, f, indent=2)
+    print(format_plan(plan))
+    print(f"Wrote {args.output} (used by deploy via CAPACITY_PLAN)")
+
+
+def cmd_run_local(args, profiler):
+    from local_mlops.local_runner import LocalPipelineRunner
+
+    arguments = {}
+    for item in args.param:
+        key, _, value = item.partition("=")
+        try:
+            arguments[key] = json.loads(value)
+        except ValueError:
+            arguments[key] = value
+    with profiler.phase("run_local"):
+        run = LocalPipelineRunner(workers=args.workers, mode=args.mode).run(arguments)
+    with run:
+        print(run.format_timeline())
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Iris MLOps command line")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report per-module import time and phase timings on stderr")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compile_parser = commands.add_parser("compile", help="Compile iris_training_pipeline (cached)")
+    compile_parser.add_argument("--output", default="iris_pipeline.json")
+    compile_parser.add_argument("--params", help="JSON object of pipeline parameter defaults")
+    compile_parser.set_defaults(func=cmd_compile)
+
+    deploy_parser = commands.add_parser("deploy", help="Compile (cached) and submit the pipeline job")
+    deploy_parser.set_defaults(func=cmd_deploy)
+
+    status_parser = commands.add_parser("status", help="Registry aliases and local caches")
+    status_parser.add_argument("--cache-dir", default=os.getenv("STEP_CACHE_DIR", ""),
+                               help="Step cache directory to summarize")
+    status_parser.set_defaults(func=cmd_status)
+
+    predict_parser = commands.add_parser("predict", help="Predict with a .npz kernel or joblib artifact")
+    predict_parser.add_argument("model")
+    predict_parser.add_argument("instances", help="JSON list of feature rows")
+    predict_parser.set_defaults(func=cmd_predict)
+
+    serve_parser = commands.add_parser("serve", help="Run the micro-batching prediction server")
+    serve_parser.add_argument("model")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8080)
+    serve_parser.add_argument("--max-batch-size", type=int, default=64)
+    serve_parser.add_argument("--max-wait-us", type=int, default=500)
+    serve_parser.add_argument("--log-dir", default="", help="Write sampled predictions here (Arrow IPC files)")
+    serve_parser.add_argument("--log-sample-rate", type=float, default=0.1)
+    serve_parser.add_argument("--log-reservoir-size", type=int, default=0,
+                              help="Log a uniform sample of at most this many rows per second instead")
+    serve_parser.set_defaults(func=cmd_serve)
+
+    batch_parser = commands.add_parser("batch-predict", help="Sharded, resumable batch prediction")
+    batch_parser.add_argument("input")
+    batch_parser.add_argument("model")
+    batch_parser.add_argument("output_dir")
+    batch_parser.add_argument("--chunk-rows", type=int, default=100_000)
+    batch_parser.add_argument("--workers", type=int, default=0)
+    batch_parser.add_argument("--restart", action="store_true", help="Discard parts left by a different run")
+    batch_parser.set_defaults(func=cmd_batch_predict)
+
+    tune_parser = commands.add_parser("tune", help="Local ASHA hyperparameter search")
+    tune_parser.add_argument("--dataset")
+    tune_parser.add_argument("--max-trial-count", type=int, default=20)
+    tune_parser.add_argument("--parallel-trial-count", type=int, default=0)
+    tune_parser.set_defaults(func=cmd_tune)
+
+    capacity_parser = commands.add_parser("capacity", help="Benchmark an artifact and size the endpoints")
+    capacity_parser.add_argument("model")
+    capacity_parser.add_argument("--target-qps", type=float, required=True)
+    capacity_parser.add_argument("--p99-slo-ms", type=float, required=True)
+    capacity_parser.add_argument("--batch-size", type=int, default=1, help="Instances per request")
+    capacity_parser.add_argument("--explain-qps", type=float, default=0.0)
+    capacity_parser.add_argument("--explain-p99-slo-ms", type=float)
+    capacity_parser.add_argument("--duration", type=float, default=3.0, help="Seconds per load point")
+    capacity_parser.add_argument("--output", default=os.getenv("CAPACITY_PLAN", "capacity_plan.json"))
+    capacity_parser.set_defaults(func=cmd_capacity)
+
+    run_local_parser = commands.add_parser("run-local", help="Run the pipeline's components locally, in parallel")
+    run_local_parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUE")
+    run_local_parser.add_argument("--mode", choices=("thread", "process"), default="thread")
+    run_local_parser.add_argument("--workers", type=int, default=0)
+    run_local_parser.set_defaults(func=cmd_run_local)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    profiler = StartupProfiler() if args.profile_startup else _NullProfiler()
+    if args.profile_startup:
+        profiler.install()
+    try:
+        args.func(args, profiler)
+    finally:
+        if args.profile_startup:
+            profiler.uninstall()
+            print(profiler.report(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
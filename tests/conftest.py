@@ -0,0 +1,6 @@
+# conftest.py
+# Makes local_mlops and the numbered scripts importable when running `python -m pytest tests`.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
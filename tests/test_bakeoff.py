@@ -0,0 +1,15 @@
+# test_bakeoff.py
+from local_mlops.bakeoff import _clearly_losing
+
+
+def test_identical_fold_gaps_do_not_cancel_on_two_folds():
+    # One row's worth of difference on both folds: the sample std is 0
+    leader = {0: 0.96, 1: 0.96}
+    challenger = {0: 0.94, 1: 0.94}
+    assert not _clearly_losing(challenger, leader, min_folds=2, z=2.0, fold_rows=50)
+
+
+def test_large_consistent_gap_still_cancels():
+    leader = {0: 0.96, 1: 0.98, 2: 0.96}
+    challenger = {0: 0.50, 1: 0.52, 2: 0.48}
+    assert _clearly_losing(challenger, leader, min_folds=2, z=2.0, fold_rows=50)
@@ -0,0 +1,114 @@
+# test_batch_predict.py
+import json
+import os
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+
+from local_mlops.batch_predict import batch_predict, iter_chunks, merge_parts
+
+FEATURE_NAMES = ["sepal_length", "sepal_width", "petal_length", "petal_width"]
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    species = np.array(["Iris-setosa", "Iris-versicolor", "Iris-virginica"])[np.arange(300) % 3]
+    label_encoder = LabelEncoder().fit(species)
+    model_path = tmp_path / "model.joblib"
+    joblib.dump({"model": LogisticRegression().fit(X, label_encoder.transform(species)),
+                 "label_encoder": label_encoder, "feature_names": FEATURE_NAMES}, model_path)
+    input_path = tmp_path / "input.csv"
+    input_path.write_text(",".join(FEATURE_NAMES) + "\n" + "\n".join(",".join(map(str, row)) for row in X))
+    return str(input_path), str(model_path), str(tmp_path / "out")
+
+
+def test_resume_requires_matching_manifest(inputs):
+    input_path, model_path, output_dir = inputs
+    first = batch_predict(input_path, model_path, output_dir, chunk_rows=100, workers=1)
+    assert first["rows_scored"] == 300
+
+    resumed = batch_predict(input_path, model_path, output_dir, chunk_rows=100, workers=1)
+    assert resumed["rows_skipped"] == 300 and resumed["rows_scored"] == 0
+
+    with pytest.raises(ValueError, match="chunk_rows"):
+        batch_predict(input_path, model_path, output_dir, chunk_rows=50, workers=1)
+
+    restarted = batch_predict(input_path, model_path, output_dir, chunk_rows=50, workers=1, restart=True)
+    assert restarted["rows_scored"] == 300 and restarted["shards_resumed"] == 0
+
+
+def _write_inputs(tmp_path, X):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    csv_path = tmp_path / "input.csv"
+    csv_path.write_text(",".join(FEATURE_NAMES) + "\n" + "\n".join(",".join(map(str, row)) for row in X))
+    # Lines of 1-7 instances, so chunks start in the middle of lines
+    jsonl_path = tmp_path / "input.jsonl"
+    with open(jsonl_path, "w") as f:
+        i = 0
+        while i < len(X):
+            step = i % 7 + 1
+            f.write(json.dumps({"instances": X[i:i + step].tolist()}) + "\n")
+            i += step
+    parquet_path = tmp_path / "input.parquet"
+    pq.write_table(pa.table({name: X[:, j] for j, name in enumerate(FEATURE_NAMES)}), parquet_path,
+                   row_group_size=37)
+    return [str(csv_path), str(jsonl_path), str(parquet_path)]
+
+
+def test_iter_chunks_resumes_at_recorded_positions(tmp_path):
+    X = np.random.default_rng(1).normal(size=(250, 4)).astype(np.float32)
+    for path in _write_inputs(tmp_path, X):
+        chunks = list(iter_chunks(path, 40, FEATURE_NAMES))
+        np.testing.assert_allclose(np.concatenate([c for _, c in chunks]), X, rtol=1e-6)
+        for k, (position, _) in enumerate(chunks):
+            resumed = list(iter_chunks(path, 40, FEATURE_NAMES, start=json.loads(json.dumps(position))))
+            assert len(resumed) == len(chunks) - k, path
+            for (_, expected), (_, got) in zip(chunks[k:], resumed):
+                np.testing.assert_array_equal(got, expected)
+
+
+def test_resume_scores_only_missing_shards(inputs, tmp_path):
+    input_path, model_path, output_dir = inputs
+    batch_predict(input_path, model_path, output_dir, chunk_rows=40, workers=1)
+    merge_parts(output_dir, str(tmp_path / "full.csv"))
+    for shard in (4, 6):
+        os.remove(os.path.join(output_dir, f"part-{shard:06d}.csv"))
+
+    resumed = batch_predict(input_path, model_path, output_dir, chunk_rows=40, workers=1)
+    assert resumed["rows_scored"] == 80 and resumed["rows_skipped"] == 220
+    merge_parts(output_dir, str(tmp_path / "resumed.csv"))
+    assert (tmp_path / "resumed.csv").read_text() == (tmp_path / "full.csv").read_text()
+
+
+def test_columns_and_transform_come_from_the_artifact(tmp_path):
+    import pyarrow as pa
+
+    from local_mlops.preprocessing import TabularTransform
+
+    rng = np.random.default_rng(0)
+    colors = np.array(["red", "green", "blue"])[np.arange(90) % 3]
+    width = rng.normal(size=90).astype(np.float32)
+    species = np.array(["a", "b", "c"])[np.arange(90) % 3]
+    schema = {"features": [{"name": "width", "dtype": "float32"}, {"name": "color", "dtype": "category"}],
+              "target": {"name": "species"}}
+    table = pa.table({"width": width, "color": colors, "species": species})
+    transform = TabularTransform(schema).fit(table)
+    model = LogisticRegression().fit(transform.transform(table), transform.encode_target(table))
+    model_path = tmp_path / "model.joblib"
+    joblib.dump({"model": model, "label_encoder": transform.label_encoder(), "feature_names": ["width", "color"],
+                 "transform": transform}, model_path)
+    # Extra columns, in another order than the features
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("id,color,width\n" + "\n".join(f"{i},{c},{w}" for i, (c, w) in enumerate(zip(colors, width))))
+
+    batch_predict(str(input_path), str(model_path), str(tmp_path / "out"), chunk_rows=32, workers=1)
+    merge_parts(str(tmp_path / "out"), str(tmp_path / "merged.csv"))
+    predictions = [line.split(",")[1] for line in (tmp_path / "merged.csv").read_text().splitlines()[1:]]
+    assert predictions == list(species)
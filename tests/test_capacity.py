@@ -0,0 +1,59 @@
+# test_capacity.py
+import pytest
+
+from local_mlops.capacity import DEFAULT_DEPLOYMENT, deployment_config, plan_capacity
+
+MACHINE_TYPES = {
+    "small": {"vcpus": 2, "memory_gb": 8, "hourly_usd": 0.10},
+    "large": {"vcpus": 8, "memory_gb": 32, "hourly_usd": 0.45},
+}
+
+
+def _point(batch_size: int, concurrency: int, per_core_rps: float, p99_ms: float, error_rate: float = 0.0) -> dict:
+    return {"kind": "predict", "batch_size": batch_size, "concurrency": concurrency, "throughput_rps": per_core_rps,
+            "p50_ms": p99_ms / 2, "p99_ms": p99_ms, "error_rate": error_rate, "per_core_rps": per_core_rps}
+
+
+POINTS = [
+    _point(1, 1, 500, 2.0),
+    _point(1, 4, 1000, 8.0),
+    # Fastest, but misses a 10 ms SLO
+    _point(1, 8, 1200, 20.0),
+    # Errors disqualify a point whatever its throughput
+    _point(1, 16, 5000, 1.0, error_rate=0.1),
+    _point(8, 4, 3000, 9.0),
+]
+
+
+def test_best_point_within_the_slo_sizes_the_replicas():
+    plan = plan_capacity(POINTS, target_qps=1000, p99_slo_ms=10, target_utilization=0.5, peak_factor=3,
+                         machine_types=MACHINE_TYPES)
+    assert plan["operating_point"]["concurrency"] == 4 and plan["batch_size"] == 1
+    assert plan["planned_per_core_rps"] == 500
+    # small: 1000 req/s per replica -> 1 replica, 3 at peak; cheaper than one large replica
+    assert plan["machine_type"] == "small"
+    assert (plan["min_replica_count"], plan["max_replica_count"]) == (1, 3)
+
+
+def test_closest_measured_batch_size_is_used():
+    plan = plan_capacity(POINTS, target_qps=100, p99_slo_ms=10, batch_size=6, machine_types=MACHINE_TYPES)
+    assert plan["batch_size"] == 8 and plan["operating_point"]["per_core_rps"] == 3000
+
+
+def test_min_replicas_is_a_floor():
+    plan = plan_capacity(POINTS, target_qps=10, p99_slo_ms=10, min_replicas=2, machine_types=MACHINE_TYPES)
+    assert plan["min_replica_count"] == plan["max_replica_count"] == 2
+
+
+def test_unreachable_slo_raises():
+    with pytest.raises(ValueError, match="best p99 2.00 ms"):
+        plan_capacity(POINTS, target_qps=100, p99_slo_ms=1, machine_types=MACHINE_TYPES)
+
+
+def test_defaults_without_a_plan_keep_previous_replica_counts():
+    assert deployment_config(None) == DEFAULT_DEPLOYMENT
+    explanation = deployment_config(None, "explanation")
+    assert (explanation["min_replica_count"], explanation["max_replica_count"]) == (1, 1)
+    plan = {"deployment": {"machine_type": "large", "min_replica_count": 2, "max_replica_count": 5, "extra": 1}}
+    assert deployment_config(plan) == {"machine_type": "large", "min_replica_count": 2, "max_replica_count": 5}
+    assert deployment_config(plan, "explanation")["max_replica_count"] == 1
@@ -0,0 +1,76 @@
+# test_data_stats.py
+import numpy as np
+import pytest
+
+from local_mlops.data_stats import NumericStats, QuantileSketch
+from local_mlops.datasource import load_iris_frame
+
+
+def test_quantiles_stay_within_observed_range():
+    for column in ("sepal_length", "sepal_width", "petal_length", "petal_width"):
+        stats = NumericStats()
+        stats.update(load_iris_frame()[column].to_numpy(dtype=np.float32))
+        summary = stats.summary()
+        for name in ("p01", "p25", "p50", "p75", "p99"):
+            assert summary["min"] <= summary[name] <= summary["max"], (column, name)
+
+
+def test_sketch_relative_error_and_merge():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(size=200_000)
+    halves = QuantileSketch(), QuantileSketch()
+    halves[0].update(values[:100_000])
+    halves[1].update(values[100_000:])
+    merged = halves[0].merge(halves[1])
+    for q, estimate in zip((0.1, 0.5, 0.9, 0.99), merged.quantiles([0.1, 0.5, 0.9, 0.99])):
+        exact = np.quantile(values, q)
+        assert abs(estimate - exact) <= 0.011 * exact
+
+
+def _write_iris(path, frame, batch_rows: int = 64):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=batch_rows):
+            writer.write_batch(batch)
+    return str(path)
+
+
+def _config():
+    from local_mlops.preprocessing import load_schema
+
+    return load_schema("iris")
+
+
+def test_stats_cache_scans_only_appended_rows(tmp_path):
+    import pandas as pd
+
+    from local_mlops.data_stats import StatsCache, compute_stats
+
+    frame = load_iris_frame()
+    cache = StatsCache(str(tmp_path / "cache"), block_rows=32)
+    first = _write_iris(tmp_path / "first.arrow", frame.iloc[:100])
+    assert cache.stats("iris", first, _config())[1] == 100
+    # Batched differently from the cached file, as a new load_data run may write it
+    grown = _write_iris(tmp_path / "grown.arrow", pd.concat([frame.iloc[:100], frame.iloc[100:]]), batch_rows=50)
+    stats, scanned = cache.stats("iris", grown, _config())
+    assert scanned == 50
+    full = compute_stats(grown, _config())
+    assert stats.rows == full.rows == 150
+    assert stats.columns["petal_width"].mean == pytest.approx(full.columns["petal_width"].mean)
+    assert cache.stats("iris", grown, _config())[1] == 0
+
+
+def test_stats_cache_rescans_when_a_middle_row_changes(tmp_path):
+    from local_mlops.data_stats import StatsCache
+
+    frame = load_iris_frame()
+    # Row 75 is far from both ends of the cached prefix, so only a full fingerprint sees the edit
+    cache = StatsCache(str(tmp_path / "cache"), block_rows=16)
+    cache.stats("iris", _write_iris(tmp_path / "first.arrow", frame), _config())
+    edited = frame.copy()
+    edited.loc[75, "sepal_length"] += 1.0
+    stats, scanned = cache.stats("iris", _write_iris(tmp_path / "edited.arrow", edited), _config())
+    assert scanned == 150
+    assert stats.columns["sepal_length"].max == pytest.approx(float(edited["sepal_length"].astype(np.float32).max()))
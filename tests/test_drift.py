@@ -0,0 +1,21 @@
+# test_drift.py
+import numpy as np
+
+from local_mlops.drift import DriftEngine, HistogramSketch
+
+FEATURES = ["a", "b"]
+
+
+def test_results_are_bounded():
+    rng = np.random.default_rng(0)
+    baseline = HistogramSketch.from_baseline(FEATURES, rng.normal(size=(1000, 2)))
+    thresholds = {name: 0.1 for name in FEATURES}
+    engine = DriftEngine(baseline, thresholds, thresholds, window_size=100, slots=4, max_results=5)
+
+    completed = []
+    for _ in range(20):
+        completed.extend(engine.update(rng.normal(size=(100, 2))))
+
+    assert engine.windows_evaluated == len(completed) > 5
+    assert len(engine.results) == 5
+    assert list(engine.results) == completed[-5:]
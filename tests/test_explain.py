@@ -0,0 +1,44 @@
+# test_explain.py
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+from local_mlops.explain import explain
+
+FEATURE_NAMES = ["sepal_length", "sepal_width", "petal_length", "petal_width"]
+
+
+def _artifacts(clf):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(150, 4))
+    y = np.arange(150) % 3
+    X[:, 2] += y
+    clf.fit(X, y)
+    return {"model": clf, "feature_names": FEATURE_NAMES, "feature_means": X.mean(axis=0)}, X[:5]
+
+
+def _check_efficiency(explanations, tolerance):
+    for explanation in explanations:
+        for attribution in explanation["attributions"]:
+            total = sum(attribution["featureAttributions"].values())
+            delta = attribution["instanceOutputValue"] - attribution["baselineOutputValue"]
+            assert abs(total - delta) < tolerance
+
+
+def test_exact_path_reports_decision_function_outputs():
+    artifacts, X = _artifacts(LogisticRegression())
+    _, explanations = explain(artifacts, X)
+    assert {e["outputSpace"] for e in explanations} == {"decision_function"}
+    _check_efficiency(explanations, 1e-9)
+    expected = artifacts["model"].decision_function(X)
+    got = [[a["instanceOutputValue"] for a in e["attributions"]] for e in explanations]
+    np.testing.assert_allclose(got, expected)
+
+
+def test_sampled_path_reports_probability_outputs():
+    artifacts, X = _artifacts(RandomForestClassifier(n_estimators=10, random_state=0))
+    _, explanations = explain(artifacts, X)
+    assert {e["outputSpace"] for e in explanations} == {"probability"}
+    _check_efficiency(explanations, 1e-9)
+    got = [[a["instanceOutputValue"] for a in e["attributions"]] for e in explanations]
+    np.testing.assert_allclose(got, artifacts["model"].predict_proba(X))
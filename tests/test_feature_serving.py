@@ -0,0 +1,69 @@
+# test_feature_serving.py
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from local_mlops.feature_serving import DictBackend, FeatureServingClient, SharedMemoryTier
+
+FEATURES = ["a", "b", "c", "d"]
+
+
+def _writer(name, lock, value, count):
+    tier = SharedMemoryTier(len(FEATURES), slots=1, name=name, lock=lock)
+    row = np.full(len(FEATURES), float(value))
+    for i in range(count):
+        tier.put("entity", row, float(i))
+    tier.shm.close()
+
+
+def test_attaching_requires_the_creators_lock():
+    tier = SharedMemoryTier(len(FEATURES), slots=8)
+    try:
+        assert tier.lock is not None
+        with pytest.raises(ValueError):
+            SharedMemoryTier(len(FEATURES), slots=8, name=tier.name)
+    finally:
+        tier.close()
+
+
+def test_concurrent_writers_never_show_torn_rows():
+    tier = SharedMemoryTier(len(FEATURES), slots=1)
+    try:
+        writers = [multiprocessing.Process(target=_writer, args=(tier.name, tier.lock, v, 20_000)) for v in (1, 2)]
+        for w in writers:
+            w.start()
+        reads = 0
+        while any(w.is_alive() for w in writers):
+            values = tier.get("entity", ttl_s=float("inf"), now=0.0)
+            if values is not None:
+                reads += 1
+                assert len(set(values.tolist())) == 1
+        for w in writers:
+            w.join()
+            assert w.exitcode == 0
+        assert tier.get("entity", ttl_s=float("inf"), now=0.0).tolist() in ([1.0] * 4, [2.0] * 4)
+    finally:
+        tier.close()
+
+
+def test_hit_ratios_per_tier():
+    backend = DictBackend({f"e{i}": np.full(len(FEATURES), float(i)) for i in range(10)})
+    tier = SharedMemoryTier(len(FEATURES), slots=1024)
+    try:
+        first = FeatureServingClient(backend, FEATURES, shared_tier=tier)
+        second = FeatureServingClient(backend, FEATURES, shared_tier=tier)
+        ids = [f"e{i}" for i in range(10)] + ["unknown"]
+
+        out = first.read(ids)
+        np.testing.assert_array_equal(out[:10, 0], np.arange(10))
+        assert np.isnan(out[10]).all()
+        first.read(ids[:10])
+        second.read(ids[:10])
+
+        assert first.stats()["local_hit_ratio"] == pytest.approx(10 / 21)
+        assert second.stats()["shared_hit_ratio"] == 1.0
+        assert backend.calls == 1
+        assert first.stats()["p99_ms"] is not None
+    finally:
+        tier.close()
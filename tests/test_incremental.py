@@ -0,0 +1,47 @@
+# test_incremental.py
+import os
+
+import pytest
+
+from local_mlops.datasource import append_local_iris_rows, create_local_iris_table, iter_synthetic_iris
+from local_mlops.incremental import IncrementalTrainer
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "iris.db")
+    create_local_iris_table(path, feature_timestamp="2024-01-01 00:00:00")
+    return path
+
+
+def test_rows_committed_later_at_the_watermark_are_loaded_once(db_path, tmp_path):
+    trainer = IncrementalTrainer(str(tmp_path / "state"), "sqlite", db_path)
+    first = trainer.run()
+    assert first["delta_rows"] == 150 and first["mode"] == "incremental"
+
+    # Same timestamp as the watermark, committed after the first load
+    append_local_iris_rows(db_path, iter_synthetic_iris(40, seed=1), feature_timestamp="2024-01-01 00:00:00")
+    second = trainer.run()
+    assert second["delta_rows"] == 40 and trainer.state["rows"] == 190
+    assert trainer.run()["mode"] == "noop"
+
+    append_local_iris_rows(db_path, iter_synthetic_iris(25, seed=2), feature_timestamp="2024-01-02 00:00:00")
+    assert trainer.run()["delta_rows"] == 25
+    append_local_iris_rows(db_path, iter_synthetic_iris(5, seed=3), feature_timestamp="2024-01-02 00:00:00")
+    assert trainer.run()["delta_rows"] == 5
+    X, species = trainer.read_snapshot()
+    assert len(X) == len(species) == 220
+
+
+def test_incremental_training_fits_the_delta_plus_replayed_rows(db_path, tmp_path):
+    trainer = IncrementalTrainer(str(tmp_path / "state"), "sqlite", db_path, replay_rows=50)
+    assert trainer.run()["samples_count"] == 150
+
+    append_local_iris_rows(db_path, iter_synthetic_iris(30, seed=1), feature_timestamp="2024-01-02 00:00:00")
+    metrics = trainer.run()
+    assert metrics["warm_started"]
+    assert metrics["samples_count"] == 30 + 50 and metrics["snapshot_rows"] == 180
+
+    full = trainer.run(full=True)
+    assert not full["warm_started"] and full["samples_count"] == 180
+    assert not [n for n in os.listdir(tmp_path / "state") if n.startswith("boundary-000000")]
@@ -0,0 +1,50 @@
+# test_ingestion.py
+import numpy as np
+import pandas as pd
+
+from local_mlops.ingestion import ChunkedIngestor, LocalIngestionBackend, VertexIngestionBackend
+
+
+def _frame(rows: int = 1000, features: int = 25) -> tuple:
+    df = pd.DataFrame(np.arange(rows * features, dtype=np.float64).reshape(rows, features),
+                      columns=[f"f{i}" for i in range(features)])
+    df["patient_id"] = [f"patient_{i}" for i in range(rows)]
+    return df, [f"f{i}" for i in range(features)]
+
+
+class _EntityType:
+    def __init__(self):
+        self.calls = []
+
+    def ingest_from_df(self, feature_ids, feature_time, df_source, entity_id_field):
+        self.calls.append((list(feature_ids), len(df_source)))
+
+
+def test_vertex_backend_bounds_ingestion_jobs():
+    df, features = _frame()
+    entity_type = _EntityType()
+    metrics = ChunkedIngestor(VertexIngestionBackend(entity_type)).ingest(
+        df, "patient_id", features, columns_per_chunk=10, rows_per_chunk=100
+    )
+    assert entity_type.calls == [(features, 1000)]
+    assert metrics["chunks"] == 1 and metrics["cells"] == 1000 * 25
+
+    entity_type = _EntityType()
+    ChunkedIngestor(VertexIngestionBackend(entity_type, max_jobs=3)).ingest(df, "patient_id", features)
+    assert len(entity_type.calls) == 3
+    assert sum(rows for _, rows in entity_type.calls) == 1000
+    assert all(ids == features for ids, _ in entity_type.calls)
+
+
+def test_metrics_cover_one_run_and_retries_recover(tmp_path):
+    df, features = _frame()
+    backend = LocalIngestionBackend(str(tmp_path), fail_every=4)
+    ingestor = ChunkedIngestor(backend, max_in_flight=2, backoff_s=0.0)
+    first = ingestor.ingest(df, "patient_id", features, columns_per_chunk=10, rows_per_chunk=250)
+    second = ingestor.ingest(df, "patient_id", features, columns_per_chunk=10, rows_per_chunk=250)
+
+    assert first["chunks"] == second["chunks"] == 12
+    assert first["cells"] == second["cells"] == 1000 * 25
+    assert first["retries"] > 0 and first["failed_chunks"] == 0
+    assert len(backend.store) == 1000
+    assert backend.store["patient_7"]["f24"] == df.loc[7, "f24"]
@@ -0,0 +1,99 @@
+# test_kernel.py
+import importlib
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+
+from local_mlops.artifacts import LocalArtifact
+from local_mlops.kernel import KERNEL_ALIGNMENT, NumpyPredictor, map_kernel
+
+FEATURE_NAMES = ["sepal_length", "sepal_width", "petal_length", "petal_width"]
+
+
+def test_component_kernel_round_trips_through_map_kernel(tmp_path):
+    pipeline = importlib.import_module("5_training_pipeline")
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(90, 4)).astype(np.float32)
+    X[:, 2] += np.arange(90) % 3 * 3
+    species = np.array(["Iris-setosa", "Iris-versicolor", "Iris-virginica"])[np.arange(90) % 3]
+    label_encoder = LabelEncoder().fit(species)
+    clf = LogisticRegression(max_iter=500).fit(X, label_encoder.transform(species))
+    model = LocalArtifact(str(tmp_path / "model.joblib"))
+    joblib.dump({"model": clf, "label_encoder": label_encoder, "feature_names": FEATURE_NAMES}, model.path)
+
+    kernel = LocalArtifact(str(tmp_path / "kernel.npz"))
+    pipeline.export_model_kernel.python_func(model=model, kernel=kernel, profile=LocalArtifact(str(tmp_path / "p")))
+
+    arrays = map_kernel(kernel.path)
+    for name in ("coef", "intercept"):
+        # Mapped in place, not copied out as map_kernel does for unaligned members
+        assert not arrays[name].flags.owndata
+        assert arrays[name].__array_interface__["data"][0] % KERNEL_ALIGNMENT == 0
+    assert arrays["feature_names"].tolist() == FEATURE_NAMES
+    np.testing.assert_allclose(arrays["coef"], clf.coef_, rtol=1e-6)
+
+    predictor = NumpyPredictor(kernel.path, mmap=True)
+    np.testing.assert_allclose(predictor.predict_proba(X), clf.predict_proba(X), atol=1e-5)
+
+
+def test_sgd_classifier_exports_with_one_vs_rest_link(tmp_path):
+    from sklearn.linear_model import SGDClassifier
+
+    from local_mlops.kernel import export_kernel
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(90, 4)).astype(np.float32)
+    X[:, 2] += np.arange(90) % 3 * 3
+    label_encoder = LabelEncoder().fit(["a", "b", "c"])
+    clf = SGDClassifier(loss="log_loss", random_state=0).fit(X, np.arange(90) % 3)
+    joblib.dump({"model": clf, "label_encoder": label_encoder, "feature_names": FEATURE_NAMES},
+                tmp_path / "model.joblib")
+
+    export_kernel(str(tmp_path / "model.joblib"), str(tmp_path / "kernel.npz"))
+    predictor = NumpyPredictor(str(tmp_path / "kernel.npz"))
+    assert predictor.link == "ovr"
+    np.testing.assert_allclose(predictor.predict_proba(X), clf.predict_proba(X), atol=1e-4)
+
+
+def test_aligned_writer_and_mapping_match_np_load(tmp_path):
+    from local_mlops.kernel import save_kernel
+
+    rng = np.random.default_rng(0)
+    arrays = {
+        "format_version": np.int32(1),
+        "coef": rng.normal(size=(3, 5)).astype(np.float32),
+        "intercept": rng.normal(size=3).astype(np.float32),
+        # Odd sizes, so every following member starts at an unaligned offset unless padded
+        "classes": np.array(["a", "bb", "ccc"]),
+        "feature_names": np.array([f"f{i}" for i in range(5)]),
+        "link": np.str_("softmax"),
+        "fortran": np.asfortranarray(rng.normal(size=(7, 3))),
+    }
+    path = tmp_path / "kernel.npz"
+    with open(path, "wb") as f:
+        save_kernel(f, arrays)
+
+    mapped = map_kernel(str(path))
+    with np.load(path, allow_pickle=False) as loaded:
+        assert sorted(mapped) == sorted(loaded.files)
+        for name in loaded.files:
+            assert mapped[name].dtype == loaded[name].dtype
+            np.testing.assert_array_equal(mapped[name], loaded[name])
+    for name in ("coef", "intercept", "fortran"):
+        assert mapped[name].__array_interface__["data"][0] % KERNEL_ALIGNMENT == 0
+        assert not mapped[name].flags.writeable
+
+    # Fixed timestamps: the same arrays always give the same bytes
+    with open(tmp_path / "again.npz", "wb") as f:
+        save_kernel(f, arrays)
+    assert (tmp_path / "again.npz").read_bytes() == path.read_bytes()
+
+
+def test_plain_savez_files_still_map(tmp_path):
+    arrays = {"coef": np.arange(6, dtype=np.float32).reshape(2, 3), "classes": np.array(["x", "y"])}
+    np.savez(tmp_path / "plain.npz", **arrays)
+    mapped = map_kernel(str(tmp_path / "plain.npz"))
+    for name, array in arrays.items():
+        np.testing.assert_array_equal(mapped[name], array)
@@ -0,0 +1,33 @@
+# test_loadgen.py
+import time
+
+from local_mlops.loadgen import EndpointTarget, format_report, run_benchmark, run_closed_loop
+
+
+class _SlowTarget:
+    name = "slow"
+
+    def __call__(self, payload):
+        time.sleep(0.3)
+        return {"predictions": [0]}
+
+
+def test_throughput_uses_elapsed_time():
+    run = run_closed_loop(_SlowTarget(), [{"instances": [[0.0]]}], concurrency=1, duration_s=0.5, warmup_s=0.0)
+    # Two requests start inside the 0.5 s window; the second ends at ~0.6 s
+    assert run["requests"] == 2
+    assert run["elapsed_s"] >= 0.6
+    assert run["throughput_rps"] < 2 / 0.55
+
+
+def test_cpu_is_labelled_by_side():
+    class Endpoint:
+        def predict(self, instances):
+            return type("Response", (), {"predictions": [0] * len(instances)})()
+
+    report = run_benchmark(EndpointTarget(Endpoint()), [{"instances": [[0.0]]}], concurrency_levels=(1,),
+                           duration_s=0.2, warmup_s=0.0)
+    run = report["runs"][0]
+    assert run["client_cpu_ms_per_request"] is not None
+    assert run["target_cpu_ms_per_request"] is None
+    assert "client cpu" in format_report(report) and "target cpu" not in format_report(report)
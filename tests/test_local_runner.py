@@ -0,0 +1,65 @@
+# test_local_runner.py
+import json
+import os
+
+import pytest
+
+from local_mlops.datasource import create_local_iris_table
+from local_mlops.local_runner import LocalPipelineRunner, load_pipeline_dag, pipeline_defaults
+from local_mlops.pipeline_compile import compile_pipeline
+
+# Filled by the component overrides below, which run in the runner's process
+CALLS = {}
+
+
+def record_kernel_export(**kwargs):
+    CALLS["export_model_kernel"] = kwargs
+
+
+def fail_validation(**kwargs):
+    raise ValueError("bad data")
+
+
+@pytest.fixture
+def sqlite_arguments(tmp_path):
+    db_path = str(tmp_path / "iris.db")
+    create_local_iris_table(db_path)
+    return {"data_source": "sqlite", "data_source_uri": db_path}
+
+
+def test_dag_and_defaults_come_from_the_compiled_spec(tmp_path):
+    compile_pipeline(package_path=str(tmp_path / "pipeline.json"))
+    with open(tmp_path / "pipeline.json") as f:
+        spec = json.load(f)
+    dag = load_pipeline_dag(spec)
+    assert dag["load-data"]["depends_on"] == []
+    assert dag["train-model"]["depends_on"] == ["load-data", "validate-data"]
+    assert dag["deploy-model"]["function"] == "deploy_model"
+    assert "model" in dag["train-model"]["output_artifacts"]
+    defaults = pipeline_defaults(spec)
+    assert defaults["cv_folds"] == 5 and isinstance(defaults["cv_folds"], int)
+    assert isinstance(defaults["learning_rate"], float)
+
+
+def test_sqlite_run_trains_and_serves_locally(tmp_path, sqlite_arguments):
+    runner = LocalPipelineRunner(root=str(tmp_path / "runs"), workers=2, mode="thread",
+                                 overrides={"export_model_kernel": "test_local_runner:record_kernel_export"})
+    # An integer where the spec declares a double is coerced before the component is called
+    with runner.run(dict(sqlite_arguments, profile_sample_rate=0)) as run:
+        assert run.status == "succeeded"
+        assert {task["status"] for task in run.tasks.values()} == {"succeeded"}
+        assert run.endpoint().predict(instances=[[5.1, 3.5, 1.4, 0.2]]).predictions == ["Iris-setosa"]
+    assert isinstance(CALLS["export_model_kernel"]["profile_sample_rate"], float)
+    assert os.path.exists(CALLS["export_model_kernel"]["model"].path)
+
+
+def test_failed_step_skips_its_dependents(tmp_path, sqlite_arguments):
+    runner = LocalPipelineRunner(root=str(tmp_path / "runs"), mode="thread",
+                                 overrides={"validate_data": "test_local_runner:fail_validation"})
+    with pytest.raises(RuntimeError, match="validate-data failed"):
+        runner.run(sqlite_arguments, run_id="failing")
+    with open(tmp_path / "runs" / "failing" / "run.json") as f:
+        tasks = json.load(f)["tasks"]
+    assert tasks["load-data"]["status"] == "succeeded"
+    assert "bad data" in tasks["validate-data"]["error"]
+    assert {tasks[name]["status"] for name in ("train-model", "deploy-model", "export-model-kernel")} == {"skipped"}
@@ -0,0 +1,50 @@
+# test_prediction_cache.py
+import gc
+import subprocess
+import sys
+
+import numpy as np
+
+from local_mlops import prediction_cache
+from local_mlops.prediction_cache import PredictionCache, invalidate_caches, registry_version_fn
+from local_mlops.registry_index import RegistryIndex
+
+
+def _register_versions(root, tmp_path):
+    index = RegistryIndex(root)
+    for version in ("1", "2"):
+        artifact = tmp_path / f"model-{version}.bin"
+        artifact.write_bytes(version.encode())
+        index.register("iris", str(artifact), version_id=version)
+    index.set_aliases("iris", "1", add=["production"])
+
+
+def test_promotion_in_another_process_reaches_the_cache(tmp_path):
+    root = str(tmp_path / "registry")
+    _register_versions(root, tmp_path)
+    served = {"version": "1"}
+    cache = PredictionCache(lambda X: [served["version"]] * len(X), "1",
+                            version_fn=registry_version_fn(root, "iris"), version_check_s=0.0)
+    assert cache.predict([[5.1, 3.5, 1.4, 0.2]]) == ["1"]
+
+    served["version"] = "2"
+    subprocess.run([sys.executable, "-c", (
+        "from local_mlops.registry_index import RegistryIndex; "
+        f"RegistryIndex({root!r}).set_aliases('iris', '2', add=['production'])"
+    )], check=True, cwd=prediction_cache.__file__.rsplit("/local_mlops/", 1)[0])
+
+    assert cache.predict([[5.1, 3.5, 1.4, 0.2]]) == ["2"]
+    assert cache.model_version == "2" and cache.invalidations == 1
+
+
+def test_closed_and_dropped_caches_are_unregistered():
+    predict_fn = lambda X: np.zeros(len(X))
+    closed = PredictionCache(predict_fn, "1", model_id="iris-test")
+    dropped = PredictionCache(predict_fn, "1", model_id="iris-test")
+    assert invalidate_caches("iris-test") == 2
+
+    closed.close()
+    del dropped
+    gc.collect()
+    assert invalidate_caches("iris-test") == 0
+    assert "iris-test" not in prediction_cache._CACHES
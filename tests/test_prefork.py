@@ -0,0 +1,81 @@
+# test_prefork.py
+import json
+import threading
+import urllib.request
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+
+from local_mlops.kernel import export_kernel
+from local_mlops.prefork import PreforkModelServer
+
+FEATURE_NAMES = ["sepal_length", "sepal_width", "petal_length", "petal_width"]
+
+
+def _kernel(tmp_path, name: str, C: float) -> str:
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(90, 4))
+    X[:, 2] += np.arange(90) % 3 * 3
+    label_encoder = LabelEncoder().fit(["Iris-setosa", "Iris-versicolor", "Iris-virginica"])
+    clf = LogisticRegression(C=C, max_iter=500).fit(X, np.arange(90) % 3)
+    joblib.dump({"model": clf, "label_encoder": label_encoder, "feature_names": FEATURE_NAMES},
+                tmp_path / f"{name}.joblib")
+    return export_kernel(str(tmp_path / f"{name}.joblib"), str(tmp_path / f"{name}.npz"))
+
+
+def _predict(url: str) -> dict:
+    request = urllib.request.Request(f"{url}/predict", data=json.dumps({"instances": [[5.1, 3.5, 1.4, 0.2]]}).encode(),
+                                     method="POST")
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+@pytest.fixture
+def kernels(tmp_path):
+    return _kernel(tmp_path, "v1", 1.0), _kernel(tmp_path, "v2", 0.01)
+
+
+def test_two_phase_swap_under_load_drops_nothing(tmp_path, kernels):
+    v1, v2 = kernels
+    with PreforkModelServer({"iris": v1}, workers=2, state_dir=str(tmp_path / "state")) as server:
+        url = server.model_url("iris")
+        assert _predict(url)["version"] == "v1.npz"
+
+        versions, errors, stop = [], [], threading.Event()
+
+        def client():
+            while not stop.is_set():
+                try:
+                    versions.append(_predict(url)["version"])
+                except Exception as e:
+                    errors.append(e)
+
+        thread = threading.Thread(target=client)
+        thread.start()
+        try:
+            timings = server.swap({"iris": v2})
+        finally:
+            stop.set()
+            thread.join()
+        after = [_predict(url)["version"] for _ in range(10)]
+        states = server._worker_states()
+
+    assert not errors
+    assert timings["generation"] == 1 and len(timings["workers"]) == 2
+    # Every worker prepared the new file before any of them switched
+    assert all(w["models"] == ["iris"] for w in timings["workers"])
+    assert all(state["generation"] == 1 and state["models"] == {"iris": "v2.npz"} for state in states)
+    assert set(after) == {"v2.npz"}
+    # Requests during the swap were answered whole by one version or the other
+    assert set(versions) <= {"v1.npz", "v2.npz"}
+
+
+def test_swap_can_add_a_model(tmp_path, kernels):
+    v1, v2 = kernels
+    with PreforkModelServer({"production": v1}, workers=1, state_dir=str(tmp_path / "state")) as server:
+        server.swap({"staging": v2})
+        assert _predict(server.model_url("production"))["version"] == "v1.npz"
+        assert _predict(server.model_url("staging"))["version"] == "v2.npz"
@@ -0,0 +1,54 @@
+# test_profiling.py
+import multiprocessing
+import threading
+import time
+
+from local_mlops.profiling import StepProfiler, _reset_peak_rss
+
+
+def _burn(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_concurrent_steps_measure_their_own_cpu_and_flag_shared_peak():
+    profilers = {"busy": StepProfiler("busy"), "idle": StepProfiler("idle")}
+    started = threading.Barrier(2)
+
+    def run(name, work):
+        with profilers[name]:
+            started.wait()
+            work()
+
+    threads = [threading.Thread(target=run, args=("busy", lambda: _burn(0.3))),
+               threading.Thread(target=run, args=("idle", lambda: time.sleep(0.3)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    busy, idle = profilers["busy"].result, profilers["idle"].result
+    assert busy["cpu_s"] > 0.15
+    assert idle["cpu_s"] < 0.05
+    assert busy["peak_rss_scope"] == idle["peak_rss_scope"] == "process"
+    assert busy["cpu_scope"] == idle["cpu_scope"] == "thread"
+
+
+def test_lone_step_counts_worker_threads_and_child_processes():
+    with StepProfiler("workers") as profiler:
+        helper = threading.Thread(target=_burn, args=(0.2,))
+        helper.start()
+        helper.join()
+        child = multiprocessing.Process(target=_burn, args=(0.2,))
+        child.start()
+        child.join()
+    assert profiler.result["cpu_scope"] == "step"
+    assert profiler.result["cpu_s"] > 0.3
+
+
+def test_lone_step_has_its_own_peak():
+    with StepProfiler("alone") as profiler:
+        pass
+    expected = "step" if _reset_peak_rss() else "process"
+    assert profiler.result["peak_rss_scope"] == expected
@@ -0,0 +1,90 @@
+# test_registry_index.py
+import os
+
+import pytest
+
+from local_mlops.registry_index import DirectoryRemote, RegistryIndex
+
+
+def _register(index, tmp_path, version_id: str, aliases: list = ()):
+    artifact = tmp_path / f"artifact-{version_id}.bin"
+    artifact.write_bytes(version_id.encode())
+    index.register("iris", str(artifact), version_id=version_id, aliases=list(aliases))
+
+
+def test_alias_removal_survives_two_way_sync(tmp_path):
+    local = RegistryIndex(str(tmp_path / "local"))
+    remote_root = str(tmp_path / "remote")
+    _register(local, tmp_path, "1", aliases=["staging", "production"])
+    _register(local, tmp_path, "2")
+    local.sync(DirectoryRemote(remote_root))
+
+    # Demote locally, promote v2 remotely; both changes must win on both sides
+    local.set_aliases("iris", "1", remove=["staging"])
+    remote = RegistryIndex(remote_root)
+    remote.set_aliases("iris", "2", add=["production"])
+    local.sync(DirectoryRemote(remote_root))
+    local.sync(DirectoryRemote(remote_root))
+
+    remote.refresh()
+    for index in (local, remote):
+        assert index.aliases("iris") == {"production": "2"}
+        with pytest.raises(KeyError):
+            index.resolve("iris", "staging")
+        assert index.artifact_path("iris", "production") == index.blob_path(index.version("iris", "2")["digest"])
+
+
+def test_writes_within_one_mtime_tick_are_not_lost(tmp_path):
+    root = str(tmp_path / "registry")
+    first, second = RegistryIndex(root), RegistryIndex(root)
+    _register(first, tmp_path, "1")
+    stat = os.stat(os.path.join(root, "index.json"))
+    _register(second, tmp_path, "2")
+    # Another writer replaces the index without the mtime moving
+    os.utime(os.path.join(root, "index.json"), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    _register(first, tmp_path, "3")
+
+    fresh = RegistryIndex(root)
+    assert sorted(fresh.index["models"]["iris"]["versions"]) == ["1", "2", "3"]
+    assert second.refresh() and sorted(second.index["models"]["iris"]["versions"]) == ["1", "2", "3"]
+
+
+def test_existing_version_id_cannot_be_overwritten(tmp_path):
+    index = RegistryIndex(str(tmp_path / "registry"))
+    _register(index, tmp_path, "1")
+    digest = index.version("iris", "1")["digest"]
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"different bytes")
+    with pytest.raises(ValueError, match="already registered"):
+        index.register("iris", str(other), version_id="1")
+    assert index.version("iris", "1")["digest"] == digest
+    # Without an explicit id the next free one is used
+    assert index.register("iris", str(other))["version_id"] == "2"
+
+
+class _AliasOnlyRemote:
+    transfers_blobs = False
+    authoritative_aliases = True
+
+    def __init__(self, state):
+        self.state = state
+
+    def export_state(self):
+        return self.state
+
+    def merge_state(self, state):
+        pass
+
+
+def test_authoritative_remote_propagates_alias_removals(tmp_path):
+    index = RegistryIndex(str(tmp_path / "registry"))
+    _register(index, tmp_path, "1", aliases=["staging", "latest"])
+    _register(index, tmp_path, "local-only", aliases=["candidate"])
+    remote_version = dict(index.version("iris", "1"), digest="vertex:iris@1")
+    remote = _AliasOnlyRemote({"models": {"iris": {
+        "versions": {"1": remote_version},
+        "aliases": {"latest": {"version_id": "1", "updated": 0.0}},
+        "digests": {},
+    }}})
+    index.sync(remote)
+    assert index.aliases("iris") == {"latest": "1", "candidate": "local-only"}
@@ -0,0 +1,58 @@
+# test_router.py
+import importlib
+
+import joblib
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+
+from local_mlops.datasource import FEATURE_COLUMNS, TARGET_COLUMN, load_iris_frame
+
+
+def _train(path, features: list) -> str:
+    df = load_iris_frame()
+    label_encoder = LabelEncoder().fit(df[TARGET_COLUMN])
+    model = LogisticRegression(max_iter=1000).fit(df[features].to_numpy(), label_encoder.transform(df[TARGET_COLUMN]))
+    joblib.dump({"model": model, "label_encoder": label_encoder, "feature_names": features}, path)
+    return str(path)
+
+
+@pytest.fixture
+def validate():
+    return importlib.import_module("12_testing_validation").validate_model_performance
+
+
+def test_same_model_in_shadow_passes(tmp_path, validate):
+    model = _train(tmp_path / "model.joblib", FEATURE_COLUMNS)
+    result = validate(model, model, batch_size=10)
+    assert result["passed"]
+    assert result["comparisons"]["champion->challenger"]["agreement_rate"] == 1.0
+    assert result["variants"]["challenger"]["shadow_latency"]["count"] == 15
+
+
+def test_failing_shadow_fails_validation(tmp_path, validate):
+    champion = _train(tmp_path / "champion.joblib", FEATURE_COLUMNS)
+    # Trained on three features, so scoring the four-column replay raises in every shadow batch
+    challenger = _train(tmp_path / "challenger.joblib", FEATURE_COLUMNS[:3])
+    result = validate(champion, challenger, batch_size=10)
+    assert not result["passed"]
+    assert result["shadow_errors"] > 0 and result["variants"]["challenger"]["accuracy"] is None
+
+
+def test_same_model_in_shadow_has_no_latency_delta(tmp_path):
+    from local_mlops.router import TrafficRouter
+
+    model = _train(tmp_path / "model.joblib", FEATURE_COLUMNS)
+    X = load_iris_frame()[FEATURE_COLUMNS].to_numpy()
+    # A long interval makes each shadow pass drain many requests at once, which used to
+    # report the shadow as several times faster than the identical served model
+    with TrafficRouter({"served": model, "shadow": model}, weights={"served": 1.0}, shadows=["shadow"],
+                       shadow_interval_ms=200) as router:
+        for i in range(len(X)):
+            router.predict(X[i:i + 1].tolist())
+        router.drain()
+        stats = router.stats()
+    comparison = stats["comparisons"]["served->shadow"]
+    served = stats["variants"]["served"]
+    assert comparison["rows"] == len(X)
+    assert abs(comparison["latency_delta_mean_ms"]) < 0.5 * served["mean_ms"]
@@ -0,0 +1,198 @@
+# test_server.py
+import asyncio
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+
+from local_mlops.prediction_log import PredictionLogger, iter_logged_features
+from local_mlops.server import LocalPredictionServer, MicroBatcher
+
+FEATURE_NAMES = ["sepal_length", "sepal_width", "petal_length", "petal_width"]
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(90, 4))
+    species = np.array(["Iris-setosa", "Iris-versicolor", "Iris-virginica"])[np.arange(90) % 3]
+    X[:, 2] += np.arange(90) % 3 * 3
+    label_encoder = LabelEncoder().fit(species)
+    model = LogisticRegression(max_iter=500).fit(X, label_encoder.transform(species))
+    path = tmp_path / "model.joblib"
+    joblib.dump({"model": model, "label_encoder": label_encoder, "feature_names": FEATURE_NAMES}, path)
+    return str(path)
+
+
+def _post(url: str, payload) -> tuple:
+    request = urllib.request.Request(f"{url}/predict", data=json.dumps(payload).encode(), method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.mark.parametrize("instances", [[[1.0, 2.0, 3.0]], [1.0, 2.0, 3.0, 4.0], [], [[1.0], [1.0, 2.0]]])
+def test_malformed_instances_are_rejected_and_server_keeps_serving(model_path, instances):
+    with LocalPredictionServer(model_path) as server:
+        status, body = _post(server.url, {"instances": instances})
+        assert status == 400 and "error" in body
+        status, body = _post(server.url, {"instances": [[5.1, 3.5, 1.4, 0.2]]})
+        assert status == 200 and len(body["predictions"]) == 1
+
+
+def test_mixed_widths_in_one_batch_do_not_stop_the_batcher():
+    def predict_fn(X):
+        return np.zeros(len(X)), np.zeros((len(X), 3))
+
+    async def scenario():
+        batcher = MicroBatcher(predict_fn, max_batch_size=64, max_wait_us=20_000)
+        batcher.start()
+        mixed = await asyncio.gather(batcher.submit([[1.0, 2.0]]), batcher.submit([[1.0, 2.0, 3.0]]),
+                                     return_exceptions=True)
+        after = await asyncio.wait_for(batcher.submit([[1.0, 2.0]]), timeout=2)
+        await batcher.stop()
+        return mixed, after
+
+    mixed, (labels, _) = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in mixed)
+    assert len(labels) == 1
+
+
+def test_failed_batch_fails_only_its_requests():
+    calls = []
+
+    def predict_fn(X):
+        calls.append(len(X))
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return np.zeros(len(X)), np.zeros((len(X), 3))
+
+    async def scenario():
+        batcher = MicroBatcher(predict_fn, max_batch_size=64, max_wait_us=20_000)
+        batcher.start()
+        first = await asyncio.gather(*(batcher.submit([[1.0, 2.0]]) for _ in range(3)), return_exceptions=True)
+        second = await asyncio.gather(*(batcher.submit([[1.0, 2.0]]) for _ in range(3)))
+        await batcher.stop()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in first)
+    assert [len(labels) for labels, _ in second] == [1, 1, 1]
+
+
+class _FailingModel(LogisticRegression):
+    def predict_proba(self, X):
+        raise RuntimeError("model exploded")
+
+
+def test_unexpected_errors_answer_500(tmp_path):
+    X = np.random.default_rng(0).normal(size=(30, 4))
+    path = tmp_path / "model.joblib"
+    label_encoder = LabelEncoder().fit(["a", "b", "c"])
+    joblib.dump({"model": _FailingModel().fit(X, np.arange(30) % 3), "label_encoder": label_encoder,
+                 "feature_names": FEATURE_NAMES}, path)
+    with LocalPredictionServer(str(path)) as server:
+        for _ in range(2):
+            status, body = _post(server.url, {"instances": [[5.1, 3.5, 1.4, 0.2]]})
+            assert status == 500 and body["error"] == "RuntimeError: model exploded"
+
+
+def _post_concurrently(url: str, requests: list) -> list:
+    results = [None] * len(requests)
+    start = threading.Barrier(len(requests))
+
+    def send(i):
+        start.wait()
+        results[i] = _post(url, {"instances": requests[i]})
+
+    threads = [threading.Thread(target=send, args=(i,)) for i in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_logging_multi_request_batches(model_path, tmp_path):
+    logger = PredictionLogger(str(tmp_path / "log"), FEATURE_NAMES, ["a", "b", "c"], sample_rate=1.0)
+    requests = [[[5.1 + i, 3.5, 1.4, 0.2]] * (i % 3 + 1) for i in range(8)]
+    with LocalPredictionServer(model_path, max_wait_us=50_000, prediction_logger=logger) as server:
+        for _ in range(3):
+            results = _post_concurrently(server.url, requests)
+            assert [status for status, _ in results] == [200] * len(requests)
+        batcher = server.server.batcher
+        assert batcher.batches < 3 * len(requests) and batcher.log_errors == 0
+    logger.close()
+
+    logged = np.concatenate(list(iter_logged_features(str(tmp_path / "log"), FEATURE_NAMES)))
+    expected = np.concatenate([np.asarray(r) for r in requests] * 3)
+    np.testing.assert_allclose(np.sort(logged[:, 0]), np.sort(expected[:, 0]), rtol=1e-6)
+
+
+def test_logger_failure_does_not_stop_serving(model_path):
+    class BrokenLogger:
+        def log(self, X, proba):
+            raise RuntimeError("disk full")
+
+    with LocalPredictionServer(model_path, max_wait_us=20_000, prediction_logger=BrokenLogger()) as server:
+        for _ in range(2):
+            results = _post_concurrently(server.url, [[[5.1, 3.5, 1.4, 0.2]]] * 4)
+            assert [status for status, _ in results] == [200] * 4
+        assert server.server.batcher.log_errors > 0
+
+
+@pytest.fixture
+def categorical_model_path(tmp_path):
+    import pyarrow as pa
+
+    from local_mlops.preprocessing import TabularTransform
+
+    colors = np.array(["red", "green", "blue"])[np.arange(90) % 3]
+    schema = {"features": [{"name": "width", "dtype": "float32"}, {"name": "color", "dtype": "category"}],
+              "target": {"name": "species"}}
+    table = pa.table({"width": np.random.default_rng(0).normal(size=90).astype(np.float32), "color": colors,
+                      "species": np.array(["a", "b", "c"])[np.arange(90) % 3]})
+    transform = TabularTransform(schema).fit(table)
+    model = LogisticRegression().fit(transform.transform(table), transform.encode_target(table))
+    path = tmp_path / "categorical.joblib"
+    joblib.dump({"model": model, "label_encoder": transform.label_encoder(), "feature_names": ["width", "color"],
+                 "transform": transform}, path)
+    return str(path)
+
+
+def test_categorical_instances_reach_the_transform(categorical_model_path):
+    with LocalPredictionServer(categorical_model_path) as server:
+        status, body = _post(server.url, {"instances": [[0.1, "red"], [0.2, "green"], [0.3, "blue"]]})
+        assert status == 200 and body["predictions"] == ["a", "b", "c"]
+        status, body = _post(server.url, {"instances": [[0.1]]})
+        assert status == 400
+
+
+def test_other_consumers_apply_the_transform(categorical_model_path):
+    from local_mlops.explain import explain
+    from local_mlops.kernel import kernel_arrays
+    from local_mlops.loadgen import InProcessTarget
+    from local_mlops.router import TrafficRouter
+
+    instances = [[0.1, "red"], [0.2, "green"]]
+    assert InProcessTarget(categorical_model_path)({"instances": instances})["predictions"] == ["a", "b"]
+    with TrafficRouter({"v1": categorical_model_path, "v2": categorical_model_path},
+                       weights={"v1": 1.0}, shadows=["v2"]) as router:
+        assert router.predict(instances).predictions == ["a", "b"]
+        router.drain()
+        stats = router.stats()
+    assert stats["shadow_errors"] == 0 and stats["comparisons"]["v1->v2"]["agreement_rate"] == 1.0
+
+    artifacts = joblib.load(categorical_model_path)
+    predictions, _ = explain(artifacts, instances, baseline=[0.0, 0.0])
+    assert predictions == ["a", "b"]
+    with pytest.raises(ValueError, match="transform"):
+        kernel_arrays(artifacts)
@@ -0,0 +1,50 @@
+# test_step_cache.py
+import multiprocessing
+import os
+import shutil
+
+from local_mlops.step_cache import StepCache
+
+
+def _put_many(root, src, worker):
+    cache = StepCache(root)
+    for i in range(20):
+        cache.put(f"{worker}-{i}", {"out": src}, {"i": i})
+        cache.get(f"{worker}-{i}", {"out": src + f".{worker}"})
+
+
+def test_incomplete_entry_is_a_miss(tmp_path):
+    src = tmp_path / "src.bin"
+    src.write_bytes(b"payload")
+    cache = StepCache(str(tmp_path / "cache"))
+    cache.put("k", {"out": str(src)}, {"n": 1})
+
+    dest = tmp_path / "dest.bin"
+    assert cache.get("k", {"out": str(dest)}) == {"n": 1}
+    assert dest.read_bytes() == b"payload"
+
+    os.remove(tmp_path / "cache" / "k" / "out")
+    assert cache.get("k", {"out": str(dest)}) is None
+    assert cache.stats()["entries"] == 0
+
+    cache.put("k", {"out": str(src)}, {"n": 2})
+    shutil.rmtree(tmp_path / "cache" / "k")
+    assert cache.get("k", {"out": str(dest)}) is None
+    assert cache.stats()["misses"] == 2 and cache.stats()["hits"] == 1
+
+
+def test_concurrent_writers_keep_every_entry(tmp_path):
+    src = tmp_path / "src.bin"
+    src.write_bytes(b"x" * 1024)
+    root = str(tmp_path / "cache")
+    StepCache(root)
+    procs = [multiprocessing.Process(target=_put_many, args=(root, str(src), w)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+        assert p.exitcode == 0
+
+    stats = StepCache(root).stats()
+    assert stats["entries"] == 80
+    assert stats["hits"] == 80 and stats["misses"] == 0
@@ -0,0 +1,38 @@
+# test_tuning.py
+import numpy as np
+
+from local_mlops.tuning import run_asha
+
+
+def _dataset(rows: int = 120, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, 4))
+    y = (X[:, 0] + X[:, 1] > 0).astype(np.int64)
+    return X[:rows // 2], y[:rows // 2], X[rows // 2:], y[rows // 2:]
+
+
+def test_asha_promotes_at_most_top_fraction_per_rung():
+    eta = 3
+    result = run_asha(*_dataset(), max_trial_count=20, parallel_trial_count=2, eta=eta)
+    assert result["trial_count"] == 20
+    for rung in result["rungs"]:
+        assert rung["promoted"] <= rung["results"] // eta
+    assert result["completed_trial_count"] < result["trial_count"]
+
+
+def test_asha_ties_promote_earlier_trials():
+    # Separable data: every trial reaches the same accuracy, so promotions follow trial order
+    result = run_asha(*_dataset(), max_iter_range=(2000, 2000), max_trial_count=9, parallel_trial_count=1)
+    first_rung = result["rungs"][0]
+    assert first_rung["results"] == 9 and first_rung["promoted"] == 3
+    promoted = sorted(t["trial_id"] for t in result["trials"] if t["iterations_run"] > 100)
+    assert promoted == [0, 1, 2]
+
+
+def test_asha_best_trial_comes_from_the_highest_rung():
+    result = run_asha(*_dataset(), max_trial_count=20, parallel_trial_count=2)
+    best = result["best_trial"]
+    top_rung = max(t["rung"] for t in result["trials"])
+    finished = [t for t in result["trials"] if t["rung"] == top_rung]
+    assert best["trial_id"] in {t["trial_id"] for t in finished}
+    assert best["accuracy"] == max(t["accuracy"] for t in finished)